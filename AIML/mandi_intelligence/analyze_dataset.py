@@ -1,5 +1,7 @@
 import pandas as pd
 
+from ml_arbitrage.data_loader import parse_arrival_dates
+
 # Load full dataset
 df = pd.read_csv('dataset/commodity_price.csv')
 
@@ -65,7 +67,7 @@ print(f"   After crop filter: {len(filtered)} records")
 
 print(f"\n📅 DATE RANGE:")
 if len(filtered) > 0:
-    filtered['Arrival_Date'] = pd.to_datetime(filtered['Arrival_Date'], format='%d/%m/%Y', errors='coerce')
+    filtered['Arrival_Date'] = parse_arrival_dates(filtered['Arrival_Date'])
     print(f"   Earliest: {filtered['Arrival_Date'].min()}")
     print(f"   Latest: {filtered['Arrival_Date'].max()}")
     print(f"   Unique dates: {filtered['Arrival_Date'].nunique()}")
@@ -3,6 +3,8 @@ Analyze what data is actually available in the Kaggle dataset
 """
 import pandas as pd
 
+from ml_arbitrage.data_loader import parse_arrival_dates
+
 df = pd.read_csv('dataset/commodity_price.csv')
 df.columns = df.columns.str.replace('_x0020_', '_')
 
@@ -10,7 +12,8 @@ print("=" * 80)
 print("FULL DATASET ANALYSIS")
 print("=" * 80)
 print(f"Total records: {len(df):,}")
-print(f"Date range: {df['Arrival_Date'].min()} to {df['Arrival_Date'].max()}")
+arrival_dates = parse_arrival_dates(df['Arrival_Date'])
+print(f"Date range: {arrival_dates.min()} to {arrival_dates.max()}")
 print()
 
 # Gujarat data
@@ -12,15 +12,19 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
 from pathlib import Path
+import os
 import sys
+import asyncio
 import base64
 import pandas as pd
 
 # Add parent directory to path to import core logic
 sys.path.append(str(Path(__file__).parent.parent))
 
-from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.data_loader import MandiDataLoader, prune_cache, touch_cache
 from ml_arbitrage.price_predictor import PricePredictor
+from ml_arbitrage.serving_bundle import BUNDLE_FILE, ServingBundle
+from ml_arbitrage.sales_log import load_sales, record_sale, update_lock
 from ml_arbitrage.arbitrage_engine import ArbitrageEngine
 
 # Initialize FastAPI
@@ -56,7 +60,27 @@ else:
 data_loader = None
 predictor = None
 engine = None
-latest_data = None
+latest_data = None  # monolithic featured frame (serving bundle, or fallback if partitions can't be written)
+served_records = 0
+retraining_task = None
+
+# History window served (train_models.py --days must match for its serving bundle to be used)
+DATA_DAYS = 90
+
+# Featured (state, crop) partitions written at startup; requests read only the crops they touch
+PARTITIONS_DIR = Path(__file__).parent.parent / 'ml_arbitrage' / 'cache' / 'partitions'
+partitions_dir = None
+
+# Minutes between warm-start updates of models from reported sales (0 disables them)
+RETRAIN_INTERVAL_MINUTES = float(os.getenv('MANDI_RETRAIN_INTERVAL_MINUTES', '60'))
+
+# Dataset the API serves (and the serving bundle must have been built from)
+DATASET_PATH = Path(__file__).parent.parent / 'dataset' / 'commodity_price.csv'
+
+# Load the serving bundle and all its boosters when this module is imported, so a
+# forking server that imports the app before forking (gunicorn --preload) shares
+# them between its workers; uvicorn --workers spawns fresh processes instead
+PRELOAD_BUNDLE = os.getenv('MANDI_PRELOAD_BUNDLE', '0') == '1'
 
 
 # Request/Response Models
@@ -109,40 +133,101 @@ class RespondResponse(BaseModel):
     farmer_id: str
 
 
+def open_serving_bundle(predictor: PricePredictor, loader: MandiDataLoader) -> Optional[ServingBundle]:
+    """
+    Map the serving bundle from train_models.py if it matches the current dataset and features.
+    
+    Returns:
+        ServingBundle, or None if there is none or it is out of date
+    """
+    bundle_path = Path(os.getenv('MANDI_SERVING_BUNDLE', predictor.models_dir / BUNDLE_FILE))
+    try:
+        bundle = ServingBundle(bundle_path) if bundle_path.exists() else None
+    except ValueError as e:
+        print(f"⚠️  Ignoring serving bundle: {e}")
+        return None
+    if bundle is None:
+        return None
+    
+    # Without the dataset there is nothing to rebuild from, so any compatible bundle is served
+    data_key = loader.processed_key(str(DATASET_PATH), days=DATA_DAYS) \
+        if DATASET_PATH.exists() else bundle.data_key
+    if not bundle.is_current(predictor.feature_version(), data_key):
+        print("⚠️  Serving bundle is out of date, rebuilding state from the dataset")
+        return None
+    return bundle
+
+
+if PRELOAD_BUNDLE:
+    # In the master process, before the workers are forked
+    data_loader = MandiDataLoader()
+    predictor = PricePredictor()
+    predictor.bundle = open_serving_bundle(predictor, data_loader)
+    if predictor.bundle is not None:
+        print(f"📦 Preloaded {predictor.bundle.preload()} boosters from the serving bundle")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Load models and data on startup"""
-    global data_loader, predictor, engine, latest_data
+    global data_loader, predictor, engine, latest_data, served_records, partitions_dir
     
     print("🚀 Loading Mandi Intelligence System...")
     
-    # Initialize data loader
-    data_loader = MandiDataLoader()
+    # Initialize data loader (already done at import when the bundle is preloaded)
+    data_loader = data_loader or MandiDataLoader()
     
     try:
+        # Precompiled snapshot + models from train_models.py: mapped read-only, so
+        # workers share the snapshot's pages and nothing is parsed or trained here.
+        # Boosters preloaded before the fork are shared too; otherwise they are
+        # copied into each worker's LRU as they are first used
+        if predictor is None:
+            predictor = PricePredictor()
+            predictor.bundle = open_serving_bundle(predictor, data_loader)
+        if predictor.bundle is not None:
+            latest_data = predictor.bundle.frame
+            served_records = len(latest_data)
+            engine = ArbitrageEngine()
+            print(f"✅ System ready from serving bundle ({len(predictor.bundle)} models)")
+            schedule_incremental_retraining()
+            return
+        
         # Load dataset (use parent directory path)
-        dataset_path = Path(__file__).parent.parent / 'dataset' / 'commodity_price.csv'
-        print(f"DEBUG: Dataset Path: {dataset_path}")
-        print(f"DEBUG: Exists? {dataset_path.exists()}")
+        print(f"DEBUG: Dataset Path: {DATASET_PATH}")
+        print(f"DEBUG: Exists? {DATASET_PATH.exists()}")
         
-        data_loader.load_data(str(dataset_path))
-        df = data_loader.filter_and_process(days=90)
+        df = data_loader.load_processed(str(DATASET_PATH), days=DATA_DAYS)
         
-        # Initialize predictor
-        predictor = PricePredictor()
-        df_featured = predictor.prepare_features(df)
+        df_featured = predictor.load_features(df)
         
-        # Train models
-        print("📚 Training ML models...")
-        predictor.train_all_models(df_featured)
+        # Serve the registered models; training belongs to the offline job
+        # (train_models.py). Missing/stale series are only logged unless
+        # MANDI_STARTUP_TRAINING=missing (train them here) or =all is set.
+        print("📚 Loading ML models...")
+        predictor.sync_models(df_featured, retrain=os.getenv('MANDI_STARTUP_TRAINING', 'none'))
         
         # Initialize arbitrage engine
         engine = ArbitrageEngine()
         
-        # Store latest data
-        latest_data = df_featured
+        # Keep the featured data as (state, crop) partitions on disk instead of one
+        # in-memory frame; requests load just the partitions of their crop
+        served_records = len(df_featured)
+        target_dir = PARTITIONS_DIR / predictor._feature_cache_path(df).stem
+        try:
+            data_loader.processed_data = df_featured
+            data_loader.save_partitions(str(target_dir))
+            touch_cache(target_dir)
+            partitions_dir = target_dir
+            prune_cache(PARTITIONS_DIR, "features_*")
+        except Exception as e:
+            print(f"⚠️  Could not write data partitions, serving from memory: {e}")
+            latest_data = df_featured
+        data_loader.processed_data = None
+        data_loader.partitions = {}
         
         print("✅ System ready!")
+        schedule_incremental_retraining()
         
     except Exception as e:
         print(f"⚠️  Error during startup: {e}")
@@ -151,6 +236,75 @@ async def startup_event():
         print("   System will operate in fallback mode")
 
 
+def served_data(crops: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """
+    Featured rows the API serves from, restricted to crops (None = all).
+    
+    Partitions are read from disk on first use and memoized by the data loader;
+    from a serving bundle this is a view of the mapped snapshot instead.
+    
+    Returns:
+        DataFrame (empty if none of the crops is served), or None before startup finished
+    """
+    if latest_data is not None:
+        return latest_data if crops is None else latest_data[latest_data['Crop'].isin(crops)]
+    if partitions_dir is None:
+        return None
+    try:
+        # The returned frame, not data_loader.processed_data, which the warm-start thread also sets
+        return data_loader.load_partitions(str(partitions_dir), crops=crops)
+    except ValueError:
+        return pd.DataFrame()
+
+
+def served_crops() -> List[str]:
+    """Crops with served data (without loading any partition)."""
+    if latest_data is not None:
+        return latest_data['Crop'].unique().tolist()
+    if partitions_dir is None:
+        return []
+    return sorted({path.stem for path in partitions_dir.glob('*/*') if path.suffix in ('.parquet', '.pkl')})
+
+
+def schedule_incremental_retraining():
+    """Start the background job that warm-starts models on sales reported through /respond."""
+    global retraining_task
+    if RETRAIN_INTERVAL_MINUTES > 0 and retraining_task is None:
+        retraining_task = asyncio.get_running_loop().create_task(incremental_retraining_loop())
+
+
+async def incremental_retraining_loop():
+    """Every RETRAIN_INTERVAL_MINUTES, continue boosting the models of series with new sales."""
+    while True:
+        await asyncio.sleep(RETRAIN_INTERVAL_MINUTES * 60)
+        try:
+            await asyncio.to_thread(apply_reported_sales)
+        except Exception as e:
+            print(f"⚠️  Incremental retraining failed: {e}")
+
+
+def apply_reported_sales():
+    """Extend the served data with reported sales and warm-start the affected models."""
+    global latest_data
+    
+    sales = load_sales()
+    data = served_data(crops=sales['Crop'].unique().tolist()) if not sales.empty else None
+    if data is None or data.empty or predictor is None:
+        return
+    with update_lock():
+        extended, results = predictor.update_models(data, sales)
+    if latest_data is not None:
+        latest_data = extended if len(data) == len(latest_data) else pd.concat(
+            [latest_data[~latest_data['Crop'].isin(sales['Crop'].unique())], extended], ignore_index=True)
+    else:
+        # Replace the memoized partitions of the updated crops
+        for (state, crop), part in extended.groupby(['State', 'Crop'], observed=True):
+            data_loader.partitions[(str(state), str(crop))] = part.reset_index(drop=True)
+    for result in results:
+        print(f"   🔁 {result['mandi']} - {result['crop']}: {result['train_size']} new rows | "
+              f"pre-update MAE ₹{result['mae']:.2f}/kg")
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint with API information"""
@@ -174,8 +328,8 @@ async def health_check():
     return {
         "status": "healthy",
         "models_loaded": predictor is not None,
-        "data_loaded": latest_data is not None,
-        "records_count": len(latest_data) if latest_data is not None else 0
+        "data_loaded": latest_data is not None or partitions_dir is not None,
+        "records_count": served_records
     }
 
 
@@ -192,14 +346,14 @@ async def get_response(request: RecommendRequest):
     
     Returns the best option plus alternative choices.
     """
-    if latest_data is None or engine is None:
+    if (latest_data is None and partitions_dir is None) or engine is None:
         raise HTTPException(
             status_code=503,
             detail="System not ready. Models are still loading."
         )
     
     # Validate crop against actual dataset (not hardcoded list)
-    available_crops = latest_data['Crop'].unique().tolist()
+    available_crops = served_crops()
     if request.crop not in available_crops:
         raise HTTPException(
             status_code=400,
@@ -207,14 +361,17 @@ async def get_response(request: RecommendRequest):
         )
     
     try:
+        # Only this crop's partitions are loaded
+        crop_data = served_data(crops=[request.crop])
+        
         # 1. Get latest prices (df_current)
-        latest_date = latest_data['Date'].max()
-        df_current = latest_data[latest_data['Date'] == latest_date].copy()
+        latest_date = crop_data['Date'].max()
+        df_current = crop_data[crop_data['Date'] == latest_date].copy()
         
         # 2. Generate forecasts (df_forecast)
         df_forecast = None
         try:
-            forecasts = predictor.get_price_forecast_all_mandis(latest_data, request.crop, days_ahead=7)
+            forecasts = predictor.get_price_forecast_all_mandis(crop_data, request.crop, days_ahead=7)
             # Flatten forecast dict to DataFrame
             forecast_list = []
             for mandi, fcast_df in forecasts.items():
@@ -307,8 +464,8 @@ async def submit_response(request: RespondRequest):
     # Generate or use provided farmer ID
     farmer_id = request.farmer_id or f"FARMER_{hash(request.mandi_name + request.sale_date) % 10000:04d}"
     
-    # Here you would typically save to database
-    # For now, we'll just acknowledge receipt
+    # Logged for the incremental retraining job (see apply_reported_sales)
+    record_sale({**request.model_dump(), 'farmer_id': farmer_id})
     
     print(f"📝 Received feedback from {farmer_id}")
     print(f"   Mandi: {request.mandi_name}")
@@ -319,8 +476,6 @@ async def submit_response(request: RespondRequest):
     if request.feedback:
         print(f"   Feedback: {request.feedback}")
     
-    # TODO: Save to database for model retraining
-    
     return RespondResponse(
         status="success",
         message=f"Thank you! Your sale data has been recorded and will help improve recommendations for other farmers.",
@@ -331,13 +486,14 @@ async def submit_response(request: RespondRequest):
 @app.get("/mandis", tags=["Data"])
 async def list_mandis():
     """List all available mandis with current crop availability"""
-    if latest_data is None:
+    data = served_data()
+    if data is None:
         raise HTTPException(status_code=503, detail="Data not loaded")
     
     # Group by mandi and show available crops
     mandis_info = []
-    for mandi in latest_data['Mandi_Name'].unique():
-        mandi_data = latest_data[latest_data['Mandi_Name'] == mandi]
+    for mandi in data['Mandi_Name'].unique():
+        mandi_data = data[data['Mandi_Name'] == mandi]
         mandis_info.append({
             "mandi_name": str(mandi),
             "distance_km": float(mandi_data['Distance_km'].iloc[0]),
@@ -11,6 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 from pathlib import Path
+import os
 import sys
 
 # Add parent directory to path
@@ -109,16 +110,17 @@ async def startup_event():
     try:
         # Load dataset (use parent directory path)
         dataset_path = Path(__file__).parent.parent / 'dataset' / 'commodity_price.csv'
-        data_loader.load_data(str(dataset_path))
-        df = data_loader.filter_and_process(days=90)
+        df = data_loader.load_processed(str(dataset_path), days=90)
         
         # Initialize predictor
         predictor = PricePredictor()
-        df_featured = predictor.prepare_features(df)
+        df_featured = predictor.load_features(df)
         
-        # Train models
-        print("📚 Training ML models...")
-        predictor.train_all_models(df_featured)
+        # Serve the registered models; training belongs to the offline job
+        # (train_models.py). Missing/stale series are only logged unless
+        # MANDI_STARTUP_TRAINING=missing (train them here) or =all is set.
+        print("📚 Loading ML models...")
+        predictor.sync_models(df_featured, retrain=os.getenv('MANDI_STARTUP_TRAINING', 'none'))
         
         # Initialize arbitrage engine
         engine = ArbitrageEngine()
@@ -295,10 +297,10 @@ async def list_mandis():
     for mandi in latest_data['Mandi_Name'].unique():
         mandi_data = latest_data[latest_data['Mandi_Name'] == mandi]
         mandis_info.append({
-            "mandi_name": mandi,
-            "distance_km": mandi_data['Distance_km'].iloc[0],
+            "mandi_name": str(mandi),
+            "distance_km": float(mandi_data['Distance_km'].iloc[0]),
             "available_crops": mandi_data['Crop'].unique().tolist(),
-            "record_count": len(mandi_data)
+            "record_count": int(len(mandi_data))
         })
     
     return {
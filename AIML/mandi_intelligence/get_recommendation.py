@@ -95,12 +95,11 @@ def load_models():
     
     # Load data
     loader = MandiDataLoader()
-    loader.load_data("dataset/commodity_price.csv")
-    df = loader.filter_and_process(days=90)
+    df = loader.load_processed("dataset/commodity_price.csv", days=90)
     
     # Initialize predictor and load models
     predictor = PricePredictor()
-    df_featured = predictor.prepare_features(df)
+    df_featured = predictor.load_features(df)
     
     # Load existing models (they should already be trained)
     # If not trained, train them
@@ -337,10 +337,10 @@ class ArbitrageEngine:
         mandi_options = []
         for _, row in current_data.iterrows():
             mandi_options.append(MandiOption(
-                mandi_name=row['Mandi_Name'],
-                distance_km=row['Distance_km'],
-                price_per_kg=row['Price_per_kg'],
-                traffic_congestion=row['Traffic_Congestion_Score'],
+                mandi_name=str(row['Mandi_Name']),
+                distance_km=float(row['Distance_km']),
+                price_per_kg=round(float(row['Price_per_kg']), 2),  # undo float32 storage noise
+                traffic_congestion=float(row['Traffic_Congestion_Score']),
                 days_to_wait=0
             ))
         
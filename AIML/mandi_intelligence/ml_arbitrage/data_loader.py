@@ -18,11 +18,242 @@ Dataset fields:
 - Modal_Price: Most common/modal price (₹/quintal)
 """
 
+import hashlib
+import json
+import os
+import shutil
+import tempfile
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
+
+try:
+    import pyarrow  # noqa: F401 - enables the Parquet processed-data cache
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    _PYARROW_AVAILABLE = False
+
+# Bump whenever filter_and_process changes its output so stale caches get rebuilt
+PROCESSED_CACHE_VERSION = 7
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / "cache"
+
+# Entries of each cache kind (processed frames, feature matrices, API partitions)
+# kept per cache directory; older ones are removed when a new one is written
+CACHE_MAX_ENTRIES = 3
+
+# Fence multiplier k of the quality pass: prices outside [Q1 - k*spread, Q3 + k*spread]
+# of the previous prices of their (mandi, crop) series are outliers (3 = Tukey's "far out")
+QUALITY_IQR_FACTOR = 3.0
+
+# spread = max(IQR, QUALITY_MIN_SPREAD * median): modal prices often stay flat for
+# weeks (IQR 0), and the floor keeps ordinary moves off such a series' fences
+QUALITY_MIN_SPREAD = 0.25
+
+# Fences use only the QUALITY_WINDOW previous prices of a series, so later prices
+# never change earlier rows and a level shift moves the fences with it; prices
+# with fewer than QUALITY_MIN_HISTORY earlier prices are not checked
+QUALITY_WINDOW = 30
+QUALITY_MIN_HISTORY = 7
+
+# Compact schema of the processed frame: categorical keys make the API's
+# equality filters compare integer codes, float32 halves the numeric columns
+PROCESSED_DTYPES = {
+    'State': 'category',
+    'Mandi_Name': 'category',
+    'Crop': 'category',
+    'Distance_km': np.float32,
+    'Price_per_kg': np.float32,
+    'Traffic_Congestion_Score': np.float32,
+}
+
+# Lower-case raw column names -> canonical names (after '_x0020_' cleanup)
+COLUMN_MAPPING = {
+    'arrival_date': 'Arrival_Date',
+    'state': 'State',
+    'district': 'District',
+    'market': 'Market',
+    'commodity': 'Commodity',
+    'variety': 'Variety',
+    'min_price': 'Min_Price',
+    'max_price': 'Max_Price',
+    'modal_price': 'Modal_Price'
+}
+
+# Columns filter_and_process actually needs; everything else is skipped when streaming
+STREAMING_COLUMNS = ['State', 'District', 'Market', 'Commodity', 'Arrival_Date', 'Modal_Price',
+                     'Date', 'Mandi', 'Crop', 'Price']
+
+# District-to-Gandhinagar approximate distances (km)
+DISTRICT_DISTANCES = {
+    'Ahmedabad': 30,
+    'Gandhinagar': 5,
+    'Mahesana': 45,  # Also "Mehsana"
+    'Mehsana': 45,
+    'Rajkot': 220,
+    'Surat': 265,
+    'Vadodara': 100,
+    'Anand': 65,
+    'Bharuch': 180,
+    'Amreli': 240,
+    'Bhavnagar': 200,
+    'Jamnagar': 330,
+    'Junagadh': 330,
+    'Kutch': 350,
+    'Patan': 120,
+    'Porbandar': 400,
+    'Sabarkantha': 90,
+    'Surendranagar': 160,
+    'Tapi': 300,
+    'Dang': 200,
+    'Narmada': 150,
+    'Navsari': 280,
+    'Valsad': 300,
+    'Medinipur': 150,  # Fallback
+}
+
+
+def parse_arrival_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse AGMARKNET Arrival_Date values into Timestamps.
+    
+    Each distinct string is parsed once and broadcast back. Strings are tried
+    as dd/mm/YYYY (Kaggle dump) first, then as ISO dates (YYYY-MM-DD, used by
+    some AGMARKNET exports). Unparseable values become NaT.
+    
+    Args:
+        values: Raw date column
+        
+    Returns:
+        datetime64 Series aligned with values
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=str)
+    
+    parsed = pd.to_datetime(uniques, format='%d/%m/%Y', errors='coerce')
+    unparsed = parsed.isna()
+    if unparsed.any():
+        parsed[unparsed] = pd.to_datetime(uniques[unparsed], format='ISO8601', errors='coerce')
+    
+    # Append a NaT slot so missing values (code -1) stay missing
+    lookup = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))
+    return pd.Series(lookup[codes], index=values.index)
+
+
+def atomic_write(path: Path, write: Callable[[Path], None]):
+    """
+    Write a file through a temporary file in the same directory, then rename it into place.
+    
+    Every writer gets its own temporary file (tempfile.mkstemp), so processes
+    writing the same file at once (e.g. API workers cold-starting together)
+    don't truncate each other's output; the last rename wins.
+    
+    Args:
+        path: Destination file
+        write: Function writing the content to the Path it is given (which keeps
+            path's suffix, for writers that pick a format by suffix)
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=path.suffix)
+    os.close(fd)
+    try:
+        write(Path(tmp_name))
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def prune_cache(cache_dir: Path, pattern: str, keep: int = CACHE_MAX_ENTRIES) -> List[Path]:
+    """
+    Remove all but the `keep` most recently used cache entries matching a glob pattern.
+    
+    Each new data digest writes a new entry, so without pruning the cache grows
+    with every dataset refresh. Readers touch an entry on a cache hit, so entries
+    still in use count as recent. Entries another process removes first are skipped.
+    
+    Args:
+        cache_dir: Directory holding the entries
+        pattern: Glob pattern of one kind of entry (files or directories)
+        keep: Number of entries to keep
+        
+    Returns:
+        Removed paths
+    """
+    def last_used(path: Path) -> float:
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return 0.0
+    
+    entries = sorted(Path(cache_dir).glob(pattern), key=last_used, reverse=True)
+    removed = []
+    for path in entries[keep:]:
+        try:
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+            removed.append(path)
+        except OSError:
+            continue
+    return removed
+
+
+def touch_cache(path: Path):
+    """Mark a cache entry as used, so prune_cache keeps it (failures are ignored)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def trailing_quartiles(
+    prices: np.ndarray,
+    series_start: np.ndarray,
+    window: int = QUALITY_WINDOW,
+    min_periods: int = QUALITY_MIN_HISTORY
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Q1, median and Q3 of the `window` prices before each row of its series.
+    
+    The rows are laid out with `window` NaN slots in front of every series, so
+    one sliding window view covers all series without crossing into the previous one.
+    
+    Args:
+        prices: Prices ordered by series, then date
+        series_start: Boolean mask of the first row of each series
+        window: Number of earlier prices per row
+        min_periods: Rows with fewer earlier prices get NaN
+        
+    Returns:
+        Tuple of (q1, median, q3) arrays (linear interpolation, as pandas' quantile)
+    """
+    n = len(prices)
+    if n == 0:
+        return np.empty(0), np.empty(0), np.empty(0)
+    series_id = np.cumsum(series_start) - 1
+    slots = np.arange(n) + window * (series_id + 1)
+    padded = np.full(n + window * (series_id[-1] + 1), np.nan)
+    padded[slots] = prices
+    
+    # NaN sorts last, so the first `count` values of each sorted window are its prices
+    earlier = np.sort(np.lib.stride_tricks.sliding_window_view(padded, window)[slots - window], axis=1)
+    count = window - np.isnan(earlier).sum(axis=1)
+    rows = np.arange(n)
+    
+    def quantile(q: float) -> np.ndarray:
+        h = np.maximum(count - 1, 0) * q
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+        value = earlier[rows, lo] + (h - lo) * (earlier[rows, hi] - earlier[rows, lo])
+        return np.where(count >= min_periods, value, np.nan)
+    
+    return quantile(0.25), quantile(0.5), quantile(0.75)
 
 
 class MandiDataLoader:
@@ -30,20 +261,38 @@ class MandiDataLoader:
     Loads and processes real mandi price data from Kaggle dataset.
     """
     
-    def __init__(self, data_path: Optional[str] = None):
+    def __init__(
+        self,
+        data_path: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        states: Optional[List[str]] = None,
+        crops: Optional[List[str]] = None,
+        mandi_config: Optional[Dict[str, Dict]] = None,
+        traffic_seed: int = 42
+    ):
         """
         Initialize the data loader.
         
         Args:
             data_path: Path to the Kaggle CSV file. If None, will look in data/ directory.
+            cache_dir: Directory for the processed-data cache (defaults to ml_arbitrage/cache)
+            states: States to keep (default: Gujarat)
+            crops: Commodities to keep (default: Onion, Tomato, Potato)
+            mandi_config: Known mandis with exact distances (default: Gandhinagar-relative Gujarat mandis)
+            traffic_seed: Seed for the deterministic traffic-score noise
         """
         self.data_path = data_path
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
         self.raw_data = None
         self.processed_data = None
+        self.partitions = {}  # {(state, crop): processed DataFrame}
+        self._aliases = None  # {'market'|'commodity'|'state': {raw string: standard name}}
+        self._aliases_dirty = False
+        self.quality_report = {}
         
         # Mandi configuration with distances from Gandhinagar (Gujarat)
         # These are realistic mandis in Gujarat with actual distances
-        self.mandi_config = {
+        self.mandi_config = mandi_config or {
             'Ahmedabad': {'distance_km': 26, 'state': 'Gujarat', 'district': 'Ahmedabad'},
             'Mehsana': {'distance_km': 62, 'state': 'Gujarat', 'district': 'Mahesana'},
             'Rajkot': {'distance_km': 237, 'state': 'Gujarat', 'district': 'Rajkot'},
@@ -55,7 +304,9 @@ class MandiDataLoader:
         
         # Crops we're interested in - Updated to match actual Kaggle dataset commodities
         # The dataset focuses on vegetables/fruits rather than grains/fiber crops
-        self.target_crops = ['Onion', 'Tomato', 'Potato']
+        self.target_crops = crops or ['Onion', 'Tomato', 'Potato']
+        self.target_states = states or ['Gujarat']
+        self.traffic_seed = traffic_seed
         
     def load_data(self, csv_path: str) -> pd.DataFrame:
         """
@@ -73,10 +324,106 @@ class MandiDataLoader:
         print(f"   Columns: {list(self.raw_data.columns)}")
         return self.raw_data
     
+    def load_data_streaming(
+        self,
+        csv_path: str,
+        memory_budget_mb: float = 256,
+        chunksize: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Load only the target-state / target-crop rows of a (national) CSV in chunks.
+        
+        Only the columns filter_and_process needs are parsed, all as strings, and
+        the State/Commodity filters are applied per chunk, so the full file is
+        never materialized. The result is stored in self.raw_data and can be fed
+        to filter_and_process as usual.
+        
+        Args:
+            csv_path: Path to the CSV file
+            memory_budget_mb: Approximate memory allowed for one parsed chunk
+            chunksize: Rows per chunk (overrides the size derived from memory_budget_mb)
+            
+        Returns:
+            Pre-filtered raw DataFrame
+        """
+        print(f"📊 Streaming data from: {csv_path}")
+        header = pd.read_csv(csv_path, nrows=0).columns
+        usecols = [c for c in header if self._canonical_column(c) in STREAMING_COLUMNS]
+        dtypes = {c: str for c in usecols}
+        
+        if chunksize is None:
+            sample = pd.read_csv(csv_path, usecols=usecols, dtype=dtypes, nrows=1000)
+            bytes_per_row = max(sample.memory_usage(deep=True).sum() / max(len(sample), 1), 1)
+            chunksize = max(int(memory_budget_mb * 1024 * 1024 / bytes_per_row), 1000)
+        
+        total_rows = 0
+        kept = []
+        for chunk in pd.read_csv(csv_path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+            total_rows += len(chunk)
+            chunk = self._filter_state_and_crops(self._standardize_columns(chunk))
+            if len(chunk):
+                kept.append(chunk)
+        
+        if kept:
+            self.raw_data = pd.concat(kept, ignore_index=True)
+        else:
+            self.raw_data = self._standardize_columns(
+                pd.read_csv(csv_path, usecols=usecols, dtype=dtypes, nrows=0)
+            )
+        print(f"✅ Scanned {total_rows:,} records in chunks of {chunksize:,}, kept {len(self.raw_data):,}")
+        return self.raw_data
+    
+    def load_processed(
+        self,
+        csv_path: str,
+        days: int = None,
+        end_date: Optional[str] = None,
+        use_cache: bool = True,
+        memory_budget_mb: Optional[float] = None,
+        quality_check: bool = True
+    ) -> pd.DataFrame:
+        """
+        Load the processed dataset, reusing the on-disk cache when possible.
+        
+        The cache is keyed on the SHA-256 of the source CSV plus the filter
+        arguments, so a warm start skips CSV parsing and filter_and_process
+        entirely and only rebuilds when the CSV (or the filters) change.
+        
+        Args:
+            csv_path: Path to the raw Kaggle CSV file
+            days: Passed through to filter_and_process
+            end_date: Passed through to filter_and_process
+            use_cache: Set False to force a full rebuild (the cache is still refreshed)
+            memory_budget_mb: If set, rebuild via load_data_streaming with this chunk budget
+            quality_check: Passed through to filter_and_process
+            
+        Returns:
+            Processed DataFrame (same schema as filter_and_process)
+        """
+        cache_path = self._processed_cache_path(csv_path, days, end_date, quality_check)
+        
+        if use_cache and cache_path.exists():
+            try:
+                self.processed_data = self._read_frame(cache_path)
+                touch_cache(cache_path)
+                print(f"⚡ Loaded {len(self.processed_data):,} processed records from cache: {cache_path.name}")
+                return self.processed_data
+            except Exception as e:
+                print(f"⚠️  Ignoring unreadable cache {cache_path.name}: {e}")
+        
+        if memory_budget_mb is not None:
+            self.load_data_streaming(csv_path, memory_budget_mb=memory_budget_mb)
+        else:
+            self.load_data(csv_path)
+        df = self.filter_and_process(days=days, end_date=end_date, quality_check=quality_check)
+        self._write_cache(df, cache_path)
+        return df
+    
     def filter_and_process(
         self, 
         days: int = None,  # None = use ALL available data
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        quality_check: bool = True
     ) -> pd.DataFrame:
         """
         Filter data for target mandis and crops, then add features.
@@ -86,6 +433,7 @@ class MandiDataLoader:
         Args:
             days: Number of days of historical data to use (None = ALL data for best accuracy)
             end_date: End date for filtering (format: 'YYYY-MM-DD'). If None, uses latest date.
+            quality_check: Merge duplicate key-days and clip outliers (see apply_quality_checks)
             
         Returns:
             Processed DataFrame ready for model training
@@ -93,46 +441,294 @@ class MandiDataLoader:
         if self.raw_data is None:
             raise ValueError("Must call load_data() first!")
         
-        df = self.raw_data.copy()
-        
-        # Clean URL-encoded column names (real Kaggle data has Min_x0020_Price format)
-        df.columns = df.columns.str.replace('_x0020_', '_', regex=False)
-        
-        # Standardize column names (some datasets vary)
-        column_mapping = {
-            'arrival_date': 'Arrival_Date',
-            'state': 'State',
-            'district': 'District', 
-            'market': 'Market',
-            'commodity': 'Commodity',
-            'variety': 'Variety',
-            'min_price': 'Min_Price',
-            'max_price': 'Max_Price',
-            'modal_price': 'Modal_Price'
+        df = self._standardize_records(self.raw_data.copy())
+        
+        # Filter for recent data (or ALL data if days=None)
+        if end_date:
+            end = pd.to_datetime(end_date)
+        else:
+            end = df['Date'].max()
+        
+        if days is not None:
+            start = end - timedelta(days=days)
+            df = df[(df['Date'] >= start) & (df['Date'] <= end)]
+            print(f"   Using last {days} days of data")
+        else:
+            # Use ALL available data for maximum training accuracy
+            df = df[df['Date'] <= end]
+            print(f"   Using ALL available historical data")
+        
+        self.processed_data = self._derive_features(df)
+        if quality_check:
+            self.processed_data = self.apply_quality_checks(self.processed_data)
+        
+        # Sort by date
+        self.processed_data = self.processed_data.sort_values('Date').reset_index(drop=True)
+        
+        print(f"\n✅ Processed {len(self.processed_data):,} records")
+        print(f"   Date range: {self.processed_data['Date'].min()} to {self.processed_data['Date'].max()}")
+        print(f"   States: {self.processed_data['State'].unique().tolist()}")
+        print(f"   Mandis: {self.processed_data['Mandi_Name'].unique().tolist()}")
+        print(f"   Crops: {self.processed_data['Crop'].unique().tolist()}")
+        
+        return self.processed_data
+    
+    def apply_quality_checks(self, df: pd.DataFrame, iqr_factor: float = QUALITY_IQR_FACTOR) -> pd.DataFrame:
+        """
+        Data quality pass run before feature engineering.
+        
+        1. Varieties and sub-yards (e.g. "Rajkot(Veg.Sub Yard)") collapse onto the
+           same (Date, Mandi_Name, Crop) key; those rows are merged into one per
+           key-day using the median modal price, so one row means one day.
+        2. Prices outside the fences of the previous QUALITY_WINDOW prices of their
+           (mandi, crop) series (see iqr_fences) are clipped to the fence.
+        
+        Counts are stored in self.quality_report.
+        
+        Args:
+            df: Processed DataFrame
+            iqr_factor: Fence multiplier k
+            
+        Returns:
+            Cleaned DataFrame (same schema)
+        """
+        n_before = len(df)
+        df = self._merge_duplicate_days(df)
+        duplicates_merged = n_before - len(df)
+        
+        # Fences from each series' earlier prices only (the row itself excluded)
+        mandi, crop = df['Mandi_Name'].cat.codes.to_numpy(), df['Crop'].cat.codes.to_numpy()
+        order = np.lexsort((df['Date'].to_numpy(), crop, mandi))
+        mandi, crop = mandi[order], crop[order]
+        series_start = np.r_[True, (mandi[1:] != mandi[:-1]) | (crop[1:] != crop[:-1])]
+        quartiles = trailing_quartiles(df['Price_per_kg'].to_numpy(np.float64)[order], series_start)
+        lower, upper = np.empty(len(df)), np.empty(len(df))
+        lower[order], upper[order] = self._fences(*quartiles, iqr_factor)
+        
+        # Rows without enough history get NaN fences and are left as they are
+        outliers = (df['Price_per_kg'] < lower) | (df['Price_per_kg'] > upper)
+        df['Price_per_kg'] = df['Price_per_kg'].clip(lower, upper).astype(np.float32)
+        
+        self.quality_report = {
+            'input_records': n_before,
+            'duplicates_merged': int(duplicates_merged),
+            'outliers_clipped': int(outliers.sum()),
+            'output_records': len(df)
         }
-        df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns}, inplace=True)
+        print(f"🧹 Quality pass: merged {duplicates_merged:,} duplicate key-day rows, "
+              f"clipped {int(outliers.sum()):,} outlier prices")
         
-        # Convert date column
-        date_col = 'Arrival_Date' if 'Arrival_Date' in df.columns else 'Date'
-        df[date_col] = pd.to_datetime(df[date_col], format='%d/%m/%Y', errors='coerce')
-        df = df.dropna(subset=[date_col])
-        df.rename(columns={date_col: 'Date'}, inplace=True)
+        return df
+    
+    @staticmethod
+    def iqr_fences(prices: pd.Series, iqr_factor: float = QUALITY_IQR_FACTOR) -> Tuple[float, float]:
+        """
+        Quality-pass fences for the next price of one series.
         
-        # Filter for Gujarat state
-        if 'State' in df.columns:
-            df = df[df['State'].str.contains('Gujarat', case=False, na=False)]
+        Args:
+            prices: Price_per_kg of one (mandi, crop) series in date order
+            iqr_factor: Fence multiplier k
+            
+        Returns:
+            Tuple of (Q1 - k*spread, Q3 + k*spread) of the last QUALITY_WINDOW prices,
+            (-inf, inf) with fewer than QUALITY_MIN_HISTORY prices
+        """
+        recent = prices.iloc[-QUALITY_WINDOW:].astype(np.float64)
+        if len(recent) < QUALITY_MIN_HISTORY:
+            return float('-inf'), float('inf')
+        lower, upper = MandiDataLoader._fences(*(recent.quantile(q) for q in (0.25, 0.5, 0.75)), iqr_factor)
+        return float(lower), float(upper)
+    
+    @staticmethod
+    def _fences(q1, median, q3, iqr_factor: float):
+        """Tukey fences with the spread floored at QUALITY_MIN_SPREAD * median."""
+        spread = np.maximum(q3 - q1, QUALITY_MIN_SPREAD * median)
+        return q1 - iqr_factor * spread, q3 + iqr_factor * spread
+    
+    @staticmethod
+    def _merge_duplicate_days(df: pd.DataFrame) -> pd.DataFrame:
+        """Collapse rows sharing a (Date, Mandi_Name, Crop) key, taking the median price."""
+        df = df.groupby(['Date', 'Mandi_Name', 'Crop'], observed=True, sort=False, as_index=False).agg(
+            State=('State', 'first'),
+            Distance_km=('Distance_km', 'mean'),
+            Price_per_kg=('Price_per_kg', 'median'),
+            Traffic_Congestion_Score=('Traffic_Congestion_Score', 'mean'),
+        )
+        return df[['Date', 'State', 'Mandi_Name', 'Crop', 'Distance_km',
+                   'Price_per_kg', 'Traffic_Congestion_Score']].astype(PROCESSED_DTYPES)
+    
+    def append_arrivals(self, new_rows: pd.DataFrame) -> Dict:
+        """
+        Incrementally add a batch of new raw arrival records to processed_data.
+        
+        Only the new rows are standardized, filtered and enriched, so a daily
+        refresh costs O(new rows) of processing instead of a full
+        load_data() + filter_and_process() rebuild. Rows for a (Date, Mandi_Name,
+        Crop) key-day that is already present are merged with the existing row
+        (median price, as in apply_quality_checks), so there stays one row per key-day.
+        
+        Args:
+            new_rows: Raw records in the Kaggle/AGMARKNET schema (same columns as the CSV)
+            
+        Returns:
+            Dictionary with the number of records added, the number of existing
+            key-days merged into and the (mandi, crop) series that changed
+        """
+        if self.processed_data is None:
+            raise ValueError("Must call filter_and_process() or load_processed() first!")
+        
+        new = self._derive_features(self._standardize_records(new_rows.copy()))
+        # One row per key-day within the batch (outlier fences need history, so no clipping here)
+        new = self._merge_duplicate_days(new)
+        if len(new) == 0:
+            return {'records_added': 0, 'records_merged': 0, 'changed_series': []}
+        
+        old = self.processed_data
+        
+        # Existing rows of the batch's key-days (only rows from the batch's first day on can match)
+        keys = ['Date', 'Mandi_Name', 'Crop']
+        overlap = np.zeros(len(old), dtype=bool)
+        candidates = np.flatnonzero((old['Date'] >= new['Date'].min()).to_numpy())
+        if len(candidates):
+            new_keys = pd.MultiIndex.from_arrays([new[col].astype(str) if col != 'Date' else new[col] for col in keys])
+            old_part = old.iloc[candidates]
+            old_keys = pd.MultiIndex.from_arrays(
+                [old_part[col].astype(str) if col != 'Date' else old_part[col] for col in keys]
+            )
+            overlap[candidates] = old_keys.isin(new_keys)
+        n_merged = int(overlap.sum())
+        
+        if n_merged:
+            new = self._merge_duplicate_days(self._concat_processed([old[overlap], new]))
+            old = old[~overlap]
+        
+        combined = self._concat_processed([old, new])
+        # Arrivals normally come in date order; only re-sort for back-filled or merged days
+        if len(old) and (n_merged or new['Date'].min() < old['Date'].max()):
+            combined = combined.sort_values('Date', kind='stable').reset_index(drop=True)
+        self.processed_data = combined
+        
+        changed = new[['Mandi_Name', 'Crop']].drop_duplicates()
+        changed_series = [(str(m), str(c)) for m, c in zip(changed['Mandi_Name'], changed['Crop'])]
+        
+        print(f"➕ Appended {len(new) - n_merged:,} records ({n_merged:,} merged into existing key-days) "
+              f"across {len(changed_series)} mandi-crop series")
         
+        return {'records_added': len(new) - n_merged, 'records_merged': n_merged, 'changed_series': changed_series}
+    
+    def partition(self) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        Split processed_data into per-(state, crop) partitions.
+        
+        Returns:
+            Dictionary mapping (state, crop) -> processed DataFrame
+        """
+        if self.processed_data is None:
+            return {}
+        
+        self.partitions = {}
+        for (state, crop), group in self.processed_data.groupby(['State', 'Crop'], observed=True):
+            group = group.reset_index(drop=True)
+            for col in ('State', 'Mandi_Name', 'Crop'):
+                group[col] = group[col].cat.remove_unused_categories()
+            self.partitions[(str(state), str(crop))] = group
+        return self.partitions
+    
+    def save_partitions(self, output_dir: str):
+        """
+        Save processed data partitioned by state and crop as {output_dir}/{state}/{crop}.parquet
+        (.pkl when pyarrow is unavailable), so consumers can load just the slices they need.
+        """
+        output_dir = Path(output_dir)
+        suffix = '.parquet' if _PYARROW_AVAILABLE else '.pkl'
+        for (state, crop), part in self.partition().items():
+            (output_dir / state).mkdir(parents=True, exist_ok=True)
+            self._write_frame(part, output_dir / state / f"{crop}{suffix}")
+        print(f"💾 Saved {len(self.partitions)} state-crop partitions to: {output_dir}")
+    
+    def load_partitions(
+        self,
+        input_dir: str,
+        states: Optional[List[str]] = None,
+        crops: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Load only the requested (state, crop) partitions written by save_partitions.
+        
+        Args:
+            input_dir: Directory written by save_partitions
+            states: States to load (None = all on disk)
+            crops: Crops to load (None = all on disk)
+            
+        Returns:
+            Processed DataFrame containing just the requested partitions
+        """
+        input_dir = Path(input_dir)
+        frames = []
+        for path in sorted(input_dir.glob('*/*')):
+            if path.suffix not in ('.parquet', '.pkl'):
+                continue
+            state, crop = path.parent.name, path.stem
+            if (states and state not in states) or (crops and crop not in crops):
+                continue
+            if (state, crop) not in self.partitions:
+                self.partitions[(state, crop)] = self._read_frame(path)
+            frames.append(self.partitions[(state, crop)])
+        
+        if not frames:
+            raise ValueError(f"No partitions found in {input_dir} for states={states}, crops={crops}")
+        
+        self.processed_data = self._concat_processed(frames)
+        self.processed_data = self.processed_data.sort_values('Date', kind='stable').reset_index(drop=True)
+        print(f"⚡ Loaded {len(frames)} partitions ({len(self.processed_data):,} records)")
+        return self.processed_data
+    
+    @staticmethod
+    def _concat_processed(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Concatenate processed frames while keeping the categorical columns categorical.
+        
+        Categories are extended in order of first appearance rather than re-coded,
+        so codes of the first frame stay valid.
+        """
+        aligned = [frame.copy(deep=False) for frame in frames]
+        for col in ('State', 'Mandi_Name', 'Crop'):
+            categories = aligned[0][col].cat.categories
+            for frame in aligned[1:]:
+                categories = categories.append(frame[col].cat.categories.difference(categories))
+            for frame in aligned:
+                frame[col] = frame[col].cat.set_categories(categories)
+        return pd.concat(aligned, ignore_index=True)
+    
+    def _standardize_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Standardize raw records: apply the state/crop filters, parse dates,
+        clean mandi/crop names and convert Modal_Price to ₹/kg.
+        """
+        df = self._standardize_columns(df)
+        
+        # Filter for target states (Gujarat by default) and target commodities
         # NO LONGER FILTERING BY SPECIFIC MANDIS - Include ALL Gujarat mandis!
         # This expands dataset from 7 records to ~214 records
+        df = self._filter_state_and_crops(df)
+        
+        # Convert date column (after the cheap filters, so only kept rows are parsed)
+        date_col = 'Arrival_Date' if 'Arrival_Date' in df.columns else 'Date'
+        df[date_col] = parse_arrival_dates(df[date_col])
+        df = df.dropna(subset=[date_col])
+        df.rename(columns={date_col: 'Date'}, inplace=True)
         
-        # Filter for target commodities
         commodity_col = 'Commodity' if 'Commodity' in df.columns else 'Crop'
-        df = df[df[commodity_col].str.contains('|'.join(self.target_crops), case=False, na=False)]
         
-        # Standardize market and commodity names
+        # Standardize market and commodity names (once per distinct raw string)
         market_col = 'Market' if 'Market' in df.columns else 'Mandi'
-        df['Mandi_Name'] = df[market_col].apply(self._standardize_market_name)
-        df['Crop'] = df[commodity_col].apply(self._standardize_crop_name)
+        df['Mandi_Name'] = self._map_names(df[market_col], 'market', self._standardize_market_name)
+        df['Crop'] = self._map_names(df[commodity_col], 'commodity', self._standardize_crop_name)
+        if 'State' in df.columns:
+            df['State'] = self._map_names(df['State'], 'state', self._standardize_state_name)
+        else:
+            df['State'] = self.target_states[0]
+        self._save_aliases()
         
         # Keep only records with valid mandi names
         df = df[df['Mandi_Name'].notna()]
@@ -143,51 +739,221 @@ class MandiDataLoader:
         df = df.dropna(subset=[price_col])  # Drop invalid prices
         df['Price_per_kg'] = df[price_col] / 100  # 1 quintal = 100 kg
         
-        # Filter for recent data (or ALL data if days=None)
-        if end_date:
-            end = pd.to_datetime(end_date)
-        else:
-            end = df['Date'].max()
-        
-        if days is not None:
-            start = end - timedelta(days=days)
-            df = df[(df['Date'] >= start) & (df['Date'] <= end)]
-            print(f"   Using last {days} days of data")
-        else:
-            # Use ALL available data for maximum training accuracy
-            df = df[df['Date'] <= end]
-            print(f"   Using ALL available historical data")
-        
+        return df
+    
+    def _derive_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add distance and traffic features to standardized records and select the processed schema."""
         # Add mandi features - Use district-based distance estimation
+        # (resolved once per distinct district, then broadcast via factorized codes)
         df['District'] = df['District'] if 'District' in df.columns else 'Unknown'
-        df['Distance_km'] = df.apply(
-            lambda row: self._estimate_distance_from_district(row.get('District', 'Unknown'), row['Mandi_Name']),
-            axis=1
-        )
+        df['Distance_km'] = self._estimate_distances(df['District'], df['Mandi_Name'])
         
         # Add traffic congestion score (synthetic but realistic)
         # Higher for closer mandis (more urban), varies by day of week
         df['Day_of_Week'] = df['Date'].dt.dayofweek
-        df['Traffic_Congestion_Score'] = df.apply(
-            lambda row: self._calculate_traffic_score(row['Distance_km'], row['Day_of_Week']),
-            axis=1
+        df['Traffic_Congestion_Score'] = self._calculate_traffic_scores(
+            df['Distance_km'].to_numpy(), df['Day_of_Week'].to_numpy(),
+            df['Mandi_Name'], df['Date']
         )
         
-        # Select final columns
-        self.processed_data = df[[
-            'Date', 'Mandi_Name', 'Crop', 'Distance_km', 
+        # Select final columns in the compact schema
+        return df[[
+            'Date', 'State', 'Mandi_Name', 'Crop', 'Distance_km', 
             'Price_per_kg', 'Traffic_Congestion_Score'
-        ]].copy()
+        ]].astype(PROCESSED_DTYPES)
+    
+    @staticmethod
+    def _canonical_column(name: str) -> str:
+        """Canonical name for a raw CSV column (URL-encoding and case cleaned up)."""
+        name = name.replace('_x0020_', '_')
+        return COLUMN_MAPPING.get(name, name)
+    
+    def _standardize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rename raw columns to canonical names (real Kaggle data has Min_x0020_Price format)."""
+        df.columns = [self._canonical_column(c) for c in df.columns]
+        return df
+    
+    def _filter_state_and_crops(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Keep rows for the target states and target commodities (on canonical columns)."""
+        if 'State' in df.columns:
+            df = df[df['State'].str.contains('|'.join(self.target_states), case=False, na=False)]
+        commodity_col = 'Commodity' if 'Commodity' in df.columns else 'Crop'
+        return df[df[commodity_col].str.contains('|'.join(self.target_crops), case=False, na=False)]
+    
+    def _source_digest(self, csv_path: str) -> str:
+        """
+        SHA-256 of the source CSV.
         
-        # Sort by date
-        self.processed_data = self.processed_data.sort_values('Date').reset_index(drop=True)
+        Digests are memoized per (path, size, mtime) in the cache directory so an
+        unchanged file is not re-hashed on every start.
+        """
+        path = Path(csv_path).resolve()
+        stat = path.stat()
+        index_path = self.cache_dir / "source_digests.json"
         
-        print(f"\n✅ Processed {len(self.processed_data):,} records")
-        print(f"   Date range: {self.processed_data['Date'].min()} to {self.processed_data['Date'].max()}")
-        print(f"   Mandis: {self.processed_data['Mandi_Name'].unique().tolist()}")
-        print(f"   Crops: {self.processed_data['Crop'].unique().tolist()}")
+        index = {}
+        if index_path.exists():
+            try:
+                index = json.loads(index_path.read_text())
+            except ValueError:
+                index = {}
         
-        return self.processed_data
+        entry = index.get(str(path))
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        
+        index[str(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write(index_path, lambda tmp: tmp.write_text(json.dumps(index, indent=2)))
+        except OSError as e:
+            print(f"⚠️  Could not save source digest index: {e}")
+        return digest
+    
+    def processed_key(
+        self,
+        csv_path: str,
+        days: Optional[int] = None,
+        end_date: Optional[str] = None,
+        quality_check: bool = True
+    ) -> str:
+        """
+        Fingerprint of the processed data load_processed returns for these arguments.
+        
+        It changes with the source CSV's content, the filter arguments and the
+        processing version, so anything derived from processed data (the cache,
+        a serving bundle) can be checked against the current dataset.
+        
+        Args:
+            csv_path: Path to the raw Kaggle CSV file
+            days: As for load_processed
+            end_date: As for load_processed
+            quality_check: As for load_processed
+            
+        Returns:
+            16-character hex digest
+        """
+        key = json.dumps({
+            'version': PROCESSED_CACHE_VERSION,
+            'source': self._source_digest(csv_path),
+            'days': days,
+            'end_date': end_date,
+            'quality_check': quality_check,
+            'states': self.target_states,
+            'crops': self.target_crops,
+            'traffic_seed': self.traffic_seed,
+            'mandi_config': self.mandi_config,
+        }, sort_keys=True)
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+    
+    def _processed_cache_path(
+        self,
+        csv_path: str,
+        days: Optional[int],
+        end_date: Optional[str],
+        quality_check: bool
+    ) -> Path:
+        """Cache file location for a given source file and set of filter arguments."""
+        suffix = '.parquet' if _PYARROW_AVAILABLE else '.pkl'
+        return self.cache_dir / f"processed_{self.processed_key(csv_path, days, end_date, quality_check)}{suffix}"
+    
+    @staticmethod
+    def _read_frame(path: Path) -> pd.DataFrame:
+        """Read a processed frame written by _write_frame."""
+        if path.suffix == '.parquet':
+            return pd.read_parquet(path, memory_map=True)
+        return pd.read_pickle(path)
+    
+    @staticmethod
+    def _write_frame(df: pd.DataFrame, path: Path):
+        """Atomically write a processed frame (Parquet or pickle, by file suffix)."""
+        if path.suffix == '.parquet':
+            atomic_write(path, lambda tmp: df.to_parquet(tmp, index=False))
+        else:
+            atomic_write(path, df.to_pickle)
+    
+    def _write_cache(self, df: pd.DataFrame, cache_path: Path):
+        """Write a processed frame to the cache (failures only cost the next start a rebuild)."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._write_frame(df, cache_path)
+            print(f"💾 Cached processed data: {cache_path.name}")
+            prune_cache(self.cache_dir, "processed_*")
+        except Exception as e:
+            print(f"⚠️  Could not write processed cache: {e}")
+    
+    def _map_names(self, values: pd.Series, kind: str, standardize) -> pd.Series:
+        """
+        Standardize a column of raw names by resolving each distinct string once.
+        
+        Resolved names are kept in a persisted alias table, so repeat loads only
+        run the string cleanup for names never seen before.
+        
+        Args:
+            values: Raw name column
+            kind: Alias table section ('market', 'commodity' or 'state')
+            standardize: Per-value standardizer used for unseen names
+            
+        Returns:
+            Series of standardized names (None where the name is invalid)
+        """
+        aliases = self._load_aliases()[kind]
+        codes, uniques = pd.factorize(values)
+        
+        resolved = []
+        for raw in uniques:
+            raw = str(raw)
+            if raw not in aliases:
+                aliases[raw] = standardize(raw)
+                self._aliases_dirty = True
+            resolved.append(aliases[raw])
+        
+        # Append a None slot so NaN (code -1) maps to "invalid"
+        lookup = np.array(resolved + [None], dtype=object)
+        return pd.Series(lookup[codes], index=values.index)
+    
+    def _load_aliases(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """Load the persisted alias table, dropping sections that depend on a different crop/state config."""
+        if self._aliases is not None:
+            return self._aliases
+        
+        self._aliases = {'market': {}, 'commodity': {}, 'state': {}}
+        alias_path = self.cache_dir / "name_aliases.json"
+        if alias_path.exists():
+            try:
+                stored = json.loads(alias_path.read_text())
+            except ValueError:
+                stored = {}
+            self._aliases['market'] = stored.get('market', {})
+            if stored.get('crops') == self.target_crops:
+                self._aliases['commodity'] = stored.get('commodity', {})
+            if stored.get('states') == self.target_states:
+                self._aliases['state'] = stored.get('state', {})
+        return self._aliases
+    
+    def _save_aliases(self):
+        """Persist the alias table if new names were resolved."""
+        if not self._aliases_dirty:
+            return
+        
+        content = json.dumps({
+            'crops': self.target_crops,
+            'states': self.target_states,
+            **self._aliases
+        }, indent=2, ensure_ascii=False)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write(self.cache_dir / "name_aliases.json", lambda tmp: tmp.write_text(content))
+        except OSError as e:
+            print(f"⚠️  Could not save name aliases: {e}")
+            return
+        self._aliases_dirty = False
     
     def _standardize_market_name(self, market_name: str) -> Optional[str]:
         """Clean and standardize market name."""
@@ -204,6 +970,17 @@ class MandiDataLoader:
         
         return cleaned if cleaned else None
     
+    def _standardize_state_name(self, state: str) -> Optional[str]:
+        """Map raw state strings to the configured target state names."""
+        if pd.isna(state):
+            return None
+        
+        state_lower = str(state).lower()
+        for target in self.target_states:
+            if target.lower() in state_lower:
+                return target
+        return None
+    
     def _standardize_crop_name(self, commodity: str) -> Optional[str]:
         """Map various commodity formats to standard crop names."""
         if pd.isna(commodity):
@@ -215,41 +992,117 @@ class MandiDataLoader:
                 return crop
         return None
     
-    def _calculate_traffic_score(self, distance: float, day_of_week: int) -> float:
+    def _calculate_traffic_score(
+        self,
+        distance: float,
+        day_of_week: int,
+        mandi_name: str,
+        date: pd.Timestamp
+    ) -> float:
         """
-        Calculate synthetic traffic congestion score (0-1).
+        Calculate synthetic traffic congestion score (0-1) for a single record.
+        
+        Scalar wrapper around _calculate_traffic_scores.
+        
+        Args:
+            distance: Distance from base location in km
+            day_of_week: 0=Monday, 6=Sunday
+            mandi_name: Mandi name (keys the deterministic noise)
+            date: Record date (keys the deterministic noise)
+            
+        Returns:
+            Congestion score between 0 and 1
+        """
+        return float(self._calculate_traffic_scores(
+            np.array([distance]), np.array([day_of_week]),
+            pd.Series([mandi_name]), pd.Series([pd.Timestamp(date)])
+        )[0])
+    
+    def _calculate_traffic_scores(
+        self,
+        distance: np.ndarray,
+        day_of_week: np.ndarray,
+        mandi_names: pd.Series,
+        dates: pd.Series
+    ) -> np.ndarray:
+        """
+        Calculate synthetic traffic congestion scores (0-1) for arrays of records.
         
         Logic:
         - Closer mandis (urban) have higher base congestion
         - Weekdays (Mon-Fri) have higher traffic than weekends
-        - Random variation added for realism
+        - Small variation for realism, derived from a hash of (mandi, date, seed)
+          so repeated loads produce bit-identical scores
         
         Args:
-            distance: Distance from base location in km
+            distance: Distances from base location in km
             day_of_week: 0=Monday, 6=Sunday
+            mandi_names: Mandi names (same length)
+            dates: Record dates (same length)
             
         Returns:
-            Congestion score between 0 and 1
+            Array of congestion scores between 0 and 1
         """
+        distance = np.asarray(distance, dtype=float)
+        day_of_week = np.asarray(day_of_week)
+        
         # Base congestion: higher for closer (urban) markets
-        if distance < 50:
-            base = 0.7
-        elif distance < 150:
-            base = 0.4
+        base = np.select([distance < 50, distance < 150], [0.7, 0.4], default=0.2)
+        
+        # Weekday multiplier: Monday-Friday vs weekend
+        weekday_factor = np.where(day_of_week < 5, 1.2, 0.7)
+        
+        # Add small deterministic noise in [-0.1, 0.1)
+        noise = -0.1 + 0.2 * self._traffic_noise_uniform(mandi_names, dates)
+        
+        return np.clip(base * weekday_factor + noise, 0, 1)
+    
+    def _traffic_noise_uniform(self, mandi_names: pd.Series, dates: pd.Series) -> np.ndarray:
+        """
+        Deterministic uniform [0, 1) values keyed on (mandi, calendar day, traffic_seed).
+        
+        Mandi names are hashed once per distinct name with pandas' fixed-key
+        hash (stable across processes, unlike Python's hash()), combined with
+        the day number and seed, and mixed with the SplitMix64 finalizer.
+        """
+        names = pd.Series(mandi_names)
+        if isinstance(names.dtype, pd.CategoricalDtype):
+            codes, uniques = names.cat.codes.to_numpy(), names.cat.categories.astype(str)
         else:
-            base = 0.2
+            codes, uniques = pd.factorize(names.astype(str))
+        name_hash = pd.util.hash_array(np.asarray(uniques, dtype=object))[codes]
         
-        # Weekday multiplier
-        if day_of_week < 5:  # Monday-Friday
-            weekday_factor = 1.2
-        else:  # Weekend
-            weekday_factor = 0.7
+        day = pd.Series(dates).to_numpy().astype('datetime64[D]').astype(np.int64).astype(np.uint64)
         
-        # Add small random noise
-        noise = np.random.uniform(-0.1, 0.1)
+        with np.errstate(over='ignore'):
+            h = name_hash ^ (day * np.uint64(0x9E3779B97F4A7C15)) ^ np.uint64(self.traffic_seed)
+            h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            h = h ^ (h >> np.uint64(31))
         
-        score = base * weekday_factor + noise
-        return np.clip(score, 0, 1)
+        # Top 53 bits -> float in [0, 1)
+        return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+    
+    def _estimate_distances(self, districts: pd.Series, mandi_names: pd.Series) -> pd.Series:
+        """
+        Vectorized _estimate_distance_from_district over whole columns.
+        
+        Configured mandis are mapped directly; everything else goes through a
+        district lookup table built once per distinct district string.
+        
+        Args:
+            districts: District column
+            mandi_names: Standardized mandi name column (same index)
+            
+        Returns:
+            Series of estimated distances in km
+        """
+        codes, uniques = pd.factorize(districts, use_na_sentinel=False)
+        lookup = np.array([self._district_distance(d) for d in uniques], dtype=float)
+        by_district = pd.Series(lookup[codes], index=districts.index)
+        
+        configured = {name: cfg['distance_km'] for name, cfg in self.mandi_config.items()}
+        return mandi_names.map(configured).astype(float).fillna(by_district)
     
     def _estimate_distance_from_district(self, district: str, mandi_name: str) -> float:
         """
@@ -269,44 +1122,20 @@ class MandiDataLoader:
         if mandi_name in self.mandi_config:
             return self.mandi_config[mandi_name]['distance_km']
         
-        # District-to-Gandhinagar approximate distances (km)
-        district_distances = {
-            'Ahmedabad': 30,
-            'Gandhinagar': 5,
-            'Mahesana': 45,  # Also "Mehsana"
-            'Mehsana': 45,
-            'Rajkot': 220,
-            'Surat': 265,
-            'Vadodara': 100,
-            'Anand': 65,
-            'Bharuch': 180,
-            'Amreli': 240,
-            'Bhavnagar': 200,
-            'Jamnagar': 330,
-            'Junagadh': 330,
-            'Kutch': 350,
-            'Patan': 120,
-            'Porbandar': 400,
-            'Sabarkantha': 90,
-            'Surendranagar': 160,
-            'Tapi': 300,
-            'Dang': 200,
-            'Narmada': 150,
-            'Navsari': 280,
-            'Valsad': 300,
-            'Medinipur': 150,  # Fallback
-        }
-        
+        return self._district_distance(district)
+    
+    def _district_distance(self, district: str) -> float:
+        """Distance of a district headquarters from Gandhinagar (exact, then partial match)."""
         # Clean district name
         district_clean = str(district).strip() if district else 'Unknown'
         
         # Try exact match first
-        if district_clean in district_distances:
-            return district_distances[district_clean]
+        if district_clean in DISTRICT_DISTANCES:
+            return DISTRICT_DISTANCES[district_clean]
         
         # Try partial match (case-insensitive)
         district_lower = district_clean.lower()
-        for dist_name, dist_km in district_distances.items():
+        for dist_name, dist_km in DISTRICT_DISTANCES.items():
             if dist_name.lower() in district_lower or district_lower in dist_name.lower():
                 return dist_km
         
@@ -314,56 +1143,89 @@ class MandiDataLoader:
         return 150
     
     
-    def generate_synthetic_data(self, days: int = 90) -> pd.DataFrame:
+    def generate_synthetic_data(
+        self,
+        days: int = 90,
+        n_mandis: Optional[int] = None,
+        n_crops: Optional[int] = None,
+        seed: Optional[int] = None
+    ) -> pd.DataFrame:
         """
         Generate synthetic data if real data is not available.
-        This is a fallback option for testing.
+        This is a fallback option for testing, and with n_mandis/n_crops a
+        bulk generator for load-testing training and the API at scale.
+        
+        The whole dates x mandis x crops grid is built with NumPy broadcasting
+        directly into the processed schema (categorical keys from codes), so
+        years of data for hundreds of mandis take seconds.
         
         Args:
             days: Number of days to generate
+            n_mandis: Total mandis; extra synthetic mandis are added beyond mandi_config
+            n_crops: Total crops; extra synthetic crops are added beyond target_crops
+            seed: Seed for the price noise and synthetic mandi/crop parameters
             
         Returns:
             DataFrame with synthetic price data
         """
         print(f"⚠️  Generating synthetic data (fallback mode)")
+        rng = np.random.default_rng(seed)
         
-        dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-        data = []
+        dates = pd.date_range(end=datetime.now(), periods=days, freq='D').normalize()
         
-        # Base prices (₹/kg)
+        # Mandis: configured ones first, then synthetic ones at random distances
+        mandis = list(self.mandi_config)
+        mandi_distances = [cfg['distance_km'] for cfg in self.mandi_config.values()]
+        mandi_states = [cfg.get('state', self.target_states[0]) for cfg in self.mandi_config.values()]
+        for i in range(len(mandis), n_mandis or len(mandis)):
+            mandis.append(f"Synthetic_Mandi_{i + 1:04d}")
+            mandi_distances.append(float(rng.uniform(10, 400)))
+            mandi_states.append(self.target_states[i % len(self.target_states)])
+        
+        # Base prices (₹/kg); unknown and synthetic crops get a random base price
         base_prices = {
             'Onion': 35,
             'Tomato': 26,
             'Potato': 33
         }
+        crops = list(self.target_crops)
+        for i in range(len(crops), n_crops or len(crops)):
+            crops.append(f"Synthetic_Crop_{i + 1:03d}")
+        crop_base = np.array([base_prices.get(crop) or rng.uniform(15, 60) for crop in crops])
+        
+        n_days, n_m, n_c = len(dates), len(mandis), len(crops)
+        distance = np.array(mandi_distances, dtype=float)
+        
+        # Add trend and seasonality (per day), price increases with distance (per mandi)
+        t = np.arange(n_days, dtype=float)[:, None, None]
+        trend = t * 0.02
+        seasonal = 5 * np.sin(2 * np.pi * t / 30)
+        distance_premium = (distance * 0.05)[None, :, None]
+        noise = rng.normal(0, 2, size=(n_days, n_m, n_c))
+        
+        price = crop_base[None, None, :] + trend + seasonal + noise + distance_premium
+        price = np.maximum(price, crop_base[None, None, :] * 0.8)  # Floor price
+        
+        # Flatten in (date, mandi, crop) order
+        day_idx = np.repeat(np.arange(n_days), n_m * n_c)
+        mandi_idx = np.tile(np.repeat(np.arange(n_m), n_c), n_days)
+        crop_idx = np.tile(np.arange(n_c), n_days * n_m)
+        
+        state_codes, state_names = pd.factorize(pd.Series(mandi_states))
+        mandi_col = pd.Categorical.from_codes(mandi_idx, categories=mandis)
+        date_col = dates[day_idx]
         
-        for date in dates:
-            for mandi, config in self.mandi_config.items():
-                for crop in self.target_crops:
-                    # Add trend and seasonality
-                    trend = (date - dates[0]).days * 0.02
-                    seasonal = 5 * np.sin(2 * np.pi * (date - dates[0]).days / 30)
-                    noise = np.random.normal(0, 2)
-                    
-                    # Price increases with distance (economic principle)
-                    distance_premium = config['distance_km'] * 0.05
-                    
-                    price = base_prices[crop] + trend + seasonal + noise + distance_premium
-                    price = max(price, base_prices[crop] * 0.8)  # Floor price
-                    
-                    data.append({
-                        'Date': date,
-                        'Mandi_Name': mandi,
-                        'Crop': crop,
-                        'Distance_km': config['distance_km'],
-                        'Price_per_kg': round(price, 2),
-                        'Traffic_Congestion_Score': self._calculate_traffic_score(
-                            config['distance_km'], 
-                            date.dayofweek
-                        )
-                    })
-        
-        self.processed_data = pd.DataFrame(data)
+        self.processed_data = pd.DataFrame({
+            'Date': date_col,
+            'State': pd.Categorical.from_codes(state_codes[mandi_idx], categories=state_names),
+            'Mandi_Name': mandi_col,
+            'Crop': pd.Categorical.from_codes(crop_idx, categories=crops),
+            'Distance_km': distance[mandi_idx],
+            'Price_per_kg': np.round(price.ravel(), 2),
+            'Traffic_Congestion_Score': self._calculate_traffic_scores(
+                distance[mandi_idx], date_col.dayofweek, pd.Series(mandi_col), pd.Series(date_col)
+            )
+        }).astype(PROCESSED_DTYPES)
         print(f"✅ Generated {len(self.processed_data):,} synthetic records")
         
         return self.processed_data
@@ -382,9 +1244,11 @@ class MandiDataLoader:
                 'end': str(df['Date'].max()),
                 'days': (df['Date'].max() - df['Date'].min()).days
             },
+            'states': df['State'].unique().tolist(),
             'mandis': df['Mandi_Name'].unique().tolist(),
             'crops': df['Crop'].unique().tolist(),
-            'price_stats': df.groupby('Crop')['Price_per_kg'].agg(['min', 'max', 'mean']).to_dict()
+            'price_stats': df.groupby('Crop', observed=True)['Price_per_kg'].agg(['min', 'max', 'mean']).to_dict(),
+            'quality_report': self.quality_report
         }
         
         return stats
@@ -0,0 +1,364 @@
+"""
+Incremental Feature Engine
+==========================
+
+Keeps the rolling state behind PricePredictor.prepare_features for every
+(mandi, crop) series - a ring buffer of the last 14 prices plus running sums
+and sums of squares for the 7/14-observation windows - so feature rows for
+newly arrived days can be emitted in O(series) time instead of recomputing
+the whole history. The spatial features come from the same state: the last
+price of every series is what its neighbours know about it.
+
+Output matches prepare_features (observation-based or calendar-aligned
+windows) for rows that come after the history the engine was built from. PricePredictor.update_models
+uses it to feature reported sales; PricePredictor's recursive forecasts read
+next_features() for each forecast day and push() its predicted prices.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .features import (FEATURE_REGISTRY, PRICE_FEATURES, SPATIAL_FEATURES, TEMPORAL_FEATURES,
+                       add_temporal_features, resolve_features)
+from .spatial_features import SpatialPanel
+
+
+class IncrementalFeatureEngine:
+    """
+    Per-series rolling state for lag/rolling price features.
+    
+    Series s's i-th observed price lives in buffer[s, i % BUFFER] (its day
+    number in buffer_day); count[s] is the number of prices seen so far. With
+    one price per day, the last BUFFER prices cover every calendar-day lag and
+    window up to BUFFER days, so calendar-aligned features read the buffer too.
+    """
+    
+    BUFFER = 14  # longest lag / window
+    
+    # Computed features the engine emits (input columns pass through unchanged)
+    FEATURES = TEMPORAL_FEATURES + PRICE_FEATURES + SPATIAL_FEATURES
+    
+    def __init__(self, start_date: pd.Timestamp, calendar_aligned: bool = False):
+        """
+        Initialize an empty engine (use IncrementalFeatureEngine.from_history to build one).
+        
+        Args:
+            start_date: Reference date for days_since_start (the training history's first day)
+            calendar_aligned: Emit calendar-day instead of observation-based lags/windows
+        """
+        self.start_date = pd.Timestamp(start_date)
+        self.calendar_aligned = calendar_aligned
+        self.first_day = _day_number(self.start_date)  # calendar lags before this day are NaN
+        self._key_index: Dict[Tuple[str, str], int] = {}
+        self._states: List[str] = []
+        self.buffer = np.full((0, self.BUFFER), np.nan)
+        self.buffer_day = np.full((0, self.BUFFER), np.nan)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.earliest = np.full(0, np.nan)
+        self.sum_7 = np.zeros(0)
+        self.sum_14 = np.zeros(0)
+        self.sumsq_7 = np.zeros(0)
+        self.last_date = np.full(0, np.datetime64('NaT', 'ns'))
+    
+    @classmethod
+    def from_history(
+        cls,
+        df: pd.DataFrame,
+        start_date: Optional[pd.Timestamp] = None,
+        calendar_aligned: bool = False
+    ) -> 'IncrementalFeatureEngine':
+        """
+        Build the rolling state from processed history in one vectorized pass.
+        
+        Args:
+            df: Processed DataFrame with columns [Date, State, Mandi_Name, Crop, Price_per_kg]
+            start_date: Reference date for days_since_start (defaults to df's first date)
+            calendar_aligned: Emit calendar-day instead of observation-based lags/windows
+        
+        Returns:
+            IncrementalFeatureEngine positioned after the last row of every series
+        """
+        if start_date is None:
+            start_date = df['Date'].min() if len(df) else pd.Timestamp('today').normalize()
+        engine = cls(start_date, calendar_aligned)
+        if len(df) == 0:
+            return engine
+        # Calendar lags reach back to the history's first day, as prepare_features' calendar does
+        engine.first_day = _day_number(df['Date'].min())
+        
+        df = df.sort_values(['Mandi_Name', 'Crop', 'Date'], kind='stable')
+        grouped = df.groupby(['Mandi_Name', 'Crop'], observed=True, sort=False)
+        series_idx = grouped.ngroup().to_numpy()
+        keys = df.iloc[np.flatnonzero(grouped.cumcount().to_numpy() == 0)]
+        engine._grow(keys)
+        
+        price = df['Price_per_kg'].to_numpy(dtype=np.float64)
+        position = grouped.cumcount().to_numpy()
+        from_end = grouped.cumcount(ascending=False).to_numpy()
+        
+        engine.count[:] = np.bincount(series_idx, minlength=len(keys))
+        engine.earliest[series_idx[position == 0]] = price[position == 0]
+        engine.last_date[:] = grouped['Date'].max().to_numpy(dtype='datetime64[ns]')
+        
+        recent = from_end < cls.BUFFER
+        engine.buffer[series_idx[recent], position[recent] % cls.BUFFER] = price[recent]
+        engine.buffer_day[series_idx[recent], position[recent] % cls.BUFFER] = _day_number(df['Date'])[recent]
+        
+        last_7 = from_end < 7
+        engine.sum_7[:] = np.bincount(series_idx[last_7], weights=price[last_7], minlength=len(keys))
+        engine.sumsq_7[:] = np.bincount(series_idx[last_7], weights=price[last_7] ** 2, minlength=len(keys))
+        engine.sum_14[:] = np.bincount(series_idx[recent], weights=price[recent], minlength=len(keys))
+        
+        return engine
+    
+    @classmethod
+    def covers(cls, features: List[str]) -> bool:
+        """Whether the engine can emit these features (and their dependencies)."""
+        return all(name in cls.FEATURES or FEATURE_REGISTRY[name].compute is None
+                   for name in resolve_features(features))
+    
+    @property
+    def n_series(self) -> int:
+        return len(self.count)
+    
+    def _grow(self, keys: pd.DataFrame):
+        """Register new (mandi, crop) series with empty state."""
+        states = keys['State'] if 'State' in keys.columns else [''] * len(keys)
+        new_keys = {}
+        for m, c, state in zip(keys['Mandi_Name'], keys['Crop'], states):
+            if (str(m), str(c)) not in self._key_index:
+                new_keys.setdefault((str(m), str(c)), str(state))
+        if not new_keys:
+            return
+        
+        for key, state in new_keys.items():
+            self._key_index[key] = len(self._key_index)
+            self._states.append(state)
+        n = len(new_keys)
+        self.buffer = np.vstack([self.buffer, np.full((n, self.BUFFER), np.nan)])
+        self.buffer_day = np.vstack([self.buffer_day, np.full((n, self.BUFFER), np.nan)])
+        self.count = np.concatenate([self.count, np.zeros(n, dtype=np.int64)])
+        self.earliest = np.concatenate([self.earliest, np.full(n, np.nan)])
+        self.sum_7 = np.concatenate([self.sum_7, np.zeros(n)])
+        self.sum_14 = np.concatenate([self.sum_14, np.zeros(n)])
+        self.sumsq_7 = np.concatenate([self.sumsq_7, np.zeros(n)])
+        self.last_date = np.concatenate([self.last_date, np.full(n, np.datetime64('NaT', 'ns'))])
+    
+    def _ago(self, s: np.ndarray, periods: int) -> np.ndarray:
+        """Price `periods` observations back for series s (earliest price if history is shorter)."""
+        count = self.count[s]
+        value = self.buffer[s, (count - periods) % self.BUFFER]
+        value = np.where(count >= periods, value, self.earliest[s])
+        return np.where(count > 0, value, np.nan)
+    
+    def _emit(self, s: np.ndarray) -> Dict[str, np.ndarray]:
+        """Price features for the next observation of series s (state before the push)."""
+        count = self.count[s]
+        n_7 = np.minimum(count, 7)
+        n_14 = np.minimum(count, 14)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ma_7 = self.sum_7[s] / n_7
+            var_7 = (self.sumsq_7[s] - self.sum_7[s] ** 2 / n_7) / (n_7 - 1)
+            lag_1 = self._ago(s, 1)
+            return {
+                'price_lag_1': lag_1,
+                'price_lag_7': self._ago(s, 7),
+                'price_lag_14': self._ago(s, 14),
+                'price_ma_7': ma_7,
+                'price_ma_14': self.sum_14[s] / n_14,
+                'price_std_7': np.where(n_7 > 1, np.sqrt(np.clip(var_7, 0, None)), np.nan),
+                'price_change_7d': lag_1 / self._ago(s, 8) - 1
+            }
+    
+    def _emit_calendar(self, s: np.ndarray, day: float) -> Dict[str, np.ndarray]:
+        """Calendar-aligned price features for series s on day number `day` (state before the push)."""
+        days, values = self.buffer_day[s], self.buffer[s]
+        rows = np.arange(len(s))
+        
+        def asof(periods: int) -> np.ndarray:
+            # Last price observed on or before `periods` days earlier
+            target = day - periods
+            known = days <= target
+            latest = np.argmax(np.where(known, days, -np.inf), axis=1)
+            value = np.where(known.any(axis=1), values[rows, latest], np.nan)
+            return value if target >= self.first_day else np.full(len(s), np.nan)
+        
+        def window(size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            # Count, sum and sum of squares of prices in the `size` days before `day`
+            inside = (days >= day - size) & (days < day)
+            observed = np.where(inside, values, 0.0)
+            return inside.sum(axis=1), observed.sum(axis=1), (observed ** 2).sum(axis=1)
+        
+        n_7, sum_7, sumsq_7 = window(7)
+        n_14, sum_14, _ = window(14)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var_7 = (sumsq_7 - sum_7 ** 2 / n_7) / (n_7 - 1)
+            lag_1 = asof(1)
+            return {
+                'price_lag_1': lag_1,
+                'price_lag_7': asof(7),
+                'price_lag_14': asof(14),
+                'price_ma_7': sum_7 / n_7,
+                'price_ma_14': sum_14 / n_14,
+                'price_std_7': np.sqrt(np.clip(var_7, 0, None)),
+                'price_change_7d': lag_1 / asof(8) - 1
+            }
+    
+    def _spatial(self, rows: pd.DataFrame, date: pd.Timestamp) -> Dict[str, np.ndarray]:
+        """
+        Neighbour aggregates for rows dated `date`, from every series' last price before it.
+        
+        The reference holds all series of the rows' crops the engine knows (series
+        without a price yet included), so neighbour sets match a panel built over
+        the full frame.
+        """
+        crops = set(rows['Crop'].astype(str))
+        keys = [(key, s) for key, s in self._key_index.items() if key[1] in crops]
+        s = np.array([s for _, s in keys], dtype=np.int64)
+        count = self.count[s]
+        last_price = np.where(count > 0, self.buffer[s, (count - 1) % self.BUFFER], np.nan)
+        reference = pd.DataFrame({
+            'Date': date - pd.Timedelta(days=1),
+            'State': [self._states[i] for i in s],
+            'Mandi_Name': [key[0] for key, _ in keys],
+            'Crop': [key[1] for key, _ in keys],
+            'Price_per_kg': last_price,
+        })
+        return SpatialPanel(reference).lookup(rows)
+    
+    def _push(self, s: np.ndarray, price: np.ndarray, day: float):
+        """Append one price observed on day number `day` to each series in s, updating the running sums."""
+        count = self.count[s]
+        leaving_7 = np.where(count >= 7, self.buffer[s, (count - 7) % self.BUFFER], 0.0)
+        leaving_14 = np.where(count >= 14, self.buffer[s, count % self.BUFFER], 0.0)
+        
+        self.sum_7[s] += price - leaving_7
+        self.sumsq_7[s] += price ** 2 - leaving_7 ** 2
+        self.sum_14[s] += price - leaving_14
+        self.buffer[s, count % self.BUFFER] = price
+        self.buffer_day[s, count % self.BUFFER] = day
+        self.earliest[s] = np.where(count == 0, price, self.earliest[s])
+        self.count[s] = count + 1
+    
+    def _series_index(self, keys: List[Tuple[str, str]]) -> np.ndarray:
+        """Positions of known (mandi, crop) series."""
+        missing = [key for key in keys if key not in self._key_index]
+        if missing:
+            raise KeyError(f"Series not in the engine: {missing[:5]}")
+        return np.array([self._key_index[key] for key in keys], dtype=np.int64)
+    
+    def next_features(self, keys: List[Tuple[str, str]], date: pd.Timestamp) -> Dict[str, np.ndarray]:
+        """
+        Price features of the given series for a next observation on `date`, without advancing the state.
+        
+        A recursive forecast reads these for a future day, predicts the day's prices
+        and then push()es them. Temporal and spatial features don't depend on the
+        series' own prices; compute those with add_temporal_features and a SpatialPanel.
+        
+        Args:
+            keys: (mandi, crop) series already in the engine
+            date: Day of the next observation (after every series' last day)
+        
+        Returns:
+            Dictionary mapping each PRICE_FEATURES name -> float64 array aligned with keys
+        """
+        s = self._series_index(keys)
+        if self.calendar_aligned:
+            return self._emit_calendar(s, float(_day_number(date)))
+        return self._emit(s)
+    
+    def push(self, keys: List[Tuple[str, str]], prices: np.ndarray, date: pd.Timestamp):
+        """
+        Append one price per series observed on `date` (e.g. a forecast day's predictions).
+        
+        Raises:
+            ValueError: If `date` is not after a series' last day
+        """
+        s = self._series_index(keys)
+        date = np.datetime64(pd.Timestamp(date), 'ns')
+        if (self.last_date[s] >= date).any():
+            raise ValueError("push() needs a date after every series' last day")
+        self._push(s, np.asarray(prices, dtype=np.float64), float(_day_number(pd.Timestamp(date))))
+        self.last_date[s] = date
+    
+    def update(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Emit feature rows for newly arrived prices and advance the rolling state.
+        
+        Days are processed in order, one O(series) pass each, with at most one row
+        per series and day. Rows dated on or before the last seen day of their
+        crop are out of order for this engine (their neighbours' prices from that
+        day on are already folded in) and are rejected - rebuild with
+        from_history (or prepare_features) after back-filling history.
+        
+        Args:
+            new_rows: Processed rows with columns [Date, Mandi_Name, Crop, Price_per_kg, ...]
+        
+        Returns:
+            new_rows sorted by [Mandi_Name, Crop, Date] with the prepare_features columns added
+        
+        Raises:
+            ValueError: If rows are out of order (see above) or a series has two rows on one day
+        """
+        df = new_rows.sort_values(['Mandi_Name', 'Crop', 'Date'], kind='stable').reset_index(drop=True)
+        add_temporal_features(df, start_date=self.start_date)
+        computed = PRICE_FEATURES + SPATIAL_FEATURES
+        if len(df) == 0:
+            for col in computed:
+                df[col] = np.float32(np.nan)
+            return df
+        
+        self._grow(df.drop_duplicates(['Mandi_Name', 'Crop']))
+        series_idx = np.array([
+            self._key_index[(str(m), str(c))] for m, c in zip(df['Mandi_Name'], df['Crop'])
+        ], dtype=np.int64)
+        
+        dates = df['Date'].to_numpy(dtype='datetime64[ns]')
+        crops = pd.Series([key[1] for key in self._key_index])
+        crop_last = pd.Series(self.last_date).groupby(crops.to_numpy()).max()
+        stale = dates <= crop_last.reindex(df['Crop'].astype(str)).to_numpy(dtype='datetime64[ns]')
+        if stale.any():
+            raise ValueError(
+                f"{int(stale.sum())} rows are not newer than their crop's history; "
+                "rebuild the engine with from_history()"
+            )
+        if df.duplicated(['Mandi_Name', 'Crop', 'Date']).any():
+            raise ValueError("new_rows has several rows for one series and day")
+        
+        price = df['Price_per_kg'].to_numpy(dtype=np.float64)
+        features = np.full((len(df), len(computed)), np.nan)
+        
+        for date in np.unique(dates):
+            rows = np.flatnonzero(dates == date)
+            s = series_idx[rows]
+            day = float(_day_number(pd.Timestamp(date)))
+            emitted = self._emit_calendar(s, day) if self.calendar_aligned else self._emit(s)
+            spatial = self._spatial(df.iloc[rows], pd.Timestamp(date))
+            emitted['nearby_mean_price'] = spatial['nearby_mean_price']
+            emitted['state_median_price'] = spatial['state_median_price']
+            emitted['nearest_mandi_spread'] = emitted['price_lag_1'] - spatial['nearest_price']
+            for j, col in enumerate(computed):
+                features[rows, j] = emitted[col]
+            self._push(s, price[rows], day)
+            self.last_date[s] = date
+        
+        df[computed] = features.astype(np.float32)
+        return df
+    
+    def summary(self) -> Dict:
+        """Size of the rolling state."""
+        return {
+            'series': self.n_series,
+            'observations': int(self.count.sum()),
+            'start_date': str(self.start_date.date()),
+            'calendar_aligned': self.calendar_aligned
+        }
+
+
+def _day_number(dates):
+    """Days since the epoch of a Timestamp (int) or a date Series (float array)."""
+    if isinstance(dates, pd.Series):
+        return dates.dt.normalize().to_numpy(dtype='datetime64[D]').astype(np.int64).astype(np.float64)
+    return int(np.datetime64(pd.Timestamp(dates).normalize(), 'D').astype(np.int64))
@@ -0,0 +1,311 @@
+"""
+Feature Registry for Price Prediction
+=====================================
+
+Every model input is registered here once, with the features it depends on
+and the number of past observations (window) it needs. PricePredictor
+resolves a model's feature list against this registry, computes only what
+that list needs, and uses the same compute functions for training rows and
+for the forecast rows it builds at serving time, so the two cannot drift.
+
+Adding a feature:
+
+    @register_feature('price_ma_30', window=30)
+    def _price_ma_30(ctx):
+        return ctx.rolling(30).mean()
+
+Lags and rolling windows come from a FeatureContext, which memoizes them so
+features sharing a window (e.g. price_ma_7 and price_std_7) compute it once.
+"""
+
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .series_store import PriceSeriesStore
+from .spatial_features import SpatialPanel
+
+
+@dataclass(frozen=True)
+class Feature:
+    """A registered model input."""
+    name: str
+    compute: Optional[Callable[['FeatureContext'], object]]  # None = column of the processed frame
+    depends_on: Tuple[str, ...] = ()
+    window: int = 0  # past observations (or calendar days) of the same series needed
+    dtype: type = np.float32
+
+
+FEATURE_REGISTRY: Dict[str, Feature] = {}
+
+
+def register_feature(
+    name: str,
+    depends_on: Tuple[str, ...] = (),
+    window: int = 0,
+    dtype: type = np.float32
+):
+    """Decorator registering a compute function (ctx -> column values) under `name`."""
+    def decorator(compute):
+        FEATURE_REGISTRY[name] = Feature(name, compute, tuple(depends_on), window, dtype)
+        return compute
+    return decorator
+
+
+class FeatureContext:
+    """
+    Shared, memoized building blocks for computing features on one frame.
+    
+    The frame must be sorted by [Mandi_Name, Crop, Date]. Price lags and
+    windows only look at earlier rows of the same series (causal); rows with
+    no history get NaN, which XGBoost treats as missing.
+    """
+    
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        start_date: pd.Timestamp,
+        calendar_aligned: bool = False,
+        panel: Optional[SpatialPanel] = None
+    ):
+        """
+        Args:
+            df: Sorted frame; computed features are written into it
+            start_date: Reference date for days_since_start
+            calendar_aligned: If True, lags/windows are in calendar days (via PriceSeriesStore)
+                rather than in observations, so gaps in arrivals don't distort them
+            panel: Other mandis' prices for spatial features (built from df when omitted)
+        """
+        self.df = df
+        self.start_date = pd.Timestamp(start_date)
+        self.calendar_aligned = calendar_aligned
+        self.panel = panel
+        self._memo = {}
+    
+    def _cached(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+    
+    @property
+    def grouped(self):
+        """Price_per_kg grouped by series."""
+        return self._cached('grouped', lambda: self.df.groupby(
+            ['Mandi_Name', 'Crop'], observed=True, sort=False
+        )['Price_per_kg'])
+    
+    @property
+    def store(self) -> PriceSeriesStore:
+        """Dense calendar store and each row's (series, day) coordinates."""
+        return self._cached('store', lambda: PriceSeriesStore.from_frame(self.df))
+    
+    def _gather(self, matrix: np.ndarray) -> np.ndarray:
+        series_idx, day_idx = self._cached('locate', lambda: self.store.locate(self.df))
+        return matrix[series_idx, day_idx]
+    
+    def lag(self, periods: int) -> pd.Series:
+        """
+        Price `periods` observations (calendar days) earlier.
+        
+        In observation mode, rows with less history than the lag fall back to the
+        series' earliest price (as a short forecast context would); calendar mode
+        uses the last price observed on or before the lagged day.
+        """
+        def compute():
+            if self.calendar_aligned:
+                return pd.Series(self._gather(self.store.lag(periods, asof=True)), index=self.df.index)
+            return self.grouped.shift(periods).fillna(self._earliest())
+        return self._cached(('lag', periods), compute)
+    
+    def _earliest(self) -> pd.Series:
+        def compute():
+            has_history = self.grouped.cumcount().to_numpy() > 0
+            return self.grouped.transform('first').where(has_history)
+        return self._cached('earliest', compute)
+    
+    def spatial(self, name: str) -> np.ndarray:
+        """Neighbour aggregate for every row (see SpatialPanel.lookup)."""
+        def compute():
+            panel = self.panel if self.panel is not None else SpatialPanel(self.df)
+            return panel.lookup(self.df)
+        return self._cached('spatial', compute)[name]
+    
+    def rolling(self, window: int) -> 'WindowStats':
+        """Statistics of the previous `window` observations (calendar days), excluding the row itself."""
+        return self._cached(('rolling', window), lambda: WindowStats(self, window))
+
+
+class WindowStats:
+    """Rolling mean/std over one trailing window, computed lazily and shared between features."""
+    
+    def __init__(self, ctx: FeatureContext, window: int):
+        self.ctx = ctx
+        self.window = window
+        self._memo = {}
+    
+    def _previous_day(self, matrix: np.ndarray) -> np.ndarray:
+        # Window statistics ending the day before, so the row's own price is excluded
+        shifted = np.full_like(matrix, np.nan)
+        shifted[:, 1:] = matrix[:, :-1]
+        return self.ctx._gather(shifted)
+    
+    def _rolling(self):
+        # groupby-rolling over the previous prices; results carry a (Mandi, Crop, row) index
+        if 'rolling' not in self._memo:
+            df = self.ctx.df
+            previous = self.ctx.lag(1).groupby([df['Mandi_Name'], df['Crop']], observed=True, sort=False)
+            self._memo['rolling'] = previous.rolling(window=self.window, min_periods=1)
+        return self._memo['rolling']
+    
+    def mean(self):
+        if self.ctx.calendar_aligned:
+            return self._previous_day(self.ctx.store.rolling_mean(self.window))
+        return self._rolling().mean().droplevel([0, 1])
+    
+    def std(self):
+        if self.ctx.calendar_aligned:
+            return self._previous_day(self.ctx.store.rolling_std(self.window))
+        return self._rolling().std().droplevel([0, 1])
+
+
+# ----------------------------------------------------------------------------
+# Registered features
+# ----------------------------------------------------------------------------
+
+# Route / congestion inputs come straight from the processed frame
+FEATURE_REGISTRY['Distance_km'] = Feature('Distance_km', None)
+FEATURE_REGISTRY['Traffic_Congestion_Score'] = Feature('Traffic_Congestion_Score', None)
+
+# Series identity, used as categorical inputs by global (multi-series) models
+FEATURE_REGISTRY['Mandi_Name'] = Feature('Mandi_Name', None)
+FEATURE_REGISTRY['Crop'] = Feature('Crop', None)
+
+# Temporal features (int16 keeps the calendar columns compact)
+register_feature('day_of_week', dtype=np.int16)(lambda ctx: ctx.df['Date'].dt.dayofweek)
+register_feature('day_of_month', dtype=np.int16)(lambda ctx: ctx.df['Date'].dt.day)
+register_feature('week_of_year', dtype=np.int16)(lambda ctx: ctx.df['Date'].dt.isocalendar().week)
+register_feature('month', dtype=np.int16)(lambda ctx: ctx.df['Date'].dt.month)
+
+# Days since start (trend)
+register_feature('days_since_start', dtype=np.int32)(lambda ctx: (ctx.df['Date'] - ctx.start_date).dt.days)
+
+# Lag features (price from N observations ago)
+register_feature('price_lag_1', window=1)(lambda ctx: ctx.lag(1))
+register_feature('price_lag_7', window=7)(lambda ctx: ctx.lag(7))
+register_feature('price_lag_14', window=14)(lambda ctx: ctx.lag(14))
+
+# Rolling statistics
+register_feature('price_ma_7', window=7)(lambda ctx: ctx.rolling(7).mean())
+register_feature('price_ma_14', window=14)(lambda ctx: ctx.rolling(14).mean())
+register_feature('price_std_7', window=7)(lambda ctx: ctx.rolling(7).std())
+
+
+# Price momentum (rate of change) up to the previous observation
+@register_feature('price_change_7d', depends_on=('price_lag_1',), window=8)
+def _price_change_7d(ctx: FeatureContext):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ctx.df['price_lag_1'] / ctx.lag(8) - 1
+
+
+# Cross-mandi features: last known prices at other mandis of the same crop
+register_feature('nearby_mean_price', window=1)(lambda ctx: ctx.spatial('nearby_mean_price'))
+register_feature('state_median_price', window=1)(lambda ctx: ctx.spatial('state_median_price'))
+
+
+@register_feature('nearest_mandi_spread', depends_on=('price_lag_1',), window=1)
+def _nearest_mandi_spread(ctx: FeatureContext):
+    return ctx.df['price_lag_1'].to_numpy() - ctx.spatial('nearest_price')
+
+
+TEMPORAL_FEATURES = ['day_of_week', 'day_of_month', 'week_of_year', 'month', 'days_since_start']
+
+# Engineered price columns, kept in the loader's compact float32 schema
+PRICE_FEATURES = ['price_lag_1', 'price_lag_7', 'price_lag_14', 'price_ma_7',
+                  'price_ma_14', 'price_std_7', 'price_change_7d']
+
+SPATIAL_FEATURES = ['nearby_mean_price', 'state_median_price', 'nearest_mandi_spread']
+
+# Inputs of models trained before this registry existed; their boosters carry no
+# feature names, so they are served with this list (frozen - never edit it)
+LEGACY_FEATURES = ['Distance_km', 'Traffic_Congestion_Score'] + TEMPORAL_FEATURES + PRICE_FEATURES
+
+# The model inputs used unless a predictor is configured otherwise
+DEFAULT_FEATURES = ['Distance_km', 'Traffic_Congestion_Score'] + TEMPORAL_FEATURES + PRICE_FEATURES + SPATIAL_FEATURES
+
+
+def uses_spatial(names: List[str]) -> bool:
+    """Whether computing these features needs other mandis' prices."""
+    return any(name in SPATIAL_FEATURES for name in resolve_features(names))
+
+
+def resolve_features(names: List[str]) -> List[str]:
+    """
+    Order the given features and everything they depend on so each comes after its dependencies.
+    
+    Raises:
+        KeyError: If a feature (or dependency) is not registered
+    """
+    ordered = []
+    
+    def visit(name: str, path: Tuple[str, ...]):
+        if name in ordered:
+            return
+        if name in path:
+            raise ValueError(f"Circular feature dependency: {' -> '.join(path + (name,))}")
+        if name not in FEATURE_REGISTRY:
+            raise KeyError(f"Unknown feature '{name}'")
+        for dep in FEATURE_REGISTRY[name].depends_on:
+            visit(dep, path + (name,))
+        ordered.append(name)
+    
+    for name in names:
+        visit(name, ())
+    return ordered
+
+
+def history_window(names: List[str]) -> int:
+    """Past observations of a series needed to compute the given features."""
+    return max((FEATURE_REGISTRY[name].window for name in resolve_features(names)), default=0)
+
+
+def compute_features(
+    df: pd.DataFrame,
+    names: List[str],
+    start_date: Optional[pd.Timestamp] = None,
+    calendar_aligned: bool = False,
+    panel: Optional[SpatialPanel] = None
+):
+    """
+    Compute the given features (and their dependencies) into df, in place.
+    
+    Args:
+        df: Frame sorted by [Mandi_Name, Crop, Date] with the processed columns
+        names: Features to compute
+        start_date: Reference date for days_since_start (defaults to df's first date)
+        calendar_aligned: Calendar-day instead of observation-based lags/windows
+        panel: Other mandis' prices for spatial features (defaults to df's own rows)
+    """
+    if start_date is None:
+        start_date = df['Date'].min()
+    ctx = FeatureContext(df, start_date, calendar_aligned, panel)
+    
+    for name in resolve_features(names):
+        feature = FEATURE_REGISTRY[name]
+        if feature.compute is None:
+            if name not in df.columns:
+                raise KeyError(f"Input column '{name}' missing from the processed data")
+            continue
+        df[name] = feature.compute(ctx)
+        df[name] = df[name].astype(feature.dtype)
+
+
+def add_temporal_features(df: pd.DataFrame, start_date: pd.Timestamp):
+    """
+    Add calendar and trend columns to df in place.
+    
+    Args:
+        df: DataFrame with a Date column
+        start_date: Reference date for days_since_start (the training history's first day)
+    """
+    compute_features(df, TEMPORAL_FEATURES, start_date=start_date)
@@ -15,12 +15,16 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+import sys
 from pathlib import Path
 
-# Import our modules
-from data_loader import MandiDataLoader
-from price_predictor import PricePredictor
-from arbitrage_engine import ArbitrageEngine
+# The modules use package-relative imports, so import them through the package
+# (this also keeps `python ml_arbitrage/main.py` working from the project root)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.price_predictor import PricePredictor
+from ml_arbitrage.arbitrage_engine import ArbitrageEngine
 
 
 def print_header(title: str):
@@ -103,8 +107,8 @@ def main():
     
     predictor = PricePredictor()
     
-    print("🔧 Engineering time-series features...")
-    df_featured = predictor.prepare_features(df)
+    print("🔧 Engineering time-series features (reused from cache when the data is unchanged)...")
+    df_featured = predictor.load_features(df)
     
     print(f"   Added features: lag prices, moving averages, trends, seasonality")
     print(f"   Total features: {len(df_featured.columns)}")
@@ -278,7 +282,7 @@ def main():
     print()
     print("📁 Generated files:")
     print(f"   • {output_path}")
-    print(f"   • ml_arbitrage/models/*.pkl (trained models)")
+    print(f"   • ml_arbitrage/models/*.ubj (trained models)")
     print()
     print("🎯 Key Features:")
     print("   • Accounts for transportation costs (₹5/km)")
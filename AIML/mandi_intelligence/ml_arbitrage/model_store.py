@@ -0,0 +1,103 @@
+"""
+Model Storage for Price Predictors
+==================================
+
+Models are stored in XGBoost's native UBJSON format ({mandi}_{crop}_model.ubj)
+and loaded as bare Boosters rather than unpickled sklearn wrappers: loading is
+a plain read of a read-only file (its pages are shared through the OS page
+cache across API workers, the deserialized booster is private to each) and a
+loaded model holds only the trees. Live boosters are kept in a bounded LRU so
+thousands of registered models don't all sit in RAM.
+"""
+
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from .data_loader import atomic_write
+
+# Default number of boosters a predictor keeps in memory
+MODEL_CACHE_SIZE = 256
+
+MODEL_SUFFIX = '.ubj'
+
+
+class LRUModelCache(OrderedDict):
+    """
+    Dictionary of live models that evicts the least recently used beyond max_size.
+    
+    Every access holds a lock, so a background thread updating models (the API's
+    warm-start job) can insert and evict while request handlers read.
+    """
+    
+    def __init__(self, max_size: int = MODEL_CACHE_SIZE):
+        super().__init__()
+        self.max_size = max_size
+        self._lock = threading.RLock()
+    
+    def __getitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+            return value
+    
+    def get(self, key, default=None):
+        with self._lock:
+            return self[key] if key in self else default
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > self.max_size:
+                self.popitem(last=False)
+    
+    def pop(self, key, *default):
+        with self._lock:
+            return super().pop(key, *default)
+    
+    def __iter__(self):
+        # Iterate over a snapshot of the keys, so concurrent inserts can't break the loop
+        with self._lock:
+            return iter(list(super().__iter__()))
+
+
+def save_model(model: xgb.XGBRegressor, path: Path):
+    """Atomically write a fitted model's booster in XGBoost's native format (by path suffix)."""
+    booster = model.get_booster()
+    atomic_write(path, lambda tmp: booster.save_model(str(tmp)))
+
+
+def load_model(path: Path) -> xgb.Booster:
+    """Load a booster from a native model file, or from a legacy pickled XGBRegressor (.pkl)."""
+    if path.suffix == '.pkl':
+        with open(path, 'rb') as f:
+            return pickle.load(f).get_booster()
+    return xgb.Booster(model_file=str(path))
+
+
+def feature_names(model) -> List[str]:
+    """Input columns of a booster or sklearn model, in training order."""
+    booster = model if isinstance(model, xgb.Booster) else model.get_booster()
+    return list(booster.feature_names or [])
+
+
+def category_levels(model) -> Dict[str, List[str]]:
+    """Training levels of categorical inputs (stored as a booster attribute by fit_global_model)."""
+    booster = model if isinstance(model, xgb.Booster) else model.get_booster()
+    levels = booster.attr('category_levels')
+    return json.loads(levels) if levels else {}
+
+
+def predict(model, X: pd.DataFrame) -> np.ndarray:
+    """Predict with a booster (in-place, no DMatrix) or an sklearn model."""
+    if isinstance(model, xgb.Booster):
+        return model.inplace_predict(X)
+    return model.predict(X)
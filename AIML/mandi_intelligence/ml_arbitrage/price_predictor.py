@@ -13,9 +13,325 @@ from typing import Dict, List, Tuple, Optional
 import xgboost as xgb
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-import pickle
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from .data_loader import (
+    DEFAULT_CACHE_DIR, PROCESSED_CACHE_VERSION, _PYARROW_AVAILABLE, MandiDataLoader, atomic_write, prune_cache,
+    touch_cache
+)
+from .features import (
+    DEFAULT_FEATURES, LEGACY_FEATURES, add_temporal_features, compute_features, history_window, resolve_features,
+    uses_spatial
+)
+from .model_store import (
+    MODEL_CACHE_SIZE, MODEL_SUFFIX, LRUModelCache, category_levels, feature_names, load_model, predict, save_model
+)
+from .serving_bundle import ServingBundle
+from .feature_engine import IncrementalFeatureEngine
+from .spatial_features import SpatialPanel
+
+# Bump when prepare_features output changes, so stale feature caches are ignored
+FEATURE_CACHE_VERSION = 3
+
+# Input columns that feature engineering reads (the cache key hashes their contents)
+FEATURE_INPUTS = ['Date', 'State', 'Mandi_Name', 'Crop', 'Distance_km',
+                  'Price_per_kg', 'Traffic_Congestion_Score']
+
+
+# Series with fewer records than this are not trained
+MIN_TRAINING_RECORDS = 30
+
+# Manifest of trained models (in models_dir) used to validate them on load
+MODEL_REGISTRY_FILE = "registry.json"
+
+# A model is stale once the data runs this many days past what it was trained on
+MODEL_MAX_AGE_DAYS = 7
+
+# Mandi (and crop) key of global multi-series models in PricePredictor.models
+GLOBAL_KEY = '__global__'
+
+# Hyperparameters of per-series models that have no tuned ones
+DEFAULT_SERIES_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 5,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+}
+
+# Candidates compared by rolling-origin CV (n_estimators is chosen by early stopping)
+PARAM_GRID = [
+    {'max_depth': depth, 'learning_rate': rate, 'min_child_weight': weight}
+    for depth in (3, 5, 7) for rate in (0.05, 0.1) for weight in (1, 5)
+]
+
+# Rolling-origin folds, boosting round cap and early-stopping patience used when tuning
+CV_FOLDS = 3
+MAX_BOOSTING_ROUNDS = 500
+EARLY_STOPPING_ROUNDS = 20
+
+# Tuned per-series hyperparameters (in models_dir), reused on retrain
+HYPERPARAMS_FILE = "hyperparams.json"
+
+# Boosting rounds added to a model per warm-start update on new rows
+INCREMENTAL_ROUNDS = 10
+
+# Unseen rows a model needs before it is warm-started (fewer are kept for the next update)
+MIN_WARM_START_ROWS = 5
+
+# Spatial panels (one pivot per crop) a predictor keeps, keyed by crop and data version
+PANEL_CACHE_SIZE = 16
+
+# Warm-start trees are fitted at this fraction of the model's learning rate, so a
+# handful of new rows nudges the model instead of overriding its history
+WARM_START_LEARNING_RATE_SCALE = 0.3
+
+# Reported sale prices outside [low, high] x the median of the series' last
+# SALE_REFERENCE_DAYS prices are rejected. The band catches unit errors (a
+# per-quintal price typed as per-kg is 100x) but accepts any real price level
+SALE_PRICE_BAND = (0.2, 5.0)
+SALE_REFERENCE_DAYS = 14
+
+
+def _write_json(path: Path, data: Dict):
+    """Atomically replace a JSON file."""
+    atomic_write(path, lambda tmp: tmp.write_text(json.dumps(data, indent=2, sort_keys=True)))
+
+
+def fit_series_model(
+    data: pd.DataFrame,
+    feature_cols: List[str],
+    test_size: float = 0.2,
+    n_jobs: Optional[int] = None,
+    params: Optional[Dict] = None
+) -> Tuple[xgb.XGBRegressor, Dict]:
+    """
+    Fit and evaluate the XGBoost model of one Mandi-Crop series.
+    
+    Module-level so it can run in a worker process; data should hold only
+    this series' rows (feature columns + Price_per_kg) in date order.
+    
+    Args:
+        data: Rows of one series
+        feature_cols: Model input columns
+        test_size: Fraction of (most recent) rows held out for evaluation
+        n_jobs: XGBoost threads (None = XGBoost default, all cores)
+        params: Tuned hyperparameters (see tune_series_params) overriding DEFAULT_SERIES_PARAMS
+        
+    Returns:
+        Tuple of (fitted model, metrics dictionary)
+    """
+    start = time.perf_counter()
+    
+    X = data[feature_cols]
+    y = data['Price_per_kg']
+    
+    # Time-series split (maintain temporal order)
+    split_idx = int(len(data) * (1 - test_size))
+    X_train, X_test = X[:split_idx], X[split_idx:]
+    y_train, y_test = y[:split_idx], y[split_idx:]
+    
+    model = xgb.XGBRegressor(
+        **{**DEFAULT_SERIES_PARAMS, **(params or {})},
+        random_state=42,
+        objective='reg:squarederror',
+        n_jobs=n_jobs
+    )
+    
+    model.fit(
+        X_train, y_train,
+        eval_set=[(X_test, y_test)],
+        verbose=False
+    )
+    
+    # Evaluate
+    y_pred = model.predict(X_test)
+    metrics = {
+        'train_size': len(X_train),
+        'test_size': len(X_test),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+        'mape': np.mean(np.abs((y_test - y_pred) / y_test)) * 100,
+        'r2': model.score(X_test, y_test),  # R-squared score
+        'train_seconds': time.perf_counter() - start
+    }
+    return model, metrics
+
+
+def cv_splits(n_rows: int, test_size: float = 0.2, n_folds: int = CV_FOLDS) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Rolling-origin folds over the training part of a series.
+    
+    Each fold trains on all rows before its validation block; the most recent
+    test_size rows (fit_series_model's hold-out) are never used, so tuning
+    doesn't leak into the reported metrics.
+    
+    Args:
+        n_rows: Rows in the series (in date order)
+        test_size: Hold-out fraction excluded from the folds
+        n_folds: Number of folds
+        
+    Returns:
+        List of (train positions, validation positions)
+    """
+    n_train = int(n_rows * (1 - test_size))
+    return list(TimeSeriesSplit(n_splits=n_folds).split(np.arange(n_train)))
+
+
+def cv_fold_scores(
+    data: pd.DataFrame,
+    feature_cols: List[str],
+    train_idx: np.ndarray,
+    val_idx: np.ndarray,
+    grid: Optional[List[Dict]] = None,
+    n_jobs: Optional[int] = None
+) -> List[Tuple[float, int]]:
+    """
+    Score every grid candidate on one fold, boosting until the validation MAE stops improving.
+    
+    Module-level so (series, fold) pairs can run in worker processes.
+    
+    Args:
+        data: Rows of one series (feature columns + Price_per_kg) in date order
+        feature_cols: Model input columns
+        train_idx: Row positions to fit on
+        val_idx: Row positions to validate / early-stop on
+        grid: Candidate hyperparameters (defaults to PARAM_GRID)
+        n_jobs: XGBoost threads
+        
+    Returns:
+        (best validation MAE, boosting rounds at that MAE) per candidate, in grid order
+    """
+    X, y = data[feature_cols], data['Price_per_kg']
+    X_train, y_train = X.iloc[train_idx], y.iloc[train_idx]
+    X_val, y_val = X.iloc[val_idx], y.iloc[val_idx]
+    
+    scores = []
+    for candidate in grid or PARAM_GRID:
+        model = xgb.XGBRegressor(
+            **{**DEFAULT_SERIES_PARAMS, **candidate, 'n_estimators': MAX_BOOSTING_ROUNDS},
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+            eval_metric='mae',
+            random_state=42,
+            objective='reg:squarederror',
+            n_jobs=n_jobs
+        )
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+        scores.append((float(model.best_score), model.best_iteration + 1))
+    return scores
+
+
+def select_params(fold_scores: List[List[Tuple[float, int]]], grid: Optional[List[Dict]] = None) -> Tuple[Dict, float]:
+    """
+    Pick the candidate with the lowest mean validation MAE across folds.
+    
+    Args:
+        fold_scores: cv_fold_scores output of every fold of one series
+        grid: Candidates the scores refer to (defaults to PARAM_GRID)
+        
+    Returns:
+        Tuple of (hyperparameters for fit_series_model with n_estimators set to the
+        candidate's mean early-stopped round count, mean CV MAE)
+    """
+    grid = grid or PARAM_GRID
+    scores = np.array(fold_scores, dtype=np.float64)  # (folds, candidates, [mae, rounds])
+    mae = scores[:, :, 0].mean(axis=0)
+    rounds = scores[:, :, 1].mean(axis=0)
+    best = int(np.argmin(mae))
+    params = {**DEFAULT_SERIES_PARAMS, **grid[best], 'n_estimators': int(np.ceil(rounds[best]))}
+    return params, float(mae[best])
+
+
+def fit_global_model(
+    data: pd.DataFrame,
+    feature_cols: List[str],
+    test_size: float = 0.2,
+    n_jobs: Optional[int] = None
+) -> Tuple[xgb.XGBRegressor, Dict]:
+    """
+    Fit one XGBoost model over many series, with series identity as categorical inputs.
+    
+    The most recent test_size fraction of dates is held out, so every series is
+    evaluated on the same future period. Sparse series that per-series training
+    skips still contribute rows and get forecasts.
+    
+    Args:
+        data: Rows of all series (feature columns incl. Mandi_Name/Crop + Date + Price_per_kg)
+        feature_cols: Model input columns; categorical ones keep their training levels
+        test_size: Fraction of dates held out for evaluation
+        n_jobs: XGBoost threads (None = XGBoost default, all cores)
+        
+    Returns:
+        Tuple of (fitted model, metrics dictionary)
+    """
+    start = time.perf_counter()
+    
+    levels = {
+        col: sorted(data[col].astype(str).unique())
+        for col in feature_cols
+        if isinstance(data[col].dtype, pd.CategoricalDtype) or data[col].dtype == object
+    }
+    X = align_categories(data[feature_cols], levels)
+    y = data['Price_per_kg']
+    
+    # Time-based split shared by all series
+    dates = np.sort(data['Date'].unique())
+    cutoff = dates[min(int(len(dates) * (1 - test_size)), len(dates) - 1)]
+    is_test = (data['Date'] >= cutoff).to_numpy()
+    X_train, X_test = X[~is_test], X[is_test]
+    y_train, y_test = y[~is_test], y[is_test]
+    
+    model = xgb.XGBRegressor(
+        n_estimators=300,
+        max_depth=6,
+        learning_rate=0.1,
+        subsample=0.8,
+        colsample_bytree=0.8,
+        random_state=42,
+        objective='reg:squarederror',
+        tree_method='hist',
+        enable_categorical=True,
+        n_jobs=n_jobs
+    )
+    
+    model.fit(
+        X_train, y_train,
+        eval_set=[(X_test, y_test)],
+        verbose=False
+    )
+    model.get_booster().set_attr(category_levels=json.dumps(levels))
+    
+    # Evaluate
+    y_pred = model.predict(X_test)
+    metrics = {
+        'train_size': len(X_train),
+        'test_size': len(X_test),
+        'series': int(data.groupby(['Mandi_Name', 'Crop'], observed=True).ngroups),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+        'mape': np.mean(np.abs((y_test - y_pred) / y_test)) * 100,
+        'r2': model.score(X_test, y_test),  # R-squared score
+        'train_seconds': time.perf_counter() - start
+    }
+    return model, metrics
+
+
+def align_categories(X: pd.DataFrame, levels: Dict[str, List[str]]) -> pd.DataFrame:
+    """Cast categorical inputs to a model's training levels (unseen values become missing)."""
+    if not levels:
+        return X
+    X = X.copy()
+    for col, categories in levels.items():
+        X[col] = pd.Categorical(X[col].astype(str), categories=categories)
+    return X
+
 
 class PricePredictor:
     """
@@ -23,31 +339,77 @@ class PricePredictor:
     Each Mandi-Crop combination gets its own model.
     """
     
-    def __init__(self, models_dir: str = "ml_arbitrage/models"):
+    def __init__(
+        self,
+        models_dir: str = "ml_arbitrage/models",
+        cache_dir: Optional[str] = None,
+        features: Optional[List[str]] = None,
+        model_mode: str = 'series',
+        max_loaded_models: int = MODEL_CACHE_SIZE,
+        bundle: Optional[ServingBundle] = None,
+        calendar_aligned: bool = True
+    ):
         """
         Initialize the price predictor.
         
         Args:
             models_dir: Directory to save/load trained models
+            cache_dir: Directory for cached feature matrices (defaults to ml_arbitrage/cache)
+            features: Registered feature names new models are trained on
+                (defaults to features.DEFAULT_FEATURES)
+            model_mode: 'series' forecasts with per-(mandi, crop) models and falls back to
+                the crop's global model; 'global' prefers the global model
+            max_loaded_models: Boosters kept in memory; others are loaded from disk on demand
+            bundle: Serving bundle to load models from before models_dir (see serving_bundle)
+            calendar_aligned: Train on lags/windows in calendar days (via PriceSeriesStore) rather
+                than in observations, so gaps in arrivals don't distort them; each model is
+                served in the mode it was trained in
         """
+        if model_mode not in ('series', 'global'):
+            raise ValueError(f"model_mode must be 'series' or 'global', got {model_mode!r}")
+        self.model_mode = model_mode
+        self.features = list(features) if features else list(DEFAULT_FEATURES)
+        self.calendar_aligned = calendar_aligned
+        resolve_features(self.features)  # fail fast on unknown names
         self.models_dir = Path(models_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
         self.models_dir.mkdir(parents=True, exist_ok=True)
         
-        self.models = {}  # {(mandi, crop): model}
+        self.models = LRUModelCache(max_loaded_models)  # {(mandi, crop): xgb.Booster}
         self.feature_importance = {}
+        self._registry = None  # {"mandi|crop": manifest entry}, loaded lazily; replaced, never mutated
+        self._registry_lock = threading.RLock()  # serializes registry swaps with the warm-start thread
+        self._hyperparams = None  # {"mandi|crop": tuned hyperparameters}, loaded lazily
+        self._panels = LRUModelCache(PANEL_CACHE_SIZE)  # {(crop, data digest): SpatialPanel}
+        self.bundle = bundle
         
-    def prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def prepare_features(
+        self,
+        df: pd.DataFrame,
+        calendar_aligned: Optional[bool] = None,
+        features: Optional[List[str]] = None
+    ) -> pd.DataFrame:
         """
         Engineer time-series features for price prediction.
         
-        Features created:
+        Features created (see ml_arbitrage/features.py for the registry):
         - Temporal: day_of_week, day_of_month, week_of_year
         - Lag features: price from 1, 7, 14 days ago
         - Rolling statistics: 7-day and 14-day moving average
         - Trend: days since start
+        - Spatial: last known prices at the nearest mandis and the state median
+        
+        Price features only look at earlier rows of the same series, so a row's
+        own price (the training target) and other mandis' prices never leak in.
+        Rows without enough history fall back to the series' earliest price, or
+        stay NaN (no history at all), which XGBoost treats as missing.
         
         Args:
             df: DataFrame with columns [Date, Mandi_Name, Crop, Price_per_kg, Distance_km, Traffic_Congestion_Score]
+            calendar_aligned: If True, lags/windows are in calendar days (via PriceSeriesStore)
+                rather than in observations (defaults to this predictor's setting)
+            features: Features to compute (defaults to this predictor's features);
+                only these and their dependencies are computed
             
         Returns:
             DataFrame with engineered features
@@ -55,39 +417,74 @@ class PricePredictor:
         df = df.copy()
         df = df.sort_values(['Mandi_Name', 'Crop', 'Date']).reset_index(drop=True)
         
-        # Temporal features
-        df['day_of_week'] = df['Date'].dt.dayofweek
-        df['day_of_month'] = df['Date'].dt.day
-        df['week_of_year'] = df['Date'].dt.isocalendar().week
-        df['month'] = df['Date'].dt.month
+        if calendar_aligned is None:
+            calendar_aligned = self.calendar_aligned
+        compute_features(df, features or self.features, calendar_aligned=calendar_aligned)
         
-        # Days since start (trend)
-        min_date = df['Date'].min()
-        df['days_since_start'] = (df['Date'] - min_date).dt.days
+        return df
+    
+    def load_features(
+        self,
+        df: pd.DataFrame,
+        calendar_aligned: Optional[bool] = None,
+        use_cache: bool = True
+    ) -> pd.DataFrame:
+        """
+        prepare_features with an on-disk cache keyed by the data's content.
         
-        # Group by Mandi-Crop for time-series features
-        for (mandi, crop), group in df.groupby(['Mandi_Name', 'Crop']):
-            idx = group.index
-            
-            # Lag features (price from N days ago)
-            df.loc[idx, 'price_lag_1'] = group['Price_per_kg'].shift(1)
-            df.loc[idx, 'price_lag_7'] = group['Price_per_kg'].shift(7)
-            df.loc[idx, 'price_lag_14'] = group['Price_per_kg'].shift(14)
-            
-            # Rolling statistics
-            df.loc[idx, 'price_ma_7'] = group['Price_per_kg'].rolling(window=7, min_periods=1).mean()
-            df.loc[idx, 'price_ma_14'] = group['Price_per_kg'].rolling(window=14, min_periods=1).mean()
-            df.loc[idx, 'price_std_7'] = group['Price_per_kg'].rolling(window=7, min_periods=1).std()
+        The key hashes the input columns of df together with the feature spec, so
+        the API, the training scripts and warm restarts share one feature matrix
+        and only recompute it when the processed data or the features change.
+        
+        Args:
+            df: Processed DataFrame (as returned by MandiDataLoader.load_processed)
+            calendar_aligned: Passed through to prepare_features
+            use_cache: Set False to force recomputation (the result is still cached)
             
-            # Price momentum (rate of change)
-            df.loc[idx, 'price_change_7d'] = group['Price_per_kg'].pct_change(periods=7)
+        Returns:
+            DataFrame with engineered features
+        """
+        if calendar_aligned is None:
+            calendar_aligned = self.calendar_aligned
+        cache_path = self._feature_cache_path(df, calendar_aligned)
+        
+        if use_cache and cache_path.exists():
+            try:
+                df_featured = MandiDataLoader._read_frame(cache_path)
+                touch_cache(cache_path)
+                print(f"⚡ Loaded {len(df_featured):,} feature rows from cache ({cache_path.name})")
+                return df_featured
+            except Exception as e:
+                print(f"⚠️  Ignoring unreadable feature cache {cache_path.name}: {e}")
         
-        # Fill NaN values created by lag/rolling operations
-        # Use modern pandas syntax (method parameter deprecated in pandas 2.0+)
-        df = df.bfill()  # Backward fill
-        df = df.ffill()  # Forward fill
+        df_featured = self.prepare_features(df, calendar_aligned=calendar_aligned)
         
-        return df
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            MandiDataLoader._write_frame(df_featured, cache_path)
+            print(f"💾 Cached feature matrix: {cache_path.name}")
+            prune_cache(self.cache_dir, "features_*")
+        except Exception as e:
+            print(f"⚠️  Could not write feature cache: {e}")
+        
+        return df_featured
+    
+    def _feature_cache_path(self, df: pd.DataFrame, calendar_aligned: Optional[bool] = None) -> Path:
+        """Cache file location for a processed frame and feature spec."""
+        if calendar_aligned is None:
+            calendar_aligned = self.calendar_aligned
+        inputs = [col for col in FEATURE_INPUTS if col in df.columns]
+        digest = hashlib.sha256()
+        digest.update(pd.util.hash_pandas_object(df[inputs], index=False).to_numpy().tobytes())
+        digest.update(json.dumps({
+            'version': FEATURE_CACHE_VERSION,
+            'inputs': inputs,
+            'dtypes': [str(df[col].dtype) for col in inputs],
+            'features': resolve_features(self.features),
+            'calendar_aligned': calendar_aligned,
+        }, sort_keys=True).encode())
+        suffix = '.parquet' if _PYARROW_AVAILABLE else '.pkl'
+        return self.cache_dir / f"features_{digest.hexdigest()[:16]}{suffix}"
     
     def train_model(
         self, 
@@ -111,117 +508,596 @@ class PricePredictor:
         # Filter for this Mandi-Crop
         data = df[(df['Mandi_Name'] == mandi) & (df['Crop'] == crop)].copy()
         
-        if len(data) < 30:
+        if len(data) < MIN_TRAINING_RECORDS:
             # Silently return error for insufficient data
             return {'error': 'insufficient_data'}
         
-        # Features for model
-        feature_cols = [
-            'Distance_km', 'Traffic_Congestion_Score',
-            'day_of_week', 'day_of_month', 'week_of_year', 'month',
-            'days_since_start',
-            'price_lag_1', 'price_lag_7', 'price_lag_14',
-            'price_ma_7', 'price_ma_14', 'price_std_7',
-            'price_change_7d'
-        ]
-        
-        X = data[feature_cols]
-        y = data['Price_per_kg']
-        
-        # Time-series split (maintain temporal order)
-        split_idx = int(len(data) * (1 - test_size))
-        X_train, X_test = X[:split_idx], X[split_idx:]
-        y_train, y_test = y[:split_idx], y[split_idx:]
-        
         # Train XGBoost model
         print(f"🤖 Training model for {mandi} - {crop}...")
         
-        model = xgb.XGBRegressor(
-            n_estimators=100,
-            max_depth=5,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42,
-            objective='reg:squarederror'
-        )
+        model, metrics = fit_series_model(data, self.features, test_size, params=self.series_params(mandi, crop))
+        result = self._store_model(mandi, crop, model, metrics, data['Date'].max())
+        self._save_registry()
         
-        model.fit(
-            X_train, y_train,
-            eval_set=[(X_test, y_test)],
-            verbose=False
-        )
+        print(f"   ✅ MAE: ₹{metrics['mae']:.2f}/kg | RMSE: ₹{metrics['rmse']:.2f}/kg | "
+              f"MAPE: {metrics['mape']:.1f}% | R2: {metrics['r2']:.3f}")
         
-        # Evaluate
-        y_pred = model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-        mape = np.mean(np.abs((y_test - y_pred) / y_test)) * 100
-        r2 = model.score(X_test, y_test)  # R-squared score
+        return result
+    
+    def _store_model(
+        self,
+        mandi: str,
+        crop: str,
+        model: xgb.XGBRegressor,
+        metrics: Dict,
+        trained_through: pd.Timestamp,
+        registry_fields: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Save a fitted model in native format, register it and keep its booster in memory.
         
-        # Store model
-        self.models[(mandi, crop)] = model
+        registry_fields are merged into (and override) the model's new registry entry.
+        """
+        features = self._model_features(model)
         
         # Feature importance
-        importance = dict(zip(feature_cols, model.feature_importances_))
+        importance = dict(zip(features, model.feature_importances_))
         self.feature_importance[(mandi, crop)] = importance
         
         # Save model
-        model_path = self.models_dir / f"{mandi}_{crop}_model.pkl"
-        with open(model_path, 'wb') as f:
-            pickle.dump(model, f)
-        
-        print(f"   ✅ MAE: ₹{mae:.2f}/kg | RMSE: ₹{rmse:.2f}/kg | MAPE: {mape:.1f}% | R2: {r2:.3f}")
-        
-        return {
-            'mandi': mandi,
-            'crop': crop,
-            'train_size': len(X_train),
-            'test_size': len(X_test),
-            'mae': mae,
-            'rmse': rmse,
-            'mape': mape,
-            'r2': r2,
-            'model_path': str(model_path)
+        model_path = self._model_path(mandi, crop)
+        save_model(model, model_path)
+        self.models[(mandi, crop)] = model.get_booster()
+        
+        entry = {
+            'model_path': model_path.name,
+            'format': MODEL_SUFFIX.lstrip('.'),
+            'features': features,
+            'category_levels': category_levels(model),
+            'feature_version': self.feature_version(),
+            'calendar_aligned': self.calendar_aligned,
+            'data_version': PROCESSED_CACHE_VERSION,
+            'trained_through': str(pd.Timestamp(trained_through).date()),
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'mae': float(metrics['mae']),
+            'metrics': {name: float(metrics[name]) for name in ('mae', 'rmse', 'mape', 'r2')},
+            **(registry_fields or {}),
         }
+        # Copy-on-write, so readers holding the previous registry never see it change
+        with self._registry_lock:
+            self._registry = {**self._load_registry(), f"{mandi}|{crop}": entry}
+        
+        return {'mandi': mandi, 'crop': crop, **metrics, 'model_path': str(model_path)}
     
-    def train_all_models(self, df: pd.DataFrame) -> List[Dict]:
+    def train_all_models(
+        self,
+        df: pd.DataFrame,
+        n_workers: Optional[int] = None,
+        only: Optional[List[Tuple[str, str]]] = None,
+        tune: bool = False
+    ) -> List[Dict]:
         """
         Train models for all Mandi-Crop combinations in the dataset.
         Automatically skips combinations with insufficient data (<30 records).
         
+        The frame is grouped once and each series' rows are handed to a worker
+        process; every worker runs XGBoost with cpu_count // n_workers threads so
+        the pool does not oversubscribe the machine. Series with cached tuned
+        hyperparameters (see tune_models) are fit with them.
+        
         Args:
             df: DataFrame with features
+            n_workers: Worker processes (default: one per CPU, capped at the number
+                of models); 1 trains sequentially in this process
+            only: Restrict training to these (mandi, crop) series
+            tune: First tune the series that have no cached hyperparameters
             
         Returns:
             List of performance metrics for each model
         """
+        series, trained_through, n_skipped = self._training_series(df, only)
+        
+        if tune:
+            untuned = [(mandi, crop) for mandi, crop, _ in series if self.series_params(mandi, crop) is None]
+            if untuned:
+                self.tune_models(df, n_workers=n_workers, only=untuned)
+        params = {(mandi, crop): self.series_params(mandi, crop) for mandi, crop, _ in series}
+        
         results = []
+        start = time.perf_counter()
+        
+        print(f"\n🚀 Training {len(series)} models...")
+        if n_skipped > 0:
+            print(f"⏭️  Skipping {n_skipped} combinations with insufficient data (<30 records)\n")
         
-        # Get unique Mandi-Crop combinations WITH data count
-        combinations = df.groupby(['Mandi_Name', 'Crop']).size().reset_index(name='count')
-        combinations = combinations[['Mandi_Name', 'Crop', 'count']]
+        cpus = os.cpu_count() or 1
+        if n_workers is None:
+            n_workers = cpus
+        n_workers = max(1, min(n_workers, len(series)))
+        
+        def report(mandi: str, crop: str, metrics: Dict):
+            print(f"   [{len(results)}/{len(series)}] {mandi} - {crop}: MAE ₹{metrics['mae']:.2f}/kg | "
+                  f"R2 {metrics['r2']:.3f} | {metrics['train_seconds']:.2f}s")
+        
+        if n_workers == 1:
+            for mandi, crop, data in series:
+                model, metrics = fit_series_model(data, self.features, params=params[(mandi, crop)])
+                results.append(self._store_model(mandi, crop, model, metrics, trained_through[(mandi, crop)]))
+                report(mandi, crop, metrics)
+        else:
+            threads_per_worker = max(1, cpus // n_workers)
+            print(f"   Using {n_workers} worker processes x {threads_per_worker} XGBoost threads")
+            
+            # spawn: forking a process that already initialized OpenMP can deadlock XGBoost
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as pool:
+                futures = {
+                    pool.submit(
+                        fit_series_model, data, self.features, 0.2, threads_per_worker, params[(mandi, crop)]
+                    ): (mandi, crop)
+                    for mandi, crop, data in series
+                }
+                for future in as_completed(futures):
+                    mandi, crop = futures[future]
+                    try:
+                        model, metrics = future.result()
+                    except Exception as e:
+                        print(f"   ❌ {mandi} - {crop}: {e}")
+                        continue
+                    results.append(self._store_model(mandi, crop, model, metrics, trained_through[(mandi, crop)]))
+                    report(mandi, crop, metrics)
+        
+        self._save_registry()
+        print(f"\n✅ Trained {len(results)} models successfully in {time.perf_counter() - start:.1f}s")
+        
+        return results
+    
+    def _training_series(
+        self,
+        df: pd.DataFrame,
+        only: Optional[List[Tuple[str, str]]] = None
+    ) -> Tuple[List[Tuple[str, str, pd.DataFrame]], Dict[Tuple[str, str], pd.Timestamp], int]:
+        """
+        Split df into the rows of every series with enough records to train on.
+        
+        Returns:
+            Tuple of ([(mandi, crop, rows)], {(mandi, crop): last date}, number of series skipped)
+        """
+        # Group once; each series' rows are sliced out a single time
+        columns = list(dict.fromkeys(self.features + ['Price_per_kg']))
+        grouped = df.groupby(['Mandi_Name', 'Crop'], observed=True, sort=True)
+        counts = grouped.size()
+        
+        if only is not None:
+            wanted = set(only)
+            counts = counts[[(str(m), str(c)) in wanted for m, c in counts.index]]
+        last_dates = grouped['Date'].max()
         
         # Filter out combinations with insufficient data
-        sufficient_data = combinations[combinations['count'] >= 30]
-        skipped = combinations[combinations['count'] < 30]
+        sufficient = counts[counts >= MIN_TRAINING_RECORDS]
+        
+        series = [
+            (str(mandi), str(crop), grouped.get_group((mandi, crop))[columns])
+            for mandi, crop in sufficient.index
+        ]
+        trained_through = {(str(m), str(c)): last_dates[(m, c)] for m, c in sufficient.index}
+        return series, trained_through, int((counts < MIN_TRAINING_RECORDS).sum())
+    
+    def tune_models(
+        self,
+        df: pd.DataFrame,
+        n_workers: Optional[int] = None,
+        only: Optional[List[Tuple[str, str]]] = None,
+        n_folds: int = CV_FOLDS
+    ) -> Dict[Tuple[str, str], Dict]:
+        """
+        Choose per-series hyperparameters by rolling-origin CV with early stopping and cache them.
         
-        print(f"\n🚀 Training {len(sufficient_data)} models...")
-        if len(skipped) > 0:
-            print(f"⏭️  Skipping {len(skipped)} combinations with insufficient data (<30 records)\n")
+        Every (series, fold) pair is an independent task, so the pool stays busy
+        even with few series. Each fold compares the PARAM_GRID candidates, boosting
+        each until the validation MAE stops improving; the chosen n_estimators is
+        the mean early-stopped round count. Results go to HYPERPARAMS_FILE and are
+        reused by every later retrain until the feature spec changes.
         
-        for _, row in sufficient_data.iterrows():
-            mandi = row['Mandi_Name']
-            crop = row['Crop']
+        Args:
+            df: DataFrame with features
+            n_workers: Worker processes (default: one per CPU); 1 runs in this process
+            only: Restrict tuning to these (mandi, crop) series
+            n_folds: Rolling-origin folds per series
             
-            result = self.train_model(df, mandi, crop)
-            if 'error' not in result:  # Only add successful trainings
-                results.append(result)
+        Returns:
+            Dictionary mapping (mandi, crop) -> chosen hyperparameters
+        """
+        start = time.perf_counter()
+        series, _, _ = self._training_series(df, only)
+        tasks = [
+            (mandi, crop, data, train_idx, val_idx)
+            for mandi, crop, data in series
+            for train_idx, val_idx in cv_splits(len(data), n_folds=n_folds)
+        ]
+        print(f"\n🔧 Tuning {len(series)} series ({len(tasks)} folds x {len(PARAM_GRID)} candidates)...")
+        
+        cpus = os.cpu_count() or 1
+        n_workers = max(1, min(n_workers or cpus, len(tasks)))
+        fold_scores = {(mandi, crop): [] for mandi, crop, _ in series}
         
-        print(f"\n✅ Trained {len(results)} models successfully")
+        if n_workers == 1:
+            for mandi, crop, data, train_idx, val_idx in tasks:
+                fold_scores[(mandi, crop)].append(cv_fold_scores(data, self.features, train_idx, val_idx))
+        else:
+            threads_per_worker = max(1, cpus // n_workers)
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as pool:
+                futures = {
+                    pool.submit(
+                        cv_fold_scores, data, self.features, train_idx, val_idx, None, threads_per_worker
+                    ): (mandi, crop)
+                    for mandi, crop, data, train_idx, val_idx in tasks
+                }
+                for future in as_completed(futures):
+                    mandi, crop = futures[future]
+                    try:
+                        fold_scores[(mandi, crop)].append(future.result())
+                    except Exception as e:
+                        print(f"   ❌ {mandi} - {crop}: {e}")
         
+        cache = self._load_hyperparams()
+        tuned = {}
+        for (mandi, crop), folds in fold_scores.items():
+            if len(folds) < n_folds:
+                continue  # a fold failed; keep the previous parameters
+            params, cv_mae = select_params(folds)
+            tuned[(mandi, crop)] = params
+            cache[f"{mandi}|{crop}"] = {
+                'params': params,
+                'cv_mae': cv_mae,
+                'feature_version': self.feature_version(),
+                'tuned_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            print(f"   {mandi} - {crop}: depth {params['max_depth']}, lr {params['learning_rate']}, "
+                  f"{params['n_estimators']} rounds | CV MAE ₹{cv_mae:.2f}/kg")
+        
+        _write_json(self.models_dir / HYPERPARAMS_FILE, cache)
+        print(f"✅ Tuned {len(tuned)} series in {time.perf_counter() - start:.1f}s")
+        return tuned
+    
+    def series_params(self, mandi: str, crop: str) -> Optional[Dict]:
+        """Cached tuned hyperparameters of a series (None if untuned or tuned on another feature spec)."""
+        entry = self._load_hyperparams().get(f"{mandi}|{crop}")
+        if entry is None or entry.get('feature_version') != self.feature_version():
+            return None
+        return entry['params']
+    
+    def _load_hyperparams(self) -> Dict:
+        if self._hyperparams is None:
+            try:
+                with open(self.models_dir / HYPERPARAMS_FILE) as f:
+                    self._hyperparams = json.load(f)
+            except (OSError, ValueError):
+                self._hyperparams = {}
+        return self._hyperparams
+    
+    def update_models(
+        self,
+        df: pd.DataFrame,
+        sales: pd.DataFrame,
+        rounds: int = INCREMENTAL_ROUNDS
+    ) -> Tuple[pd.DataFrame, List[Dict]]:
+        """
+        Warm-start the per-series models of series with reported sales on the rows they haven't seen.
+        
+        Sales outside SALE_PRICE_BAND times their series' recent median price (e.g.
+        a per-quintal price typed as per-kg) are rejected. The rest, if dated after
+        the series' history, are appended to it (route and traffic carried over
+        from its latest row) and featured like training data. Once a model has
+        MIN_WARM_START_ROWS rows after its trained_through date, it continues
+        boosting from its current booster for `rounds` trees at a reduced learning
+        rate on those rows - never the full history - and is saved and
+        re-registered. Its held-out metrics from the last full training are kept;
+        the error it made on the new rows before the update is recorded as
+        update_metrics. Models trained on another feature spec are left for a
+        full retrain.
+        
+        Args:
+            df: DataFrame with features the models are served from
+            sales: Daily sale prices [Date, Mandi_Name, Crop, Price_per_kg] (see sales_log.load_sales)
+            rounds: Boosting rounds added per update
+            
+        Returns:
+            Tuple of (df extended with the featured sale rows, metrics of each updated model)
+        """
+        self.refresh_registry()
+        registry = self._load_registry()
+        inputs = [col for col in FEATURE_INPUTS if col in df.columns]
+        start_date = df['Date'].min()
+        if 'days_since_start' in df.columns:
+            start_date = df['Date'].iloc[0] - timedelta(days=int(df['days_since_start'].iloc[0]))
+        
+        results, extensions, rejected = [], [], 0
+        for crop, crop_sales in sales.groupby('Crop', sort=False):
+            crop_history = df.loc[df['Crop'] == crop, inputs]
+            
+            # Append each series' sales after its last known day
+            new_rows = []
+            for mandi, rows in crop_sales.groupby('Mandi_Name', sort=False):
+                history = crop_history[crop_history['Mandi_Name'] == mandi].sort_values('Date')
+                if history.empty:
+                    continue  # no route/traffic to carry over
+                reference = float(history['Price_per_kg'].iloc[-SALE_REFERENCE_DAYS:].median())
+                plausible = rows['Price_per_kg'].between(SALE_PRICE_BAND[0] * reference,
+                                                         SALE_PRICE_BAND[1] * reference)
+                rejected += int((~plausible).sum())
+                new = rows[plausible & (rows['Date'] > history['Date'].max())]
+                template = history.iloc[[-1] * len(new)].reset_index(drop=True)
+                template['Date'] = new['Date'].to_numpy()
+                template['Price_per_kg'] = new['Price_per_kg'].to_numpy(dtype=np.float32)
+                new_rows.append(template)
+            new_rows = pd.concat(new_rows, ignore_index=True) if new_rows else pd.DataFrame()
+            if new_rows.empty:
+                continue
+            
+            featured = self._feature_new_rows(crop_history, new_rows, start_date)
+            extensions.append(featured)
+            
+            for (mandi, crop_name), new in featured.groupby(['Mandi_Name', 'Crop'], observed=True, sort=False):
+                mandi, crop_name = str(mandi), str(crop_name)
+                frame = pd.concat([df[(df['Mandi_Name'] == mandi) & (df['Crop'] == crop_name)], new],
+                                  ignore_index=True)
+                
+                entry = registry.get(f"{mandi}|{crop_name}")
+                if entry is None or entry.get('feature_version') != self.feature_version():
+                    continue
+                unseen = frame[frame['Date'] > pd.Timestamp(entry['trained_through'])]
+                if len(unseen) < MIN_WARM_START_ROWS:
+                    continue
+                booster = self._get_model((mandi, crop_name))
+                if booster is None:
+                    continue
+                results.append(self._warm_start(mandi, crop_name, booster, unseen, rounds, entry))
+        
+        if rejected:
+            print(f"⚠️  Rejected {rejected} reported sales outside their series' price range")
+        if results:
+            self._save_registry()
+            print(f"🔁 Warm-started {len(results)} models on new sales")
+        
+        if not extensions:
+            return df, results
+        extended = pd.concat([df, *extensions], ignore_index=True)
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                extended[col] = extended[col].astype('category')
+        return extended.sort_values(['Mandi_Name', 'Crop', 'Date'], ignore_index=True), results
+    
+    def _feature_new_rows(
+        self,
+        history: pd.DataFrame,
+        new_rows: pd.DataFrame,
+        start_date: pd.Timestamp
+    ) -> pd.DataFrame:
+        """
+        Features for rows appended after the history of one crop.
+        
+        The incremental engine emits them in one pass over the new days; features it
+        doesn't cover, or new rows older than the crop's latest day, are recomputed
+        over the full history instead (neighbour prices include the new rows, as in training).
+        """
+        if IncrementalFeatureEngine.covers(self.features):
+            engine = IncrementalFeatureEngine.from_history(history, start_date, self.calendar_aligned)
+            try:
+                return engine.update(new_rows)
+            except ValueError:
+                pass
+        
+        frame = pd.concat([history, new_rows.assign(_new=True)], ignore_index=True)
+        frame['_new'] = frame['_new'].eq(True)
+        frame = frame.sort_values(['Mandi_Name', 'Crop', 'Date'], ignore_index=True)
+        compute_features(frame, self.features, start_date=start_date, calendar_aligned=self.calendar_aligned)
+        return frame[frame['_new']].drop(columns='_new').reset_index(drop=True)
+    
+    def _warm_start(
+        self,
+        mandi: str,
+        crop: str,
+        booster: xgb.Booster,
+        rows: pd.DataFrame,
+        rounds: int,
+        entry: Dict
+    ) -> Dict:
+        """Continue boosting a series' model on unseen rows, then store and register it (keeping its held-out metrics)."""
+        start = time.perf_counter()
+        feature_cols = feature_names(booster)
+        X, y = rows[feature_cols], rows['Price_per_kg'].to_numpy(dtype=np.float64)
+        
+        # Error of the current model on rows it hasn't seen (a genuine forecast error)
+        errors = y - predict(booster, X)
+        total = np.sum((y - y.mean()) ** 2)
+        metrics = {
+            'train_size': len(X),
+            'test_size': len(X),
+            'mae': float(np.mean(np.abs(errors))),
+            'rmse': float(np.sqrt(np.mean(errors ** 2))),
+            'mape': float(np.mean(np.abs(errors / y)) * 100),
+            'r2': float(1 - np.sum(errors ** 2) / total) if total > 0 else float('nan'),
+        }
+        
+        params = {**DEFAULT_SERIES_PARAMS, **(self.series_params(mandi, crop) or {}), 'n_estimators': rounds}
+        params['learning_rate'] *= WARM_START_LEARNING_RATE_SCALE
+        model = xgb.XGBRegressor(**params, random_state=42, objective='reg:squarederror')
+        model.fit(X, y, xgb_model=booster)
+        metrics['train_seconds'] = time.perf_counter() - start
+        
+        # A few rows make a poor test set: the registry keeps the last full training's evaluation
+        held_out = {key: entry[key] for key in ('mae', 'metrics') if key in entry}
+        return self._store_model(mandi, crop, model, metrics, rows['Date'].max(), {
+            **held_out,
+            'update_metrics': {name: metrics[name] for name in ('test_size', 'mae', 'rmse', 'mape', 'r2')},
+            'warm_starts': entry.get('warm_starts', 0) + 1,
+        })
+    
+    def refresh_registry(self):
+        """Re-read the registry from disk and drop in-memory models that were replaced since."""
+        current = self._read_registry()
+        with self._registry_lock:
+            previous = self._load_registry()
+            self._registry = current
+            for key in list(self.models):
+                name = f"{key[0]}|{key[1]}"
+                if previous.get(name, {}).get('trained_at') != current.get(name, {}).get('trained_at'):
+                    self.models.pop(key, None)
+    
+    def train_global_models(
+        self,
+        df: pd.DataFrame,
+        per_crop: bool = True,
+        n_jobs: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Train global multi-series models: one booster per crop (or one overall).
+        
+        Mandi_Name (and Crop, for the overall model) are categorical inputs, so a
+        handful of models cover every series - including mandis with too few
+        records for a per-series model.
+        
+        Args:
+            df: DataFrame with features
+            per_crop: One model per crop (True) or a single model across crops
+            n_jobs: XGBoost threads (None = all cores)
+            
+        Returns:
+            List of performance metrics for each model
+        """
+        feature_cols = self.features + (['Mandi_Name'] if per_crop else ['Mandi_Name', 'Crop'])
+        columns = list(dict.fromkeys(feature_cols + ['Date', 'Mandi_Name', 'Crop', 'Price_per_kg']))
+        groups = df.groupby('Crop', observed=True) if per_crop else [(GLOBAL_KEY, df)]
+        
+        results = []
+        for crop, data in groups:
+            crop = str(crop)
+            print(f"🌐 Training global model for {'all crops' if crop == GLOBAL_KEY else crop}...")
+            model, metrics = fit_global_model(data[columns], feature_cols, n_jobs=n_jobs)
+            results.append(self._store_model(GLOBAL_KEY, crop, model, metrics, data['Date'].max()))
+            print(f"   ✅ {metrics['series']} series | MAE: ₹{metrics['mae']:.2f}/kg | "
+                  f"R2: {metrics['r2']:.3f} | {metrics['train_seconds']:.1f}s")
+        
+        self._save_registry()
         return results
     
+    def feature_version(self) -> str:
+        """Fingerprint of the feature spec models are trained on (names, order and semantics)."""
+        spec = json.dumps({'version': FEATURE_CACHE_VERSION, 'features': self.features,
+                           'calendar_aligned': self.calendar_aligned})
+        return hashlib.sha256(spec.encode()).hexdigest()[:12]
+    
+    def _load_registry(self) -> Dict:
+        with self._registry_lock:
+            if self._registry is None:
+                self._registry = self._read_registry()
+            return self._registry
+    
+    def _read_registry(self) -> Dict:
+        try:
+            with open(self.models_dir / MODEL_REGISTRY_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_registry(self):
+        _write_json(self.models_dir / MODEL_REGISTRY_FILE, self._load_registry())
+    
+    def model_status(self, df: pd.DataFrame, max_age_days: int = MODEL_MAX_AGE_DAYS) -> Dict[Tuple[str, str], str]:
+        """
+        Check the registered model of every trainable series in df against the current data/feature version.
+        
+        Args:
+            df: DataFrame with features (only series with enough records are checked)
+            max_age_days: Days the data may run past a model's training window before it is stale
+            
+        Returns:
+            Dictionary mapping (mandi, crop) -> 'ok', 'missing' or 'stale: <reason>'
+        """
+        registry = self._load_registry()
+        grouped = df.groupby(['Mandi_Name', 'Crop'], observed=True)['Date']
+        series = grouped.agg(['size', 'max'])
+        series = series[series['size'] >= MIN_TRAINING_RECORDS]
+        
+        status = {}
+        for (mandi, crop), last_date in series['max'].items():
+            key = (str(mandi), str(crop))
+            entry = registry.get(f"{key[0]}|{key[1]}")
+            if entry is None:
+                legacy = (self.models_dir / f"{key[0]}_{key[1]}_model.pkl").exists() \
+                    or self._model_path(*key).exists()
+                status[key] = 'stale: unregistered model' if legacy else 'missing'
+            elif not (self.models_dir / entry['model_path']).exists():
+                status[key] = 'missing'
+            elif entry.get('feature_version') != self.feature_version():
+                status[key] = 'stale: feature spec changed'
+            elif entry.get('data_version') != PROCESSED_CACHE_VERSION:
+                status[key] = 'stale: data processing changed'
+            elif (last_date - pd.Timestamp(entry['trained_through'])).days > max_age_days:
+                status[key] = f"stale: trained through {entry['trained_through']}"
+            else:
+                status[key] = 'ok'
+        return status
+    
+    def sync_models(
+        self,
+        df: pd.DataFrame,
+        retrain: str = 'missing',
+        n_workers: Optional[int] = None,
+        max_age_days: int = MODEL_MAX_AGE_DAYS,
+        tune: bool = False
+    ) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Validate registered models and (optionally) train only the missing or stale ones.
+        
+        This is the startup path for the API, which uses retrain='none': it serves
+        what is registered and logs what is missing. Training belongs in the
+        offline job (train_models.py), which uses 'missing' or 'all'.
+        Valid models are checked against the registry only; their boosters are
+        loaded lazily on first use.
+        
+        Args:
+            df: DataFrame with features
+            retrain: 'missing' (train missing/stale models), 'none' (load only) or 'all'
+            n_workers: Passed to train_all_models
+            max_age_days: See model_status
+            tune: Passed to train_all_models (tune retrained series that have no cached hyperparameters)
+            
+        Returns:
+            Dictionary with the 'loaded', 'trained' and 'unavailable' (mandi, crop) series
+        """
+        if retrain not in ('missing', 'none', 'all'):
+            raise ValueError(f"retrain must be 'missing', 'none' or 'all', got {retrain!r}")
+        
+        status = self.model_status(df, max_age_days) if retrain != 'all' else {}
+        loaded, pending = [], []
+        for key, state in status.items():
+            if state == 'ok':
+                loaded.append(key)
+            else:
+                pending.append(key)
+        
+        stale = sum(state.startswith('stale') for state in status.values())
+        print(f"📦 Model registry: {len(loaded)} valid, {len(pending)} missing/stale ({stale} stale)")
+        
+        trained = []
+        if retrain == 'all':
+            trained = [(r['mandi'], r['crop']) for r in self.train_all_models(df, n_workers=n_workers, tune=tune)]
+        elif retrain == 'missing' and pending:
+            trained = [(r['mandi'], r['crop']) for r in self.train_all_models(
+                df, n_workers=n_workers, only=pending, tune=tune
+            )]
+        
+        unavailable = [key for key in pending if key not in set(trained)]
+        if retrain == 'none' and unavailable:
+            shown = ", ".join(f"{mandi}/{crop}" for mandi, crop in unavailable[:10])
+            more = f" (+{len(unavailable) - 10} more)" if len(unavailable) > 10 else ""
+            print(f"⚠️  No valid model for {len(unavailable)} series: {shown}{more}. "
+                  f"Run train_models.py to train them")
+        return {'loaded': loaded, 'trained': trained, 'unavailable': unavailable}
+    
     def predict_future_price(
         self, 
         df: pd.DataFrame,
@@ -241,63 +1117,206 @@ class PricePredictor:
         Returns:
             DataFrame with predictions: [Date, Predicted_Price, Day_Ahead]
         """
-        key = (mandi, crop)
+        model = self._resolve_model(mandi, crop)[1]
+        if model is None:
+            raise ValueError(f"No model found for {mandi}-{crop}. Train first!")
+        self._model_features(model)  # raises for a model matching no known feature list
+        forecasts = self._forecast(df, crop, [mandi], days_ahead)
+        if mandi not in forecasts:
+            raise ValueError(f"No price history for {mandi}-{crop}")
+        return forecasts[mandi]
+    
+    def _resolve_model(self, mandi: str, crop: str) -> Tuple[Optional[Tuple[str, str]], Optional[xgb.Booster]]:
+        """(key, model) serving a series - its own model or a global one, in model_mode order - or (None, None)."""
+        if self.model_mode == 'global':
+            candidates = [(GLOBAL_KEY, crop), (GLOBAL_KEY, GLOBAL_KEY), (mandi, crop)]
+        else:
+            candidates = [(mandi, crop), (GLOBAL_KEY, crop), (GLOBAL_KEY, GLOBAL_KEY)]
+        return next(((key, m) for key, m in zip(candidates, map(self._get_model, candidates))
+                     if m is not None), (None, None))
+    
+    def _forecast(
+        self,
+        df: pd.DataFrame,
+        crop: str,
+        mandis: List[str],
+        days_ahead: int
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Recursive forecasts for several mandis of one crop.
         
-        if key not in self.models:
-            # Try to load from disk
-            model_path = self.models_dir / f"{mandi}_{crop}_model.pkl"
-            if model_path.exists():
-                with open(model_path, 'rb') as f:
-                    self.models[key] = pickle.load(f)
-            else:
-                raise ValueError(f"No model found for {mandi}-{crop}. Train first!")
+        Each model is served with exactly the features (and compute functions) it
+        was trained on, in its own window mode. Calendar, route and neighbour
+        inputs don't depend on the predicted prices, so they are computed for all
+        forecast days at once (neighbouring mandis' prices stay frozen at the end
+        of the history). Price features come from one incremental engine per
+        window mode and last day, built from the series' recent history: each
+        forecast day reads them, predicts, and pushes the predictions, so a day
+        costs O(series) instead of recomputing features over the history. Series
+        with features the engine doesn't cover fall back to _forecast_recomputed.
         
-        model = self.models[key]
+        Args:
+            df: Historical data with features
+            crop: Crop name
+            mandis: Mandis to forecast (those without a model or history are skipped)
+            days_ahead: Number of days to forecast
+            
+        Returns:
+            Dictionary mapping mandi_name -> forecast DataFrame [Date, Day_Ahead, Predicted_Price]
+        """
+        crop_rows = df[df['Crop'] == crop]
+        inputs = [col for col in FEATURE_INPUTS if col in crop_rows.columns]
         
-        # Get latest data for this Mandi-Crop
-        data = df[(df['Mandi_Name'] == mandi) & (df['Crop'] == crop)].copy()
-        data = data.sort_values('Date').tail(30)  # Last 30 days for context
-        
-        # Feature columns
-        feature_cols = [
-            'Distance_km', 'Traffic_Congestion_Score',
-            'day_of_week', 'day_of_month', 'week_of_year', 'month',
-            'days_since_start',
-            'price_lag_1', 'price_lag_7', 'price_lag_14',
-            'price_ma_7', 'price_ma_14', 'price_std_7',
-            'price_change_7d'
-        ]
+        series = {}
+        for mandi in mandis:
+            key, model = self._resolve_model(mandi, crop)
+            if model is None:
+                continue
+            try:
+                series[str(mandi)] = (model, self._model_features(model), self._model_calendar_aligned(key))
+            except ValueError:
+                continue  # unusable legacy model
+        history = crop_rows[crop_rows['Mandi_Name'].isin(list(series))]
+        if history.empty:
+            return {}
         
-        # Generate predictions for future days
+        # Recent history of each series (enough for the longest window)
+        window = max(30, max(history_window(cols) + 1 for _, cols, _ in series.values()))
+        history = history.sort_values(['Mandi_Name', 'Date'], kind='stable')
+        history = history.groupby('Mandi_Name', observed=True, sort=False).tail(window)
+        latest = history.groupby('Mandi_Name', observed=True, sort=False).tail(1)
+        if 'days_since_start' in latest.columns:
+            start_dates = latest['Date'] - pd.to_timedelta(latest['days_since_start'].astype(np.int64), unit='D')
+        else:
+            start_dates = pd.Series(df['Date'].min(), index=latest.index)
+        history = history[inputs]
+        latest = latest[inputs].assign(start_date=start_dates.to_numpy())
+        
+        # Neighbouring mandis' last known prices, frozen at the end of the history
+        needs_panel = any(uses_spatial(cols) for _, cols, _ in series.values())
+        panel = self._crop_panel(crop, crop_rows) if needs_panel else None
+        
+        forecasts, groups = {}, {}
+        for row in latest.itertuples(index=False):
+            mandi = str(row.Mandi_Name)
+            model, cols, calendar_aligned = series[mandi]
+            if IncrementalFeatureEngine.covers(cols):
+                groups.setdefault((calendar_aligned, row.Date, row.start_date), []).append(mandi)
+                continue
+            forecasts[mandi] = self._forecast_recomputed(
+                history[history['Mandi_Name'] == mandi].reset_index(drop=True),
+                model, cols, calendar_aligned, row.start_date, panel, days_ahead
+            )
+        
+        for (calendar_aligned, last_date, start_date), group in groups.items():
+            engine = IncrementalFeatureEngine.from_history(
+                history[history['Mandi_Name'].isin(group)], start_date, calendar_aligned
+            )
+            base = latest[latest['Mandi_Name'].isin(group)][inputs].reset_index(drop=True)
+            keys = [(str(m), str(c)) for m, c in zip(base['Mandi_Name'], base['Crop'])]
+            dates = [last_date + timedelta(days=day) for day in range(1, days_ahead + 1)]
+            
+            # Future rows, day-major: route/traffic carried over from the latest arrival, price unknown
+            future = pd.concat([base.assign(Date=date) for date in dates], ignore_index=True)
+            future['Price_per_kg'] = np.nan
+            add_temporal_features(future, start_date)
+            spatial = panel.lookup(future) if panel is not None else {}
+            
+            # Numeric inputs of every model in one matrix; price features are filled in day by day
+            columns = list(dict.fromkeys(col for mandi in group for col in series[mandi][1]
+                                         if col not in ('Mandi_Name', 'Crop')))
+            position = {col: j for j, col in enumerate(columns)}
+            matrix = np.full((len(future), len(columns)), np.nan, dtype=np.float32)
+            for col, j in position.items():
+                if col in future.columns:
+                    matrix[:, j] = future[col].to_numpy(dtype=np.float32)
+                elif col in spatial:
+                    matrix[:, j] = spatial[col]
+            
+            # Series sharing a (global) model are predicted together
+            by_model = {}
+            for i, (mandi, _) in enumerate(keys):
+                model, cols, _ = series[mandi]
+                by_model.setdefault(id(model), (model, cols, []))[2].append(i)
+            
+            predicted = np.full((len(keys), days_ahead), np.nan)
+            for day, date in enumerate(dates):
+                rows = np.arange(len(keys)) + day * len(keys)
+                price_features = engine.next_features(keys, date)
+                for col, values in price_features.items():
+                    if col in position:
+                        matrix[rows, position[col]] = values
+                if 'nearest_mandi_spread' in position:
+                    matrix[rows, position['nearest_mandi_spread']] = \
+                        price_features['price_lag_1'] - spatial['nearest_price'][rows]
+                
+                for model, cols, members in by_model.values():
+                    levels = category_levels(model)
+                    X_pred = matrix[rows[members]][:, [position[col] for col in cols if col not in levels]]
+                    if levels:
+                        X_pred = pd.DataFrame(X_pred, columns=[col for col in cols if col not in levels])
+                        for col in levels:
+                            X_pred[col] = future[col].to_numpy()[rows[members]]
+                        X_pred = align_categories(X_pred[cols], levels)
+                    predicted[members, day] = predict(model, X_pred)
+                
+                # Advance with the predictions for the next day (recursive forecasting)
+                engine.push(keys, predicted[:, day], date)
+            
+            for i, (mandi, _) in enumerate(keys):
+                forecasts[mandi] = pd.DataFrame({
+                    'Date': dates,
+                    'Day_Ahead': range(1, days_ahead + 1),
+                    'Predicted_Price': [round(float(price), 2) for price in predicted[i]]
+                })
+        
+        return forecasts
+    
+    def _crop_panel(self, crop: str, crop_rows: pd.DataFrame) -> SpatialPanel:
+        """
+        SpatialPanel of one crop's rows, pivoted once per crop and data version.
+        
+        Single-mandi forecasts of the same crop (and API requests, which load the
+        crop's partitions afresh) reuse it; the key is a digest of the rows' content,
+        so any change to the data builds a new panel.
+        """
+        inputs = [col for col in ('Date', 'State', 'Mandi_Name', 'Price_per_kg') if col in crop_rows.columns]
+        digest = hashlib.sha256(pd.util.hash_pandas_object(crop_rows[inputs], index=False).to_numpy().tobytes())
+        key = (str(crop), digest.hexdigest())
+        panel = self._panels.get(key)
+        if panel is None:
+            panel = SpatialPanel(crop_rows)
+            self._panels[key] = panel
+        return panel
+    
+    def _forecast_recomputed(
+        self,
+        history: pd.DataFrame,
+        model,
+        feature_cols: List[str],
+        calendar_aligned: bool,
+        start_date: pd.Timestamp,
+        panel: Optional[SpatialPanel],
+        days_ahead: int
+    ) -> pd.DataFrame:
+        """Recursive forecast of one series that recomputes its features over the recent history each day."""
+        last_date = history['Date'].max()
         predictions = []
-        last_date = data['Date'].max()
         
         for day in range(1, days_ahead + 1):
             future_date = last_date + timedelta(days=day)
             
-            # Create feature vector for future date
-            # Use latest known values and simple extrapolation
-            latest = data.iloc[-1]
+            # Future row: route/traffic carried over from the latest arrival, price unknown
+            future = history.iloc[[-1]].copy()
+            future['Date'] = future_date
+            future['Price_per_kg'] = np.nan
             
-            features = {
-                'Distance_km': latest['Distance_km'],
-                'Traffic_Congestion_Score': latest['Traffic_Congestion_Score'],
-                'day_of_week': future_date.dayofweek,
-                'day_of_month': future_date.day,
-                'week_of_year': future_date.isocalendar()[1],
-                'month': future_date.month,
-                'days_since_start': latest['days_since_start'] + day,
-                'price_lag_1': latest['Price_per_kg'],  # Most recent price
-                'price_lag_7': data.iloc[-min(7, len(data))]['Price_per_kg'],
-                'price_lag_14': data.iloc[-min(14, len(data))]['Price_per_kg'],
-                'price_ma_7': latest['price_ma_7'],
-                'price_ma_14': latest['price_ma_14'],
-                'price_std_7': latest['price_std_7'],
-                'price_change_7d': latest['price_change_7d']
-            }
+            frame = pd.concat([history, future], ignore_index=True)
+            compute_features(frame, feature_cols, start_date=start_date,
+                             calendar_aligned=calendar_aligned, panel=panel)
             
-            X_pred = pd.DataFrame([features])[feature_cols]
-            predicted_price = model.predict(X_pred)[0]
+            X_pred = align_categories(frame.iloc[[-1]][feature_cols], category_levels(model))
+            predicted_price = float(predict(model, X_pred)[0])
             
             predictions.append({
                 'Date': future_date,
@@ -306,13 +1325,80 @@ class PricePredictor:
             })
             
             # Update data with prediction for next iteration (recursive forecasting)
-            new_row = latest.copy()
-            new_row['Date'] = future_date
-            new_row['Price_per_kg'] = predicted_price
-            data = pd.concat([data, pd.DataFrame([new_row])], ignore_index=True)
+            future['Price_per_kg'] = predicted_price
+            history = pd.concat([history, future], ignore_index=True)
         
         return pd.DataFrame(predictions)
     
+    def _model_path(self, mandi: str, crop: str) -> Path:
+        """File of a per-series model, or of a global model (per crop, or across all crops)."""
+        if mandi == GLOBAL_KEY:
+            name = "global_model" if crop == GLOBAL_KEY else f"global_{crop}_model"
+        else:
+            name = f"{mandi}_{crop}_model"
+        return self.models_dir / (name + MODEL_SUFFIX)
+    
+    def _get_model(self, key: Tuple[str, str]) -> Optional[xgb.Booster]:
+        """Booster for a (mandi, crop) key from the LRU, else from the bundle or disk (None if there is none)."""
+        model = self.models.get(key)
+        if model is not None:
+            return model
+        
+        entry = self._load_registry().get(f"{key[0]}|{key[1]}")
+        
+        # The bundled booster, unless the model was updated after the bundle was built
+        if self.bundle is not None and key in self.bundle and (
+                entry is None or entry.get('trained_at') == self.bundle.entry(key).get('trained_at')):
+            model = self.bundle.load_model(key)
+            self.models[key] = model
+            return model
+        
+        # Registered file, else an unregistered native or legacy pickled model
+        native_path = self._model_path(*key)
+        paths = [self.models_dir / entry['model_path']] if entry else []
+        paths += [native_path, native_path.with_suffix('.pkl')]
+        model_path = next((path for path in paths if path.exists()), None)
+        if model_path is None:
+            return None
+        
+        try:
+            model = load_model(model_path)
+        except Exception as e:
+            print(f"⚠️  Could not load model for {key[0]} - {key[1]}: {e}")
+            return None
+        if entry and model_path.name == entry['model_path'] and feature_names(model) != entry['features']:
+            print(f"⚠️  Model for {key[0]} - {key[1]} doesn't match its registry entry")
+            return None
+        self.models[key] = model
+        return model
+    
+    def _model_calendar_aligned(self, key: Tuple[str, str]) -> bool:
+        """Window mode a model was trained in (unregistered and older models used observation windows)."""
+        entry = self._load_registry().get(f"{key[0]}|{key[1]}")
+        if entry is None and self.bundle is not None:
+            entry = self.bundle.entry(key)
+        return bool(entry and entry.get('calendar_aligned', False))
+    
+    def _model_features(self, model) -> List[str]:
+        """
+        Feature columns a fitted model expects, in training order.
+        
+        Models trained on DataFrames carry their column names. Unnamed (legacy
+        pickled) models are matched by their input count, to LEGACY_FEATURES first.
+        
+        Raises:
+            ValueError: If an unnamed model's input count matches no known feature list
+        """
+        names = feature_names(model)
+        if names:
+            return names
+        booster = model if isinstance(model, xgb.Booster) else model.get_booster()
+        n_features = booster.num_features()
+        for candidate in (LEGACY_FEATURES, self.features):
+            if len(candidate) == n_features:
+                return list(candidate)
+        raise ValueError(f"Model has {n_features} unnamed inputs matching no known feature list; retrain it")
+    
     def get_price_forecast_all_mandis(
         self, 
         df: pd.DataFrame,
@@ -330,24 +1416,14 @@ class PricePredictor:
         Returns:
             Dictionary mapping mandi_name -> forecast DataFrame
         """
-        forecasts = {}
-        
-        mandis = df['Mandi_Name'].unique()
-        
-        for mandi in mandis:
-            try:
-                forecast = self.predict_future_price(df, mandi, crop, days_ahead)
-                forecasts[mandi] = forecast
-            except Exception as e:
-                # Silently skip mandis without trained models
-                pass
-        
-        return forecasts
+        # Mandis without trained models (or without history of the crop) are skipped
+        mandis = [str(mandi) for mandi in df['Mandi_Name'].unique()]
+        return self._forecast(df, crop, mandis, days_ahead)
 
 
 # Example usage
 if __name__ == "__main__":
-    from data_loader import MandiDataLoader
+    # Run as `python -m ml_arbitrage.price_predictor` (the module uses package-relative imports)
     
     # Load data
     loader = MandiDataLoader()
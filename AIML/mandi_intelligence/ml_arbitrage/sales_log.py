@@ -0,0 +1,121 @@
+"""
+Farmer Sales Log
+================
+
+Actual sale prices reported through the API's /respond endpoint, appended to
+a JSON-lines file so they survive restarts and can be shared by every API
+worker. PricePredictor.update_models turns the sales newer than each model's
+training window into daily price rows and warm-starts the model on them.
+"""
+
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+    _FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    _FCNTL_AVAILABLE = False
+
+DEFAULT_SALES_LOG = Path(__file__).parent / "feedback" / "sales.jsonl"
+
+SALE_FIELDS = ['farmer_id', 'mandi_name', 'crop', 'quantity', 'actual_price', 'sale_date']
+
+
+def record_sale(sale: Dict, path: Optional[Path] = None) -> Path:
+    """
+    Append one reported sale to the log.
+    
+    Args:
+        sale: Dictionary with SALE_FIELDS (extra keys are ignored)
+        path: Log file (defaults to DEFAULT_SALES_LOG)
+    
+    Returns:
+        Path of the log file
+    """
+    path = Path(path) if path else DEFAULT_SALES_LOG
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps({
+        **{field: sale.get(field) for field in SALE_FIELDS},
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+    }) + "\n"
+    # One write() on an O_APPEND descriptor, so concurrent workers don't interleave lines
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line.encode())
+    finally:
+        os.close(fd)
+    return path
+
+
+def load_sales(path: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Reported sales as daily price rows, one per (mandi, crop, date).
+    
+    Several sales on the same day are combined into their quantity-weighted
+    mean price; malformed lines are skipped.
+    
+    Args:
+        path: Log file (defaults to DEFAULT_SALES_LOG)
+    
+    Returns:
+        DataFrame with [Date, Mandi_Name, Crop, Price_per_kg] (empty if there are no sales)
+    """
+    path = Path(path) if path else DEFAULT_SALES_LOG
+    columns = ['Date', 'Mandi_Name', 'Crop', 'Price_per_kg']
+    if not path.exists():
+        return pd.DataFrame(columns=columns)
+    
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    sales = pd.DataFrame(records, columns=SALE_FIELDS)
+    sales['Date'] = pd.to_datetime(sales['sale_date'], errors='coerce').dt.normalize()
+    sales['quantity'] = pd.to_numeric(sales['quantity'], errors='coerce')
+    sales['actual_price'] = pd.to_numeric(sales['actual_price'], errors='coerce')
+    sales = sales.dropna(subset=['Date', 'mandi_name', 'crop', 'quantity', 'actual_price'])
+    sales = sales[(sales['quantity'] > 0) & (sales['actual_price'] > 0)]
+    if sales.empty:
+        return pd.DataFrame(columns=columns)
+    
+    sales['value'] = sales['quantity'] * sales['actual_price']
+    daily = sales.groupby(['Date', 'mandi_name', 'crop'], as_index=False)[['value', 'quantity']].sum()
+    daily['Price_per_kg'] = (daily['value'] / daily['quantity']).astype(np.float32)
+    daily = daily.rename(columns={'mandi_name': 'Mandi_Name', 'crop': 'Crop'})
+    return daily[columns].sort_values('Date', ignore_index=True)
+
+
+@contextmanager
+def update_lock(path: Optional[Path] = None):
+    """
+    Hold an exclusive lock next to the sales log while models are updated.
+    
+    API workers take turns: the first one warm-starts the models, the later
+    ones find them already up to date and only extend their data. Without
+    fcntl (Windows) this is a no-op.
+    
+    Args:
+        path: Sales log the lock belongs to (defaults to DEFAULT_SALES_LOG)
+    """
+    path = Path(path) if path else DEFAULT_SALES_LOG
+    if not _FCNTL_AVAILABLE:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
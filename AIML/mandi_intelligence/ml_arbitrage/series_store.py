@@ -0,0 +1,189 @@
+"""
+Calendar-Regularized Price Series Store
+=======================================
+
+Mandi arrivals have gaps (holidays, weekly closures), so "7 rows ago" is not
+"7 days ago". This module reindexes every (mandi, crop) series onto one dense
+daily calendar stored as a 2D NumPy array (series x days) plus an
+observed-mask, which turns lags, rolling windows and point lookups into plain
+index arithmetic that is correct with respect to real time.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Tuple
+
+
+class PriceSeriesStore:
+    """
+    Dense (series x days) price matrix for all Mandi-Crop combinations.
+    
+    values[s, d] is the price of series s on calendar day d (NaN when there was
+    no arrival), mask[s, d] is True where a price was observed.
+    """
+    
+    def __init__(
+        self,
+        keys: pd.DataFrame,
+        calendar: pd.DatetimeIndex,
+        values: np.ndarray,
+        mask: np.ndarray
+    ):
+        """
+        Initialize the store (use PriceSeriesStore.from_frame to build one).
+        
+        Args:
+            keys: DataFrame with [Mandi_Name, Crop], one row per series (row i = series i)
+            calendar: Daily DatetimeIndex, one entry per matrix column
+            values: float32 array of shape (n_series, n_days)
+            mask: bool array of shape (n_series, n_days)
+        """
+        self.keys = keys.reset_index(drop=True)
+        self.calendar = calendar
+        self.values = values
+        self.mask = mask
+        self._key_index = {
+            (str(m), str(c)): i for i, (m, c) in enumerate(zip(self.keys['Mandi_Name'], self.keys['Crop']))
+        }
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, value_col: str = 'Price_per_kg') -> 'PriceSeriesStore':
+        """
+        Build the store from a processed frame.
+        
+        Rows are expected to be unique per (Date, Mandi_Name, Crop), which the
+        loader's quality pass guarantees; otherwise the last row wins.
+        
+        Args:
+            df: DataFrame with columns [Date, Mandi_Name, Crop, value_col]
+            value_col: Column holding the series values
+        
+        Returns:
+            PriceSeriesStore
+        """
+        dates = df['Date'].dt.normalize()
+        start = dates.min() if len(df) else pd.Timestamp('today').normalize()
+        end = dates.max() if len(df) else start
+        calendar = pd.date_range(start, end, freq='D')
+        
+        series_idx = df.groupby(['Mandi_Name', 'Crop'], observed=True, sort=True).ngroup().to_numpy()
+        keys = df[['Mandi_Name', 'Crop']].drop_duplicates().sort_values(['Mandi_Name', 'Crop'])
+        day_idx = ((dates - start) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+        
+        values = np.full((len(keys), len(calendar)), np.nan, dtype=np.float32)
+        mask = np.zeros((len(keys), len(calendar)), dtype=bool)
+        values[series_idx, day_idx] = df[value_col].to_numpy(dtype=np.float32)
+        mask[series_idx, day_idx] = True
+        
+        return cls(keys, calendar, values, mask)
+    
+    @property
+    def n_series(self) -> int:
+        return self.values.shape[0]
+    
+    @property
+    def n_days(self) -> int:
+        return self.values.shape[1]
+    
+    def series_index(self, mandi: str, crop: str) -> int:
+        """Row of a Mandi-Crop series (KeyError if unknown)."""
+        return self._key_index[(mandi, crop)]
+    
+    def day_index(self, date) -> int:
+        """Column of a calendar date (may be out of range for dates outside the calendar)."""
+        return int((pd.Timestamp(date).normalize() - self.calendar[0]) // pd.Timedelta(days=1))
+    
+    def locate(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (series, day) coordinates of every row of df, for gathering matrix values back onto rows.
+        
+        Args:
+            df: DataFrame with columns [Date, Mandi_Name, Crop] covered by this store
+        
+        Returns:
+            Tuple of int arrays (series_idx, day_idx)
+        """
+        series_idx = np.array([
+            self._key_index[(str(m), str(c))] for m, c in zip(df['Mandi_Name'], df['Crop'])
+        ], dtype=np.int64)
+        day_idx = ((df['Date'].dt.normalize() - self.calendar[0]) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+        return series_idx, day_idx
+    
+    def value(self, mandi: str, crop: str, date) -> float:
+        """Observed price of a series on a given day (NaN if none)."""
+        d = self.day_index(date)
+        if d < 0 or d >= self.n_days:
+            return np.nan
+        return float(self.values[self.series_index(mandi, crop), d])
+    
+    def series(self, mandi: str, crop: str) -> pd.Series:
+        """Dense daily series for one Mandi-Crop combination (NaN on days without arrivals)."""
+        return pd.Series(self.values[self.series_index(mandi, crop)], index=self.calendar, name=f"{mandi}_{crop}")
+    
+    def forward_filled(self) -> np.ndarray:
+        """Values carried forward from the last observed day (NaN before a series' first observation)."""
+        days = np.arange(self.n_days)
+        last_seen = np.where(self.mask, days[None, :], -1)
+        np.maximum.accumulate(last_seen, axis=1, out=last_seen)
+        
+        filled = np.take_along_axis(self.values, np.maximum(last_seen, 0), axis=1)
+        filled[last_seen < 0] = np.nan
+        return filled
+    
+    def lag(self, days: int, asof: bool = False) -> np.ndarray:
+        """
+        Price `days` calendar days earlier.
+        
+        Args:
+            days: Lag in calendar days
+            asof: If True, use the last observed price on or before that day
+                  instead of NaN when the mandi had no arrival then
+        
+        Returns:
+            (n_series, n_days) array
+        """
+        source = self.forward_filled() if asof else self.values
+        lagged = np.full_like(source, np.nan)
+        if days < self.n_days:
+            lagged[:, days:] = source[:, :self.n_days - days]
+        return lagged
+    
+    def _window_sums(self, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Count, sum and sum of squares of observed values in the trailing `window` days."""
+        observed = np.where(self.mask, self.values, 0).astype(np.float64)
+        
+        def trailing(a: np.ndarray) -> np.ndarray:
+            c = np.cumsum(a, axis=1)
+            out = c.copy()
+            out[:, window:] -= c[:, :-window]
+            return out
+        
+        return trailing(self.mask.astype(np.float64)), trailing(observed), trailing(observed ** 2)
+    
+    def rolling_mean(self, window: int) -> np.ndarray:
+        """Mean of observed prices in the trailing `window` calendar days (NaN if none)."""
+        count, total, _ = self._window_sums(window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (total / count).astype(np.float32)
+    
+    def rolling_std(self, window: int) -> np.ndarray:
+        """Sample std (ddof=1) of observed prices in the trailing `window` calendar days."""
+        count, total, squares = self._window_sums(window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (squares - total ** 2 / count) / (count - 1)
+        return np.sqrt(np.clip(var, 0, None)).astype(np.float32)
+    
+    def pct_change(self, days: int) -> np.ndarray:
+        """Relative change versus the last observed price `days` calendar days earlier."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.values / self.lag(days, asof=True) - 1
+    
+    def summary(self) -> Dict:
+        """Size and coverage of the store."""
+        return {
+            'series': self.n_series,
+            'days': self.n_days,
+            'start': str(self.calendar[0].date()) if self.n_days else None,
+            'end': str(self.calendar[-1].date()) if self.n_days else None,
+            'coverage_pct': round(float(self.mask.mean() * 100), 1) if self.mask.size else 0.0
+        }
@@ -0,0 +1,245 @@
+"""
+Serving Bundle
+==============
+
+A single precompiled file with everything the API needs to serve forecasts:
+the featured data snapshot and every registered booster. Each API worker
+memory-maps the file read-only instead of loading the CSV, building features
+and loading models itself, so:
+
+- startup is a header read (no parsing, feature engineering or training)
+- the snapshot's columns are NumPy views of the mapping, and the file's pages
+  are shared between all workers through the OS page cache
+- boosters are deserialized once, in the server's master process, when it
+  preloads the bundle (api/main.py with MANDI_PRELOAD_BUNDLE=1, served by a
+  forking server such as gunicorn --preload); workers forked after that share
+  the boosters' pages copy-on-write. Without a preload each worker
+  deserializes (copies) only the models it serves, on first use, into its own
+  bounded LRU (PricePredictor.models)
+
+Layout: MAGIC, header length (uint64 LE), JSON header, then data blocks
+(column arrays, category codes, UBJSON model bytes) aligned to BLOCK_ALIGNMENT.
+Build it with train_models.py (or build_bundle) after the models are trained.
+"""
+
+import json
+import mmap
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from .data_loader import PROCESSED_CACHE_VERSION, atomic_write
+
+# Default bundle file (in the predictor's models_dir)
+BUNDLE_FILE = "serving_bundle.bin"
+
+# Bump when the file layout changes
+BUNDLE_FORMAT_VERSION = 2
+
+MAGIC = b"MANDIBND"
+
+# Data blocks start on this boundary so column views are aligned for any dtype
+BLOCK_ALIGNMENT = 64
+
+
+def _pad(size: int) -> int:
+    return -size % BLOCK_ALIGNMENT
+
+
+def build_bundle(
+    predictor,
+    df: pd.DataFrame,
+    path: Optional[Path] = None,
+    data_key: Optional[str] = None
+) -> Path:
+    """
+    Write the featured snapshot and all valid registered models of a predictor into one file.
+    
+    Args:
+        predictor: PricePredictor whose registry lists the models to bundle (models trained
+            with another feature spec or data version are skipped)
+        df: Featured DataFrame the API serves from (e.g. PricePredictor.load_features output)
+        path: Output file (defaults to models_dir / BUNDLE_FILE)
+        data_key: MandiDataLoader.processed_key of the data df was built from, so readers
+            can tell when the dataset has changed since (None = unknown, never current)
+    
+    Returns:
+        Path of the written bundle
+    """
+    path = Path(path) if path else predictor.models_dir / BUNDLE_FILE
+    blocks = []
+    offset = 0
+    
+    def add_block(data: bytes) -> Dict:
+        nonlocal offset
+        block = {'offset': offset, 'nbytes': len(data)}
+        blocks.append(data + b"\0" * _pad(len(data)))
+        offset += len(data) + _pad(len(data))
+        return block
+    
+    # Featured snapshot: one raw array per column (categoricals as codes + categories)
+    columns = []
+    for name in df.columns:
+        values = df[name]
+        if not (isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_numeric_dtype(values)
+                or pd.api.types.is_datetime64_dtype(values)):
+            values = values.astype('category')
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = np.ascontiguousarray(values.array.codes)
+            column = {'name': name, 'dtype': codes.dtype.str,
+                      'categories': values.cat.categories.astype(str).tolist(), **add_block(codes.tobytes())}
+        else:
+            array = np.ascontiguousarray(values.to_numpy())
+            column = {'name': name, 'dtype': array.dtype.str, **add_block(array.tobytes())}
+        columns.append(column)
+    
+    # Registered boosters, copied as-is from their native model files
+    models = {}
+    for key, entry in predictor._load_registry().items():
+        model_path = predictor.models_dir / entry['model_path']
+        if (entry.get('feature_version') != predictor.feature_version()
+                or entry.get('data_version') != PROCESSED_CACHE_VERSION
+                or model_path.suffix == '.pkl' or not model_path.exists()):
+            continue
+        models[key] = {**entry, **add_block(model_path.read_bytes())}
+    
+    header = json.dumps({
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'feature_version': predictor.feature_version(),
+        'data_version': PROCESSED_CACHE_VERSION,
+        'data_key': data_key,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'n_rows': len(df),
+        'columns': columns,
+        'models': models,
+    }).encode()
+    prefix = len(MAGIC) + 8 + len(header)
+    header += b" " * _pad(prefix)
+    
+    def write(tmp_path: Path):
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + struct.pack('<Q', len(header)) + header)
+            for block in blocks:
+                f.write(block)
+    
+    atomic_write(path, write)
+    
+    print(f"📦 Serving bundle: {len(df):,} rows, {len(models)} models, "
+          f"{path.stat().st_size / 1024 ** 2:.1f} MB -> {path}")
+    return path
+
+
+class ServingBundle:
+    """
+    Read-only view of a serving bundle file.
+    
+    The file is memory-mapped once; frame columns are zero-copy views of the
+    mapping and boosters are deserialized from it on request, or all at once
+    by preload().
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Map a bundle file.
+        
+        Args:
+            path: File written by build_bundle
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a serving bundle")
+        (header_size,) = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        data_start = len(MAGIC) + 8
+        self.header = json.loads(bytes(self._mmap[data_start:data_start + header_size]))
+        if self.header['format_version'] != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"{self.path} has bundle format {self.header['format_version']}, "
+                             f"expected {BUNDLE_FORMAT_VERSION}")
+        self._data_start = data_start + header_size
+        self._frame = None
+        self._models = {}  # {(mandi, crop): xgb.Booster} deserialized by preload()
+    
+    @property
+    def feature_version(self) -> str:
+        return self.header['feature_version']
+    
+    @property
+    def data_version(self) -> int:
+        return self.header['data_version']
+    
+    @property
+    def data_key(self) -> Optional[str]:
+        """processed_key of the data the snapshot was built from (None if unknown)."""
+        return self.header['data_key']
+    
+    def is_current(self, feature_version: str, data_key: Optional[str]) -> bool:
+        """
+        Whether the bundle was built with this feature spec, processing version and data.
+        
+        Args:
+            feature_version: PricePredictor.feature_version() of the reader
+            data_key: MandiDataLoader.processed_key of the data the reader would load
+        """
+        return (self.feature_version == feature_version and self.data_version == PROCESSED_CACHE_VERSION
+                and self.data_key == data_key)
+    
+    def _array(self, block: Dict) -> np.ndarray:
+        dtype = np.dtype(block['dtype'])
+        return np.frombuffer(self._mmap, dtype=dtype, count=block['nbytes'] // dtype.itemsize,
+                             offset=self._data_start + block['offset'])
+    
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Featured snapshot, backed by the (read-only) mapping."""
+        if self._frame is None:
+            data = {}
+            for column in self.header['columns']:
+                values = self._array(column)
+                if 'categories' in column:
+                    values = pd.Categorical.from_codes(values, column['categories'], validate=False)
+                data[column['name']] = values
+            self._frame = pd.DataFrame(data, copy=False)
+        return self._frame
+    
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return f"{key[0]}|{key[1]}" in self.header['models']
+    
+    def __len__(self) -> int:
+        return len(self.header['models'])
+    
+    def entry(self, key: Tuple[str, str]) -> Optional[Dict]:
+        """Registry entry of a bundled model (None if it isn't bundled)."""
+        return self.header['models'].get(f"{key[0]}|{key[1]}")
+    
+    def preload(self) -> int:
+        """
+        Deserialize every bundled booster now and keep it for load_model.
+        
+        Run in a server's master process before it forks its workers, the boosters
+        are shared copy-on-write by all of them instead of each worker loading its own.
+        
+        Returns:
+            Number of boosters loaded
+        """
+        for name in self.header['models']:
+            key = tuple(name.split("|", 1))
+            self._models[key] = self.load_model(key)
+        return len(self._models)
+    
+    def load_model(self, key: Tuple[str, str]) -> Optional[xgb.Booster]:
+        """Booster of a (mandi, crop) key, preloaded or deserialized from the mapping (None if it isn't bundled)."""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        entry = self.entry(key)
+        if entry is None:
+            return None
+        start = self._data_start + entry['offset']
+        return xgb.Booster(model_file=bytearray(self._mmap[start:start + entry['nbytes']]))
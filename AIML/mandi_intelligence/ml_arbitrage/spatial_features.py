@@ -0,0 +1,175 @@
+"""
+Cross-Mandi Spatial Features
+============================
+
+Prices at nearby mandis move together, so a series' neighbours carry signal
+its own history does not. For every crop the processed frame is pivoted once
+into a (days x mandis) matrix of the last price known before each day, and
+neighbour aggregates are computed on that matrix with NumPy:
+
+- nearby_mean_price: mean of the K nearest mandis (coordinates from
+  distance_calculator.LOCATION_COORDINATES)
+- state_median_price: median over the mandis of the same state
+- nearest_price: price at the nearest mandi with a known price
+
+Only prices from earlier days are used, so the features are available at
+forecast time (a same-day neighbour price is not) and don't leak the target.
+"""
+
+import re
+import warnings
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from .distance_calculator import get_coordinates
+
+# Number of neighbouring mandis averaged into nearby_mean_price
+DEFAULT_NEIGHBORS = 3
+
+
+def mandi_coordinates(mandi_name: str) -> Optional[Tuple[float, float]]:
+    """
+    (lat, lon) of a mandi, matching on its district name when the mandi itself is not listed.
+    
+    Market names such as "Rajkot2" or "Ahmedabad(Chimanbhai Patal Market Vasana)"
+    resolve to the coordinates of Rajkot / Ahmedabad.
+    """
+    coords = get_coordinates(mandi_name)
+    if coords is None:
+        base = re.sub(r'[\d\s]+$', '', mandi_name.split('(')[0]).strip()
+        coords = get_coordinates(base) if base else None
+    return coords
+
+
+def _forward_fill_rows(matrix: np.ndarray) -> np.ndarray:
+    """Carry each column's last non-NaN value down the rows."""
+    rows = np.arange(matrix.shape[0])[:, None]
+    last_seen = np.where(~np.isnan(matrix), rows, -1)
+    np.maximum.accumulate(last_seen, axis=0, out=last_seen)
+    filled = np.take_along_axis(matrix, np.maximum(last_seen, 0), axis=0)
+    filled[last_seen < 0] = np.nan
+    return filled
+
+
+def _pairwise_km(coords: np.ndarray) -> np.ndarray:
+    """Great-circle distances (km) between all rows of an (n, 2) lat/lon array; NaN coords give NaN."""
+    lat, lon = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+    return 2 * 6371 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _positions(names: pd.Series, index: pd.Index) -> np.ndarray:
+    """Position of each name in index (-1 if absent), resolving categoricals once per category."""
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        category_pos = index.get_indexer(names.cat.categories.astype(str))
+        codes = names.cat.codes.to_numpy()
+        return np.where(codes >= 0, category_pos[codes], -1)
+    return index.get_indexer(names.astype(str))
+
+
+class SpatialPanel:
+    """
+    Per-crop neighbour aggregates over the last known price of every mandi.
+    
+    Row d of each matrix holds what was known before calendar day d; the final
+    row holds everything known after the last day, and is used for any later date.
+    """
+    
+    def __init__(self, reference: pd.DataFrame, k: int = DEFAULT_NEIGHBORS):
+        """
+        Build the panel.
+        
+        Args:
+            reference: Processed rows [Date, State, Mandi_Name, Crop, Price_per_kg] whose
+                prices are visible to the features (normally the training frame itself)
+            k: Number of nearest mandis averaged into nearby_mean_price
+        """
+        self.k = k
+        self._crops: Dict[str, Dict] = {}
+        for crop, rows in reference.groupby('Crop', observed=True, sort=False):
+            self._crops[str(crop)] = self._build(rows)
+    
+    def _build(self, rows: pd.DataFrame) -> Dict:
+        """Pivot one crop into (days x mandis) and aggregate over neighbours."""
+        mandi_codes, mandis = pd.factorize(rows['Mandi_Name'])
+        mandis = pd.Index(np.asarray(mandis, dtype=object).astype(str))
+        dates = rows['Date'].dt.normalize()
+        start = dates.min()
+        day_idx = ((dates - start) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+        n_days = int(day_idx.max()) + 1
+        
+        # One pivot: observed prices, then the last known price strictly before each day
+        observed = np.full((n_days, len(mandis)), np.nan)
+        observed[day_idx, mandi_codes] = rows['Price_per_kg'].to_numpy(dtype=np.float64)
+        known = np.full((n_days + 1, len(mandis)), np.nan)
+        known[1:] = _forward_fill_rows(observed)
+        
+        # K nearest mandis with coordinates (excluding the mandi itself)
+        coords = np.array([mandi_coordinates(m) or (np.nan, np.nan) for m in mandis], dtype=np.float64)
+        distances = _pairwise_km(coords)
+        distances[np.isnan(distances)] = np.inf
+        np.fill_diagonal(distances, np.inf)
+        k = min(self.k, max(len(mandis) - 1, 0))
+        order = np.argsort(distances, axis=1, kind='stable')[:, :k]
+        reachable = np.isfinite(np.take_along_axis(distances, order, axis=1))
+        
+        neighbor_prices = known[:, order]  # (days + 1, mandis, k), nearest first
+        neighbor_prices[:, ~reachable] = np.nan
+        present = ~np.isnan(neighbor_prices)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            nearby_mean = np.where(present, neighbor_prices, 0).sum(axis=2) / present.sum(axis=2)
+        
+        if k:
+            first_present = np.argmax(present, axis=2)
+            nearest = np.take_along_axis(neighbor_prices, first_present[..., None], axis=2)[..., 0]
+        else:
+            nearest = np.full_like(known, np.nan)
+        
+        # State-wide median of the last known prices
+        state_median = np.full_like(known, np.nan)
+        states = rows.groupby(mandi_codes)['State'].first().astype(str).to_numpy() \
+            if 'State' in rows.columns else np.full(len(mandis), '')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN days before any arrival
+            for state in np.unique(states):
+                cols = np.flatnonzero(states == state)
+                state_median[:, cols] = np.nanmedian(known[:, cols], axis=1)[:, None]
+        
+        return {
+            'start': start,
+            'mandis': mandis,
+            'nearby_mean_price': nearby_mean.astype(np.float32),
+            'state_median_price': state_median.astype(np.float32),
+            'nearest_price': nearest.astype(np.float32),
+        }
+    
+    def lookup(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Spatial aggregates for every row of df (positional, NaN where unavailable).
+        
+        Args:
+            df: Rows with [Date, Mandi_Name, Crop]
+        
+        Returns:
+            Dictionary mapping aggregate name -> float32 array of len(df)
+        """
+        names = ('nearby_mean_price', 'state_median_price', 'nearest_price')
+        out = {name: np.full(len(df), np.nan, dtype=np.float32) for name in names}
+        
+        for crop, rows in df.groupby('Crop', observed=True, sort=False).indices.items():
+            panel = self._crops.get(str(crop))
+            if panel is None:
+                continue
+            part = df.iloc[rows]
+            n_rows = panel['nearest_price'].shape[0]
+            day_idx = ((part['Date'].dt.normalize() - panel['start']) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+            day_idx = np.clip(day_idx, 0, n_rows - 1)  # dates after the panel see the last known prices
+            col_idx = _positions(part['Mandi_Name'], panel['mandis'])
+            found = col_idx >= 0
+            for name in names:
+                out[name][rows[found]] = panel[name][day_idx[found], col_idx[found]]
+        
+        return out
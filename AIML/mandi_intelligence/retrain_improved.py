@@ -15,13 +15,12 @@ print()
 # Load ALL available data (not just 90 days)
 print("Step 1: Loading ALL available historical data...")
 loader = MandiDataLoader()
-loader.load_data("dataset/commodity_price.csv")
-df = loader.filter_and_process(days=None)  # None = use ALL data
+df = loader.load_processed("dataset/commodity_price.csv", days=None)  # None = use ALL data
 
 print()
 print("Step 2: Preparing features...")
 predictor = PricePredictor()
-df_featured = predictor.prepare_features(df)
+df_featured = predictor.load_features(df)
 
 print()
 print("Step 3: Training improved models...")
@@ -0,0 +1,125 @@
+"""
+Feature Engineering Benchmark
+
+Times the feature pass on synthetic data with an increasing number of
+Mandi-Crop series (up to 5,000): the price features alone, and the default
+feature set in calendar-aligned mode (what training runs). The reference is
+the original per-group prepare_features loop, timed on the sizes where it is
+still affordable.
+
+The original loop's rolling windows include a row's own price (the training
+target), and its bfill()/ffill() runs across the whole frame. The vectorized
+features are causal instead, so on rows with a full 14-observation history
+they equal the loop's lags on the same row and its rolling/momentum values
+one observation earlier; the parity column is checked there.
+
+Usage:
+    python scripts/benchmark_features.py [--days 365] [--legacy-max-series 500]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.features import DEFAULT_FEATURES, PRICE_FEATURES, compute_features
+
+# Features the original loop computes at the row itself vs. one observation later
+SAME_ROW = ['price_lag_1', 'price_lag_7', 'price_lag_14']
+SHIFTED = ['price_ma_7', 'price_ma_14', 'price_std_7', 'price_change_7d']
+
+# Observations of history a row needs before every feature is fully defined
+FULL_HISTORY = 15
+
+
+def legacy_prepare_features(df: pd.DataFrame) -> pd.DataFrame:
+    """The original prepare_features: one groupby iteration and seven df.loc writes per series."""
+    df = df.copy()
+    df = df.sort_values(['Mandi_Name', 'Crop', 'Date']).reset_index(drop=True)
+    
+    # Temporal features
+    df['day_of_week'] = df['Date'].dt.dayofweek
+    df['day_of_month'] = df['Date'].dt.day
+    df['week_of_year'] = df['Date'].dt.isocalendar().week
+    df['month'] = df['Date'].dt.month
+    
+    # Days since start (trend)
+    min_date = df['Date'].min()
+    df['days_since_start'] = (df['Date'] - min_date).dt.days
+    
+    # Group by Mandi-Crop for time-series features
+    for (mandi, crop), group in df.groupby(['Mandi_Name', 'Crop'], observed=True):
+        idx = group.index
+        
+        # Lag features (price from N days ago)
+        df.loc[idx, 'price_lag_1'] = group['Price_per_kg'].shift(1)
+        df.loc[idx, 'price_lag_7'] = group['Price_per_kg'].shift(7)
+        df.loc[idx, 'price_lag_14'] = group['Price_per_kg'].shift(14)
+        
+        # Rolling statistics
+        df.loc[idx, 'price_ma_7'] = group['Price_per_kg'].rolling(window=7, min_periods=1).mean()
+        df.loc[idx, 'price_ma_14'] = group['Price_per_kg'].rolling(window=14, min_periods=1).mean()
+        df.loc[idx, 'price_std_7'] = group['Price_per_kg'].rolling(window=7, min_periods=1).std()
+        
+        # Price momentum (rate of change)
+        df.loc[idx, 'price_change_7d'] = group['Price_per_kg'].pct_change(periods=7)
+    
+    # Fill NaN values created by lag/rolling operations
+    df = df.bfill()  # Backward fill
+    df = df.ffill()  # Forward fill
+    
+    return df
+
+
+def parity_diff(vectorized: pd.DataFrame, legacy: pd.DataFrame) -> float:
+    """Largest difference to the original loop on rows with a full history (see module docstring)."""
+    series = legacy.groupby(['Mandi_Name', 'Crop'], observed=True)
+    expected = pd.concat([legacy[SAME_ROW], series[SHIFTED].shift(1)], axis=1)
+    full = (series.cumcount() >= FULL_HISTORY).to_numpy()
+    actual = vectorized[SAME_ROW + SHIFTED].to_numpy(float)[full]
+    return float(np.abs(actual - expected[SAME_ROW + SHIFTED].to_numpy(float)[full]).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prepare_features scaling")
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--legacy-max-series', type=int, default=500)
+    args = parser.parse_args()
+    
+    loader = MandiDataLoader(cache_dir=tempfile.mkdtemp(prefix="mandi_bench_"))
+    print(f"{'series':>8} {'rows':>12} {'price (s)':>11} {'default+calendar (s)':>21} "
+          f"{'original loop (s)':>18} {'max abs diff':>14}")
+    for n_mandis in (10, 125, 1250):
+        df = loader.generate_synthetic_data(days=args.days, n_mandis=n_mandis, n_crops=4, seed=0)
+        n_series = n_mandis * 4
+        
+        sorted_df = df.sort_values(['Mandi_Name', 'Crop', 'Date']).reset_index(drop=True)
+        start = time.perf_counter()
+        vectorized = sorted_df.copy()
+        compute_features(vectorized, PRICE_FEATURES)
+        vectorized_s = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        compute_features(sorted_df.copy(), DEFAULT_FEATURES, calendar_aligned=True)
+        default_s = time.perf_counter() - start
+        
+        legacy_s, diff = float('nan'), float('nan')
+        if n_series <= args.legacy_max_series:
+            start = time.perf_counter()
+            legacy = legacy_prepare_features(df)
+            legacy_s = time.perf_counter() - start
+            diff = parity_diff(vectorized, legacy)
+        
+        print(f"{n_series:>8,} {len(df):>12,} {vectorized_s:>11.3f} {default_s:>21.3f} "
+              f"{legacy_s:>18.3f} {diff:>14.2e}")
+
+if __name__ == "__main__":
+    main()
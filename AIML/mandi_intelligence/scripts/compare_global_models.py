@@ -0,0 +1,105 @@
+"""
+Global vs Per-Series Model Comparison
+
+Trains per-(mandi, crop) models and per-crop global models on the same
+history and evaluates both on the same held-out period (the most recent 20%
+of dates): accuracy on the rows both can forecast, coverage, training time
+and model storage.
+
+Usage:
+    python scripts/compare_global_models.py [--dataset dataset/commodity_price.csv] [--days 90]
+    python scripts/compare_global_models.py --synthetic 200   # 200 synthetic mandis x 3 crops
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.price_predictor import (
+    MIN_TRAINING_RECORDS, PricePredictor, align_categories, fit_global_model, fit_series_model
+)
+from ml_arbitrage.model_store import category_levels
+
+
+def load_frame(args) -> pd.DataFrame:
+    loader = MandiDataLoader()
+    if args.synthetic:
+        return loader.generate_synthetic_data(days=args.days, n_mandis=args.synthetic, n_crops=3, seed=0)
+    return loader.load_processed(args.dataset, days=args.days or None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare global and per-series price models")
+    parser.add_argument('--dataset', default="dataset/commodity_price.csv")
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--synthetic', type=int, default=0, help="Use N synthetic mandis instead of the dataset")
+    args = parser.parse_args()
+    
+    df = load_frame(args)
+    predictor = PricePredictor(models_dir=str(Path(__file__).parent.parent / 'ml_arbitrage' / 'models'))
+    featured = predictor.prepare_features(df)
+    
+    # Same hold-out period for both approaches
+    dates = np.sort(featured['Date'].unique())
+    cutoff = dates[int(len(dates) * 0.8)]
+    train, test = featured[featured['Date'] < cutoff], featured[featured['Date'] >= cutoff]
+    test = test.assign(series_pred=np.nan, global_pred=np.nan)
+    
+    # Per-series models (same fit as train_all_models; only series with enough history)
+    series_seconds, series_bytes, series_models = 0.0, 0, 0
+    for (mandi, crop), rows in train.groupby(['Mandi_Name', 'Crop'], observed=True):
+        if len(rows) < MIN_TRAINING_RECORDS:
+            continue
+        start = time.perf_counter()
+        model, _ = fit_series_model(rows, predictor.features)
+        series_seconds += time.perf_counter() - start
+        series_bytes += len(model.get_booster().save_raw('ubj'))
+        series_models += 1
+        mask = (test['Mandi_Name'] == mandi) & (test['Crop'] == crop)
+        if mask.any():
+            test.loc[mask, 'series_pred'] = model.predict(test.loc[mask, predictor.features])
+    
+    # One global model per crop, with the mandi as a categorical input
+    global_seconds, global_bytes, global_models = 0.0, 0, 0
+    feature_cols = predictor.features + ['Mandi_Name']
+    for crop, rows in train.groupby('Crop', observed=True):
+        start = time.perf_counter()
+        model, _ = fit_global_model(rows, feature_cols)
+        global_seconds += time.perf_counter() - start
+        global_bytes += len(model.get_booster().save_raw('ubj'))
+        global_models += 1
+        mask = test['Crop'] == crop
+        X = align_categories(test.loc[mask, feature_cols], category_levels(model))
+        test.loc[mask, 'global_pred'] = model.predict(X)
+    
+    both = test.dropna(subset=['series_pred', 'global_pred'])
+    n_series = featured.groupby(['Mandi_Name', 'Crop'], observed=True).ngroups
+    
+    def covered(col):
+        return test.dropna(subset=[col]).groupby(['Mandi_Name', 'Crop'], observed=True).ngroups
+    
+    def mae(col):
+        return float(np.mean(np.abs(both[col] - both['Price_per_kg']))) if len(both) else float('nan')
+    
+    print()
+    print("=" * 72)
+    print(f"  {len(featured):,} rows | {n_series} series | hold-out from {pd.Timestamp(cutoff).date()}")
+    print("=" * 72)
+    print(f"{'':22}{'per-series':>16}{'global (per crop)':>20}")
+    print(f"{'models':22}{series_models:>16}{global_models:>20}")
+    print(f"{'series covered':22}{covered('series_pred'):>16}{covered('global_pred'):>20}")
+    print(f"{'MAE on shared rows':22}{mae('series_pred'):>16.3f}{mae('global_pred'):>20.3f}")
+    print(f"{'training time (s)':22}{series_seconds:>16.2f}{global_seconds:>20.2f}")
+    print(f"{'model storage (KB)':22}{series_bytes / 1024:>16.0f}{global_bytes / 1024:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
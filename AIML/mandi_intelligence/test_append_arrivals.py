@@ -0,0 +1,67 @@
+"""
+Incremental append_arrivals against a full rebuild (pytest)
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+
+DATASET = Path(__file__).parent / "dataset" / "commodity_price.csv"
+KEYS = ['Date', 'Mandi_Name', 'Crop']
+
+
+@pytest.fixture(scope="module")
+def raw():
+    """The bundled day of arrivals plus the same records reported a day later."""
+    history = pd.read_csv(DATASET)
+    batch = history.assign(Arrival_Date='20/05/2025')
+    return history, batch
+
+
+def processed(raw_data: pd.DataFrame, cache_dir: Path) -> MandiDataLoader:
+    loader = MandiDataLoader(cache_dir=str(cache_dir))
+    loader.raw_data = raw_data
+    loader.filter_and_process(quality_check=True)
+    return loader
+
+
+def sorted_keys(df: pd.DataFrame) -> pd.DataFrame:
+    keys = df[KEYS].astype({'Mandi_Name': str, 'Crop': str})
+    return keys.sort_values(KEYS).reset_index(drop=True)
+
+
+def test_append_matches_full_rebuild(raw, tmp_path):
+    history, batch = raw
+    loader = processed(history, tmp_path / "cache")
+    result = loader.append_arrivals(batch)
+    
+    rebuilt = processed(pd.concat([history, batch], ignore_index=True), tmp_path / "rebuilt").processed_data
+    assert result['records_added'] == (rebuilt['Date'] == rebuilt['Date'].max()).sum()
+    assert result['records_merged'] == 0
+    assert sorted_keys(loader.processed_data).equals(sorted_keys(rebuilt))
+    assert loader.processed_data['Date'].is_monotonic_increasing
+
+
+def test_repeated_batch_is_merged_not_duplicated(raw, tmp_path):
+    history, batch = raw
+    loader = processed(history, tmp_path / "cache")
+    first = loader.append_arrivals(batch)
+    n_rows = len(loader.processed_data)
+    
+    # The same batch again only merges into the key-days it added
+    second = loader.append_arrivals(batch)
+    assert second['records_added'] == 0
+    assert second['records_merged'] == first['records_added']
+    assert len(loader.processed_data) == n_rows
+    assert not loader.processed_data.duplicated(KEYS).any()
+
+
+def test_append_requires_processed_data(raw, tmp_path):
+    with pytest.raises(ValueError):
+        MandiDataLoader(cache_dir=str(tmp_path / "cache")).append_arrivals(raw[1])
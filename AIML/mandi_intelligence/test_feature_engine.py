@@ -0,0 +1,61 @@
+"""
+Incremental feature engine parity with prepare_features (pytest)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.feature_engine import IncrementalFeatureEngine
+from ml_arbitrage.price_predictor import PricePredictor
+
+
+@pytest.fixture(scope="module")
+def gappy_data(tmp_path_factory):
+    """Synthetic prices with ~30% of arrival days missing."""
+    loader = MandiDataLoader(cache_dir=str(tmp_path_factory.mktemp("cache")))
+    df = loader.generate_synthetic_data(days=90, n_mandis=6, n_crops=2, seed=1)
+    keep = np.random.default_rng(0).random(len(df)) > 0.3
+    return df[keep].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("calendar_aligned", [False, True])
+def test_update_matches_prepare_features(gappy_data, tmp_path, calendar_aligned):
+    df = gappy_data
+    cut = df['Date'].max() - pd.Timedelta(days=5)
+    history, new = df[df['Date'] <= cut], df[df['Date'] > cut]
+    # One series is first seen in the new batch
+    history = history[history['Mandi_Name'] != new['Mandi_Name'].iloc[0]]
+    
+    predictor = PricePredictor(models_dir=str(tmp_path), calendar_aligned=calendar_aligned)
+    full = predictor.prepare_features(pd.concat([history, new]))
+    expected = full[full['Date'] > cut].sort_values(['Mandi_Name', 'Crop', 'Date']).reset_index(drop=True)
+    
+    engine = IncrementalFeatureEngine.from_history(history, start_date=df['Date'].min(),
+                                                   calendar_aligned=calendar_aligned)
+    # Two batches, so state carried between update calls is covered too
+    split = new['Date'].min() + pd.Timedelta(days=2)
+    emitted = pd.concat([engine.update(new[new['Date'] <= split]), engine.update(new[new['Date'] > split])])
+    emitted = emitted.sort_values(['Mandi_Name', 'Crop', 'Date']).reset_index(drop=True)
+    
+    assert len(emitted) == len(expected)
+    for col in IncrementalFeatureEngine.FEATURES:
+        np.testing.assert_allclose(emitted[col].to_numpy(np.float64), expected[col].to_numpy(np.float64),
+                                   rtol=1e-6, atol=1e-6, err_msg=col)
+
+
+def test_update_rejects_rows_within_history(gappy_data):
+    df = gappy_data
+    engine = IncrementalFeatureEngine.from_history(df)
+    with pytest.raises(ValueError):
+        engine.update(df[df['Date'] == df['Date'].max()])
+
+
+def test_covers_default_features(tmp_path):
+    assert IncrementalFeatureEngine.covers(PricePredictor(models_dir=str(tmp_path)).features)
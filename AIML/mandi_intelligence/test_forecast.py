@@ -0,0 +1,90 @@
+"""
+Recursive forecasts through the incremental engine: parity and latency (pytest)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_arbitrage import price_predictor
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.feature_engine import IncrementalFeatureEngine
+from ml_arbitrage.price_predictor import PricePredictor
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["observation", "calendar"])
+def trained(request, tmp_path_factory):
+    """Per-series models for 20 mandis, with ~10% of arrival days missing."""
+    root = tmp_path_factory.mktemp("forecast")
+    loader = MandiDataLoader(cache_dir=str(root / "cache"))
+    df = loader.generate_synthetic_data(days=90, n_mandis=20, n_crops=1, seed=0)
+    df = df[np.random.default_rng(0).random(len(df)) > 0.1].reset_index(drop=True)
+    predictor = PricePredictor(models_dir=str(root / "models"), cache_dir=str(root / "features"),
+                               calendar_aligned=request.param)
+    df_featured = predictor.prepare_features(df)
+    predictor.train_all_models(df_featured, n_workers=1)
+    return predictor, df_featured, str(df_featured['Crop'].iloc[0])
+
+
+def recomputed_forecasts(predictor, df_featured, crop, monkeypatch):
+    """Forecasts that recompute every feature over the history for each day (the reference path)."""
+    with monkeypatch.context() as patch:
+        patch.setattr(IncrementalFeatureEngine, 'covers', classmethod(lambda cls, features: False))
+        return predictor.get_price_forecast_all_mandis(df_featured, crop, days_ahead=7)
+
+
+def test_engine_forecasts_match_recomputed_features(trained, monkeypatch):
+    predictor, df_featured, crop = trained
+    forecasts = predictor.get_price_forecast_all_mandis(df_featured, crop, days_ahead=7)
+    expected = recomputed_forecasts(predictor, df_featured, crop, monkeypatch)
+    
+    assert forecasts.keys() == expected.keys() and len(forecasts) == 20
+    for mandi, forecast in forecasts.items():
+        pd.testing.assert_frame_equal(forecast, expected[mandi])
+    
+    single = predictor.predict_future_price(df_featured, 'Ahmedabad', crop, days_ahead=7)
+    pd.testing.assert_frame_equal(single, forecasts['Ahmedabad'])
+
+
+def test_all_mandis_forecast_latency(trained, monkeypatch):
+    predictor, df_featured, crop = trained
+    predictor.get_price_forecast_all_mandis(df_featured, crop, days_ahead=7)  # load the boosters
+    
+    start = time.perf_counter()
+    predictor.get_price_forecast_all_mandis(df_featured, crop, days_ahead=7)
+    engine_s = time.perf_counter() - start
+    start = time.perf_counter()
+    recomputed_forecasts(predictor, df_featured, crop, monkeypatch)
+    recomputed_s = time.perf_counter() - start
+    
+    # Seven forecast days for every mandi cost a handful of vectorized steps, not 7 feature passes per mandi
+    assert engine_s < recomputed_s / 5, f"engine {engine_s:.3f}s vs recomputed {recomputed_s:.3f}s"
+
+
+def test_spatial_panel_built_once_per_crop_and_data(trained, monkeypatch):
+    predictor, df_featured, crop = trained
+    built = []
+    
+    class CountingPanel(price_predictor.SpatialPanel):
+        def __init__(self, reference, *args, **kwargs):
+            built.append(len(reference))
+            super().__init__(reference, *args, **kwargs)
+    
+    monkeypatch.setattr(price_predictor, 'SpatialPanel', CountingPanel)
+    predictor._panels.clear()
+    for mandi in ('Ahmedabad', 'Rajkot', 'Ahmedabad'):
+        predictor.predict_future_price(df_featured, mandi, crop, days_ahead=3)
+    predictor.get_price_forecast_all_mandis(df_featured.copy(), crop, days_ahead=3)
+    assert len(built) == 1
+    
+    # New data, new panel
+    changed = df_featured.copy()
+    changed.loc[changed.index[changed['Crop'] == crop][-1], 'Price_per_kg'] += 1
+    predictor.predict_future_price(changed, 'Ahmedabad', crop, days_ahead=3)
+    assert len(built) == 2
@@ -0,0 +1,54 @@
+"""
+Quality-pass outlier fences (pytest)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+
+
+def series(mandi: str, prices) -> pd.DataFrame:
+    return pd.DataFrame({
+        'Date': pd.date_range('2025-01-01', periods=len(prices)),
+        'State': 'Gujarat',
+        'Mandi_Name': mandi,
+        'Crop': 'Onion',
+        'Distance_km': 10.0,
+        'Price_per_kg': np.array(prices, dtype=np.float32),
+        'Traffic_Congestion_Score': 0.5,
+    })
+
+
+def cleaned(loader: MandiDataLoader, df: pd.DataFrame) -> dict:
+    out = loader.apply_quality_checks(df).sort_values('Date')
+    return {str(m): g['Price_per_kg'].tolist() for m, g in out.groupby('Mandi_Name', observed=True)}
+
+
+def test_flat_history_keeps_real_moves(tmp_path):
+    loader = MandiDataLoader(cache_dir=str(tmp_path / "cache"))
+    df = pd.concat([
+        series('Rajkot', [20.0] * 25 + [22.0] * 5),
+        series('Ahmedabad', [20.0] * 20 + [30.0] * 10),
+        # Per-quintal price typed into the per-kg field
+        series('Mehsana', [20.0] * 20 + [2000.0] + [20.0] * 5),
+    ], ignore_index=True)
+    prices = cleaned(loader, df)
+    
+    assert prices['Rajkot'] == [20.0] * 25 + [22.0] * 5
+    assert prices['Ahmedabad'] == [20.0] * 20 + [30.0] * 10
+    assert prices['Mehsana'][20] == MandiDataLoader.iqr_fences(pd.Series([20.0] * 20))[1]
+    assert loader.quality_report['outliers_clipped'] == 1
+
+
+def test_later_prices_do_not_move_earlier_fences(tmp_path):
+    loader = MandiDataLoader(cache_dir=str(tmp_path / "cache"))
+    history = [20.0] * 10 + [60.0]
+    before = cleaned(loader, series('Rajkot', history))
+    after = cleaned(loader, series('Rajkot', history + [60.0] * 20))
+    assert after['Rajkot'][:len(history)] == before['Rajkot']
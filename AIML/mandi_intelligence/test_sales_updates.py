@@ -0,0 +1,108 @@
+"""
+Warm-starting models on reported sales (pytest)
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.price_predictor import MIN_WARM_START_ROWS, PricePredictor
+from ml_arbitrage.sales_log import load_sales, record_sale
+
+KEY = ('Mehsana', 'Onion')
+
+
+@pytest.fixture
+def trained(tmp_path):
+    """Predictor with per-series models, its featured history and an empty sales log."""
+    loader = MandiDataLoader(cache_dir=str(tmp_path / "cache"))
+    df = loader.generate_synthetic_data(days=90, n_mandis=3, n_crops=2, seed=0)
+    predictor = PricePredictor(models_dir=str(tmp_path / "models"), cache_dir=str(tmp_path / "cache"))
+    df_featured = predictor.prepare_features(df)
+    predictor.train_all_models(df_featured, n_workers=1)
+    return predictor, df_featured, tmp_path / "sales.jsonl"
+
+
+def report(log: Path, df_featured: pd.DataFrame, days_after: int, price: float):
+    """Log a sale at KEY's mandi `days_after` days after the history ends."""
+    date = df_featured['Date'].max() + pd.Timedelta(days=days_after)
+    record_sale({'farmer_id': 'F1', 'mandi_name': KEY[0], 'crop': KEY[1], 'quantity': 100,
+                 'actual_price': price, 'sale_date': str(date.date())}, log)
+
+
+def last_price(df_featured: pd.DataFrame) -> float:
+    series = df_featured[(df_featured['Mandi_Name'] == KEY[0]) & (df_featured['Crop'] == KEY[1])]
+    return float(series.sort_values('Date')['Price_per_kg'].iloc[-1])
+
+
+def test_outlier_sale_is_rejected(trained):
+    predictor, df_featured, log = trained
+    forecast = predictor.predict_future_price(df_featured, *KEY, days_ahead=1)['Predicted_Price'][0]
+    
+    # Per-quintal price typed into the per-kg field
+    report(log, df_featured, 1, last_price(df_featured) * 100)
+    extended, results = predictor.update_models(df_featured, load_sales(log))
+    
+    assert results == []
+    assert len(extended) == len(df_featured)
+    assert predictor.predict_future_price(extended, *KEY, days_ahead=1)['Predicted_Price'][0] == forecast
+
+
+def test_flat_history_accepts_a_new_price_level(tmp_path):
+    loader = MandiDataLoader(cache_dir=str(tmp_path / "cache"))
+    df = loader.generate_synthetic_data(days=90, n_mandis=3, n_crops=2, seed=0)
+    # Modal prices that never moved give no spread to judge a sale by
+    df.loc[(df['Mandi_Name'] == KEY[0]) & (df['Crop'] == KEY[1]), 'Price_per_kg'] = 20.0
+    predictor = PricePredictor(models_dir=str(tmp_path / "models"), cache_dir=str(tmp_path / "features"))
+    df_featured = predictor.prepare_features(df)
+    predictor.train_all_models(df_featured, n_workers=1, only=[KEY])
+    log = tmp_path / "sales.jsonl"
+    
+    # The price has risen: every sale is kept and the model warm-starts on them
+    for day in range(1, MIN_WARM_START_ROWS + 1):
+        report(log, df_featured, day, 26.0)
+    report(log, df_featured, MIN_WARM_START_ROWS + 1, 2000.0)
+    extended, results = predictor.update_models(df_featured, load_sales(log))
+    
+    assert [(r['mandi'], r['crop']) for r in results] == [KEY]
+    assert len(extended) == len(df_featured) + MIN_WARM_START_ROWS
+
+
+def test_warm_start_waits_for_enough_rows(trained):
+    predictor, df_featured, log = trained
+    for day in range(1, MIN_WARM_START_ROWS):
+        report(log, df_featured, day, last_price(df_featured))
+    extended, results = predictor.update_models(df_featured, load_sales(log))
+    
+    assert results == []
+    assert len(extended) == len(df_featured) + MIN_WARM_START_ROWS - 1
+
+
+def test_warm_start_is_idempotent_and_keeps_held_out_metrics(trained):
+    predictor, df_featured, log = trained
+    name = f"{KEY[0]}|{KEY[1]}"
+    evaluation = dict(predictor._load_registry()[name])
+    for day in range(1, MIN_WARM_START_ROWS + 1):
+        report(log, df_featured, day, last_price(df_featured) + day * 0.1)
+    sales = load_sales(log)
+    
+    extended, results = predictor.update_models(df_featured, sales)
+    assert [(r['mandi'], r['crop']) for r in results] == [KEY]
+    entry = predictor._load_registry()[name]
+    assert entry['warm_starts'] == 1
+    assert entry['update_metrics']['test_size'] == MIN_WARM_START_ROWS
+    assert entry['metrics'] == evaluation['metrics'] and entry['mae'] == evaluation['mae']
+    assert entry['trained_through'] > evaluation['trained_through']
+    
+    # The same sales again change nothing, in this process or in a fresh one
+    again, results = predictor.update_models(extended, sales)
+    assert results == [] and len(again) == len(extended)
+    restarted = PricePredictor(models_dir=str(predictor.models_dir), cache_dir=str(predictor.cache_dir))
+    again, results = restarted.update_models(extended, sales)
+    assert results == [] and len(again) == len(extended)
+    assert restarted._load_registry()[name]['trained_at'] == entry['trained_at']
@@ -0,0 +1,99 @@
+"""
+Serving bundle round-trip and staleness checks (pytest)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.model_store import feature_names, predict
+from ml_arbitrage.price_predictor import PricePredictor
+from ml_arbitrage.serving_bundle import build_bundle, ServingBundle
+
+DATASET = Path(__file__).parent / "dataset" / "commodity_price.csv"
+
+
+@pytest.fixture(scope="module")
+def trained(tmp_path_factory):
+    """Predictor with per-series models trained on a small synthetic history."""
+    root = tmp_path_factory.mktemp("bundle")
+    df = MandiDataLoader(cache_dir=str(root / "cache")).generate_synthetic_data(days=60, n_mandis=3, n_crops=1, seed=0)
+    predictor = PricePredictor(models_dir=str(root / "models"), cache_dir=str(root / "cache"))
+    df_featured = predictor.prepare_features(df)
+    predictor.train_all_models(df_featured, n_workers=1)
+    return predictor, df_featured
+
+
+def test_bundle_round_trip(trained, tmp_path):
+    predictor, df_featured = trained
+    bundle = ServingBundle(build_bundle(predictor, df_featured, tmp_path / "bundle.bin", data_key="abc"))
+    
+    # Snapshot comes back column for column
+    frame = bundle.frame
+    assert list(frame.columns) == list(df_featured.columns)
+    for col in df_featured.columns:
+        if isinstance(df_featured[col].dtype, pd.CategoricalDtype):
+            assert frame[col].astype(str).tolist() == df_featured[col].astype(str).tolist()
+        else:
+            np.testing.assert_array_equal(frame[col].to_numpy(), df_featured[col].to_numpy())
+    
+    # Every registered model is bundled and predicts like the one on disk
+    registry = predictor._load_registry()
+    assert len(bundle) == len(registry)
+    for name in registry:
+        key = tuple(name.split("|"))
+        bundled, on_disk = bundle.load_model(key), predictor._get_model(key)
+        X = df_featured[feature_names(on_disk)].tail(5)
+        np.testing.assert_allclose(predict(bundled, X), predict(on_disk, X))
+        assert bundle.entry(key)["trained_at"] == registry[name]["trained_at"]
+    assert bundle.load_model(("Nowhere", "Nothing")) is None
+
+
+def test_preloaded_boosters_outlive_the_model_cache(trained, tmp_path):
+    predictor, df_featured = trained
+    bundle = ServingBundle(build_bundle(predictor, df_featured, tmp_path / "bundle.bin"))
+    assert bundle.preload() == len(bundle)
+    
+    # Evicted models come back as the same preloaded booster, not a fresh copy
+    serving = PricePredictor(models_dir=str(predictor.models_dir), cache_dir=str(predictor.cache_dir),
+                             max_loaded_models=1, bundle=bundle)
+    keys = [tuple(name.split("|")) for name in predictor._load_registry()]
+    for key in keys + keys:
+        assert serving._get_model(key) is bundle.load_model(key)
+    assert len(serving.models) == 1
+
+
+def test_bundle_staleness(trained, tmp_path):
+    predictor, df_featured = trained
+    csv_path = tmp_path / "prices.csv"
+    csv_path.write_bytes(DATASET.read_bytes())
+    loader = MandiDataLoader(cache_dir=str(tmp_path / "cache"))
+    data_key = loader.processed_key(str(csv_path), days=90)
+    
+    bundle = ServingBundle(build_bundle(predictor, df_featured, tmp_path / "bundle.bin", data_key=data_key))
+    assert bundle.is_current(predictor.feature_version(), loader.processed_key(str(csv_path), days=90))
+    
+    # Another history window, another feature spec or a missing key is stale
+    assert not bundle.is_current(predictor.feature_version(), loader.processed_key(str(csv_path), days=30))
+    observation_mode = PricePredictor(models_dir=str(tmp_path / "other"), calendar_aligned=False)
+    assert not bundle.is_current(observation_mode.feature_version(), data_key)
+    unkeyed = ServingBundle(build_bundle(predictor, df_featured, tmp_path / "unkeyed.bin"))
+    assert not unkeyed.is_current(predictor.feature_version(), data_key)
+    
+    # New rows in the dataset change its key
+    with open(csv_path, "a") as f:
+        f.write("Gujarat,Rajkot,Rajkot,Onion,Red,FAQ,20/05/2025,1500,1900,1700\n")
+    assert not bundle.is_current(predictor.feature_version(), loader.processed_key(str(csv_path), days=90))
+
+
+def test_bundle_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_bundle.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        ServingBundle(path)
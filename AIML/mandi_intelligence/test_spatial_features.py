@@ -0,0 +1,60 @@
+"""
+Cross-mandi spatial features must not look ahead (pytest)
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.features import SPATIAL_FEATURES
+from ml_arbitrage.price_predictor import PricePredictor
+from ml_arbitrage.spatial_features import SpatialPanel
+
+
+@pytest.fixture(scope="module")
+def prices(tmp_path_factory):
+    loader = MandiDataLoader(cache_dir=str(tmp_path_factory.mktemp("cache")))
+    return loader.generate_synthetic_data(days=40, n_mandis=5, n_crops=2, seed=3)
+
+
+@pytest.mark.parametrize("calendar_aligned", [False, True])
+def test_later_prices_do_not_change_earlier_rows(prices, tmp_path, calendar_aligned):
+    predictor = PricePredictor(models_dir=str(tmp_path), calendar_aligned=calendar_aligned)
+    cutoff = prices['Date'].min() + pd.Timedelta(days=20)
+    
+    # Same-day and later prices at every mandi change; rows up to the cutoff must not
+    shocked = prices.copy()
+    later = shocked['Date'] >= cutoff
+    shocked.loc[later, 'Price_per_kg'] = shocked.loc[later, 'Price_per_kg'] * 10
+    
+    keys = ['Mandi_Name', 'Crop', 'Date']
+    before = predictor.prepare_features(prices).sort_values(keys).reset_index(drop=True)
+    after = predictor.prepare_features(shocked).sort_values(keys).reset_index(drop=True)
+    upto = (before['Date'] <= cutoff).to_numpy()
+    
+    for col in SPATIAL_FEATURES:
+        np.testing.assert_array_equal(before.loc[upto, col].to_numpy(), after.loc[upto, col].to_numpy(),
+                                      err_msg=col)
+    assert not np.allclose(before.loc[~upto, 'nearby_mean_price'], after.loc[~upto, 'nearby_mean_price'])
+
+
+def test_panel_uses_only_earlier_days():
+    df = pd.DataFrame({
+        'Date': pd.to_datetime(['2025-01-01', '2025-01-01', '2025-01-02', '2025-01-02']),
+        'State': ['Gujarat'] * 4,
+        'Mandi_Name': ['Rajkot', 'Ahmedabad', 'Rajkot', 'Ahmedabad'],
+        'Crop': ['Onion'] * 4,
+        'Price_per_kg': np.array([10.0, 20.0, 11.0, 99.0], dtype=np.float32),
+    })
+    features = SpatialPanel(df).lookup(df)
+    
+    # First day: nothing is known yet; second day: only the first day's prices
+    np.testing.assert_array_equal(features['nearest_price'][:2], [np.nan, np.nan])
+    np.testing.assert_array_equal(features['nearest_price'][2:], [20.0, 10.0])
+    np.testing.assert_array_equal(features['state_median_price'][2:], [15.0, 15.0])
@@ -0,0 +1,81 @@
+"""
+Offline model training job.
+
+Brings the model registry (ml_arbitrage/models/registry.json) up to date so the
+API can start without training: by default only missing or stale models are
+trained; --all retrains everything. Afterwards the featured data and all valid
+models are written to one serving bundle (ml_arbitrage/models/serving_bundle.bin)
+that API workers map read-only at startup.
+
+--tune picks hyperparameters for series without cached ones (rolling-origin CV
+with early stopping, cached in ml_arbitrage/models/hyperparams.json and reused
+on every retrain); --retune re-tunes and retrains every series.
+
+Usage:
+    python train_models.py [--all] [--days 90] [--workers N] [--max-age-days 7] [--global-models] [--no-bundle] [--tune | --retune]
+"""
+import argparse
+import sys
+sys.path.insert(0, '.')
+
+from ml_arbitrage.data_loader import MandiDataLoader
+from ml_arbitrage.price_predictor import PricePredictor, MODEL_MAX_AGE_DAYS
+from ml_arbitrage.serving_bundle import build_bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train missing/stale mandi price models")
+    parser.add_argument('--dataset', default="dataset/commodity_price.csv")
+    parser.add_argument('--days', type=int, default=90, help="History window (0 = all data)")
+    parser.add_argument('--all', action='store_true', help="Retrain every model, not just missing/stale ones")
+    parser.add_argument('--workers', type=int, default=None, help="Training processes (default: one per CPU)")
+    parser.add_argument('--max-age-days', type=int, default=MODEL_MAX_AGE_DAYS)
+    parser.add_argument('--global-models', action='store_true',
+                        help="Also train one multi-series model per crop (forecasts for sparse mandis)")
+    parser.add_argument('--tune', action='store_true',
+                        help="Tune hyperparameters of retrained series that have none cached")
+    parser.add_argument('--retune', action='store_true', help="Re-tune and retrain every series")
+    parser.add_argument('--no-bundle', action='store_true', help="Don't write the API serving bundle")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("  OFFLINE MODEL TRAINING")
+    print("=" * 80)
+    print()
+    
+    loader = MandiDataLoader()
+    df = loader.load_processed(args.dataset, days=args.days or None)
+    data_key = loader.processed_key(args.dataset, days=args.days or None)
+    
+    predictor = PricePredictor()
+    df_featured = predictor.load_features(df)
+    
+    if args.retune:
+        predictor.tune_models(df_featured, n_workers=args.workers)
+    
+    summary = predictor.sync_models(
+        df_featured,
+        retrain='all' if args.all or args.retune else 'missing',
+        n_workers=args.workers,
+        max_age_days=args.max_age_days,
+        tune=args.tune
+    )
+    
+    if args.global_models:
+        print()
+        predictor.train_global_models(df_featured)
+    
+    if not args.no_bundle:
+        print()
+        build_bundle(predictor, df_featured, data_key=data_key)
+    
+    print()
+    print("=" * 80)
+    print(f"  Up to date: {len(summary['loaded'])} | Trained: {len(summary['trained'])} | "
+          f"Unavailable: {len(summary['unavailable'])}")
+    print("  Models saved to: ml_arbitrage/models/")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,13 +31,11 @@ def main():
     dataset_path = "dataset/commodity_price.csv"
     
     try:
-        df_raw = loader.load_data(dataset_path)
-        print(f"✅ Successfully loaded {len(df_raw):,} records from real dataset")
-        print()
-        
-        # Process and filter data
+        # Process and filter data (served from the processed-data cache when the CSV is unchanged)
         print("🔧 Processing and filtering data for Gujarat mandis...")
-        df_processed = loader.filter_and_process(days=90)
+        df_processed = loader.load_processed(dataset_path, days=90)
+        print(f"✅ Successfully loaded {len(df_processed):,} processed records from real dataset")
+        print()
         
         if len(df_processed) == 0:
             print("⚠️  No data found for target mandis after filtering.")
@@ -68,8 +66,8 @@ def main():
     predictor = PricePredictor()
     
     # Prepare features
-    print("🔧 Engineering time-series features...")
-    df_featured = predictor.prepare_features(df_processed)
+    print("🔧 Engineering time-series features (reused from cache when the data is unchanged)...")
+    df_featured = predictor.load_features(df_processed)
     print(f"   Features created: {len(df_featured.columns)} columns")
     print()
     